@@ -4,93 +4,20 @@ WhisperLive Web Application
 Modern web-based real-time speech transcription
 """
 
-from flask import Flask, render_template, jsonify, request, send_file, Response
-from flask_socketio import SocketIO, emit
-import whisper
-import torch
-import numpy as np
-import base64
-import io
-import time
-import threading
-import queue
-from datetime import datetime
-import os
-import json
-from werkzeug.utils import secure_filename
+from flask import Flask, render_template, jsonify, request, Response
+from flask_socketio import SocketIO
+
+from src.handlers import build_handlers, run_steps, sse
+from src.metrics import REGISTRY as METRICS, CONTENT_TYPE as METRICS_CONTENT_TYPE
 
 # Initialize Flask app
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'whisperlive-secret-key'
 socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading')
 
-# Global variables
-model = None
-model_loading = False
-transcription_queue = queue.Queue()
-clients = {}
-
-# Configuration
-MODEL_SIZE = "large-v3"  # Best accuracy for Indian accents (requires ~10GB VRAM)
-SAMPLE_RATE = 16000
-
-class TranscriptionProcessor:
-    def __init__(self):
-        self.is_running = True
-        self.thread = threading.Thread(target=self._process_loop)
-        self.thread.daemon = True
-        self.thread.start()
-        
-    def _process_loop(self):
-        while self.is_running:
-            try:
-                # Get audio data from queue
-                client_id, audio_file_path = transcription_queue.get(timeout=0.1)
-                
-                if model is None:
-                    continue
-                
-                print(f"Processing audio file: {audio_file_path}")
-                
-                # Transcribe
-                start_time = time.time()
-                result = model.transcribe(
-                    audio_file_path,
-                    language="en",
-                    task="transcribe",
-                    fp16=(torch.cuda.is_available()),
-                    initial_prompt="This is a speech transcription in Indian English."
-                )
-                
-                processing_time = time.time() - start_time
-                
-                # Send result back to client
-                if result['text'].strip():
-                    socketio.emit('transcription', {
-                        'text': result['text'].strip(),
-                        'timestamp': time.time(),
-                        'processing_time': processing_time,
-                        'language': result.get('language', 'en')
-                    }, room=client_id)
-                    print(f"Transcribed: {result['text'].strip()}")
-                
-                # Clean up temp file
-                try:
-                    os.remove(audio_file_path)
-                except:
-                    pass
-                
-            except queue.Empty:
-                continue
-            except Exception as e:
-                print(f"Transcription error: {e}")
-                import traceback
-                print(traceback.format_exc())
-                if 'client_id' in locals() and client_id in clients:
-                    socketio.emit('error', {'message': str(e)}, room=client_id)
-
-# Initialize processor
-processor = TranscriptionProcessor()
+# Model registry, fair scheduler + inference workers, live-chunk batcher, result cache, jobs
+# and the per-client state; request handling is shared with asgi_app.py (see src/handlers.py)
+handlers = build_handlers(socketio.emit)
 
 @app.route('/')
 def home():
@@ -107,511 +34,124 @@ def upload():
     """Serve the upload page"""
     return render_template('upload.html')
 
+@app.route('/test')
+def test():
+    """Test page for debugging"""
+    return render_template('test.html')
+
 @app.route('/status')
 def status():
     """Get server status"""
-    return jsonify({
-        'model_loaded': model is not None,
-        'model_loading': model_loading,
-        'model_size': MODEL_SIZE,
-        'gpu_available': torch.cuda.is_available(),
-        'gpu_name': torch.cuda.get_device_name(0) if torch.cuda.is_available() else None,
-        'available_models': ['tiny', 'base', 'small', 'medium', 'large', 'large-v2', 'large-v3']
-    })
+    return jsonify(handlers.status())
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus text exposition of the server's counters, gauges and histograms"""
+    return Response(METRICS.render(), mimetype=METRICS_CONTENT_TYPE)
 
 @app.route('/change_model', methods=['POST'])
 def change_model():
-    """Change the Whisper model"""
-    global model, MODEL_SIZE, model_loading
-    
-    data = request.json
-    new_model_size = data.get('model', 'small')
-    
-    # Validate model size
-    valid_models = ['tiny', 'base', 'small', 'medium', 'large', 'large-v2', 'large-v3']
-    if new_model_size not in valid_models:
-        return jsonify({'error': 'Invalid model size'}), 400
-    
-    # Load new model in background
-    MODEL_SIZE = new_model_size
-    threading.Thread(target=load_model, daemon=True).start()
-    
-    return jsonify({
-        'message': f'Loading {new_model_size} model...',
-        'model_size': new_model_size
-    })
+    """Change the default Whisper model (resident models stay loaded for in-flight work)"""
+    payload, status_code = handlers.change_model(request.json)
+    return jsonify(payload), status_code
 
-@app.route('/test')
-def test():
-    """Test page for debugging"""
-    return '''
-    <html>
-    <body>
-        <h1>WhisperLive Test Page</h1>
-        <p>This is a minimal test to check if recording works without buffer errors.</p>
-        <button onclick="testRecord()">Test Record (3s)</button>
-        <div id="status"></div>
-        <script>
-        async function testRecord() {
-            const status = document.getElementById('status');
-            status.innerHTML = 'Getting microphone...';
-            
-            try {
-                const stream = await navigator.mediaDevices.getUserMedia({ audio: true });
-                status.innerHTML = 'Got microphone! Recording...';
-                
-                const mediaRecorder = new MediaRecorder(stream);
-                const chunks = [];
-                
-                mediaRecorder.ondataavailable = e => chunks.push(e.data);
-                mediaRecorder.onstop = () => {
-                    status.innerHTML = 'Recording complete! Size: ' + chunks.reduce((a,b) => a + b.size, 0) + ' bytes';
-                    stream.getTracks().forEach(track => track.stop());
-                };
-                
-                mediaRecorder.start();
-                setTimeout(() => mediaRecorder.stop(), 3000);
-                
-            } catch (error) {
-                status.innerHTML = 'ERROR: ' + error.message;
-            }
-        }
-        </script>
-    </body>
-    </html>
-    '''
+@app.route('/jobs', methods=['POST'])
+def create_job():
+    """Queue a file for background transcription and return its job ID immediately"""
+    file = request.files.get('file')
+    payload, status_code = handlers.create_job(
+        file.filename if file else None,
+        lambda path: file.save(path),
+        request.form.get('model'),
+        request.form.get('language', 'auto'),
+        request.remote_addr
+    )
+    return jsonify(payload), status_code
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Job status, transcript so far and timings (?since=N returns segments from index N)"""
+    payload, status_code = handlers.get_job(job_id, since=request.args.get('since', 0, type=int))
+    return jsonify(payload), status_code
+
+@app.route('/jobs/<job_id>', methods=['DELETE'])
+def delete_job(job_id):
+    """Cancel a queued or running job, or delete a finished one"""
+    payload, status_code = handlers.delete_job(job_id)
+    return jsonify(payload), status_code
+
+@app.route('/transcribe_file', methods=['POST'])
+def transcribe_file():
+    """Handle file upload and transcription, streaming progress as server-sent events"""
+    # Get file and parameters BEFORE entering the generator
+    file = request.files.get('file')
+    if not file:
+        return Response(sse({'status': 'error', 'message': 'No file provided'}), mimetype='text/event-stream')
+
+    temp_path = handlers.upload_temp_path(file.filename)
+    file.save(temp_path)
+
+    # Uploads are scheduled per uploader so one user's batch can't starve live sessions
+    steps = handlers.upload_steps(f"upload:{request.remote_addr}", temp_path, request.form.get('model'),
+                                  request.form.get('language', 'auto'))
+    # Each window blocks this request's thread until it is decoded
+    return Response((sse(event) for event in run_steps(steps)), mimetype='text/event-stream')
 
 @socketio.on('connect')
 def handle_connect():
     """Handle client connection"""
-    client_id = request.sid
-    clients[client_id] = {
-        'connected_at': time.time(),
-        'transcriptions': []
-    }
-    print(f"Client connected: {client_id}")
-    
-    # Send initial status
-    emit('connected', {
-        'client_id': client_id,
-        'model_loaded': model is not None,
-        'model_loading': model_loading
-    })
+    handlers.connect(request.sid)
 
 @socketio.on('disconnect')
 def handle_disconnect():
     """Handle client disconnection"""
-    client_id = request.sid
-    if client_id in clients:
-        del clients[client_id]
-    print(f"Client disconnected: {client_id}")
+    handlers.disconnect(request.sid)
+
+@socketio.on('set_model')
+def handle_set_model(data):
+    """Pick the model for this client's live audio without touching the server default"""
+    handlers.set_model(request.sid, data)
 
 @socketio.on('audio_data')
 def handle_audio_data(data):
     """Handle incoming audio data"""
-    try:
-        client_id = request.sid
-        
-        # Decode base64 audio data
-        audio_bytes = base64.b64decode(data['audio'])
-        
-        # Get format (default to wav)
-        audio_format = data.get('format', 'wav')
-        
-        # Save to temporary file for Whisper to process
-        temp_filename = f"temp_audio_{client_id}_{int(time.time()*1000)}.{audio_format}"
-        temp_path = os.path.join("temp", temp_filename)
-        
-        # Ensure temp directory exists
-        os.makedirs("temp", exist_ok=True)
-        
-        # Write audio data to file
-        with open(temp_path, 'wb') as f:
-            f.write(audio_bytes)
-        
-        print(f"Received audio chunk: {len(audio_bytes)} bytes, format: {audio_format}")
-        
-        # Add to transcription queue
-        transcription_queue.put((client_id, temp_path))
-        
-        # Send acknowledgment
-        emit('audio_received', {'timestamp': time.time()})
-        
-    except Exception as e:
-        print(f"Error handling audio data: {e}")
-        import traceback
-        print(traceback.format_exc())
-        emit('error', {'message': str(e)})
+    handlers.audio_data(request.sid, data)
+
+@socketio.on('audio_pcm')
+def handle_audio_pcm(payload):
+    """Handle binary PCM16 frames: 8-byte header (sequence, sample rate) + int16 samples"""
+    handlers.audio_pcm(request.sid, payload)
+
+@socketio.on('stream_start')
+def handle_stream_start(data=None):
+    """Switch this client's audio_pcm frames to rolling-window streaming mode"""
+    handlers.stream_start(request.sid)
+
+@socketio.on('stream_stop')
+def handle_stream_stop(data=None):
+    """Leave streaming mode, committing whatever is still pending"""
+    handlers.stream_stop(request.sid)
 
 @socketio.on('audio_blob')
 def handle_audio_blob(data):
     """Handle complete audio recording"""
-    try:
-        client_id = request.sid
-        
-        # Decode base64 audio data
-        audio_bytes = base64.b64decode(data['audio'])
-        mime_type = data.get('mimeType', 'audio/webm')
-        duration = data.get('duration', 0)
-        
-        print(f"Received audio blob: {len(audio_bytes)} bytes, type: {mime_type}, duration: {duration}s")
-        
-        # Determine file extension from mime type
-        ext = 'webm'
-        if 'wav' in mime_type:
-            ext = 'wav'
-        elif 'ogg' in mime_type:
-            ext = 'ogg'
-        elif 'mp4' in mime_type:
-            ext = 'mp4'
-        
-        # Save to temporary file
-        temp_filename = f"recording_{client_id}_{int(time.time())}.{ext}"
-        temp_path = os.path.join("temp", temp_filename)
-        
-        # Ensure temp directory exists
-        os.makedirs("temp", exist_ok=True)
-        
-        # Write audio data to file
-        with open(temp_path, 'wb') as f:
-            f.write(audio_bytes)
-        
-        print(f"Saved audio to: {temp_path}")
-        
-        # Process immediately
-        if model is not None:
-            print("Processing with Whisper...")
-            print(f"Model type: {type(model)}")
-            print(f"Using GPU: {torch.cuda.is_available()}")
-            
-            try:
-                # Get absolute path for debugging
-                abs_temp_path = os.path.abspath(temp_path)
-                print(f"Processing audio file: {abs_temp_path}")
-                print(f"File exists: {os.path.exists(abs_temp_path)}")
-                print(f"File size: {os.path.getsize(abs_temp_path)} bytes")
-                print(f"File extension: {ext}")
-                
-                # Always load audio ourselves to avoid ffmpeg dependency
-                import numpy as np
-                
-                if ext == 'wav':
-                    # Load WAV file using scipy (no ffmpeg needed)
-                    print("Loading WAV file with scipy...")
-                    import scipy.io.wavfile
-                    try:
-                        sample_rate, audio_data = scipy.io.wavfile.read(abs_temp_path)
-                        print(f"WAV loaded: sample_rate={sample_rate}, shape={audio_data.shape}, dtype={audio_data.dtype}")
-                        
-                        # Convert to float32 and normalize
-                        if audio_data.dtype == np.int16:
-                            audio_data = audio_data.astype(np.float32) / 32768.0
-                        elif audio_data.dtype == np.int32:
-                            audio_data = audio_data.astype(np.float32) / 2147483648.0
-                        else:
-                            audio_data = audio_data.astype(np.float32)
-                        
-                        # Resample if needed (Whisper expects 16kHz)
-                        if sample_rate != 16000:
-                            print(f"Resampling from {sample_rate}Hz to 16000Hz...")
-                            import scipy.signal
-                            audio_data = scipy.signal.resample(audio_data, int(len(audio_data) * 16000 / sample_rate))
-                        
-                        print(f"Audio prepared: shape={audio_data.shape}, dtype={audio_data.dtype}, range=[{audio_data.min():.3f}, {audio_data.max():.3f}]")
-                        
-                    except Exception as e:
-                        print(f"scipy.io.wavfile failed: {e}")
-                        # Fallback to soundfile
-                        import soundfile as sf
-                        audio_data, sample_rate = sf.read(abs_temp_path)
-                        if sample_rate != 16000:
-                            import scipy.signal
-                            audio_data = scipy.signal.resample(audio_data, int(len(audio_data) * 16000 / sample_rate))
-                        audio_data = audio_data.astype(np.float32)
-                        
-                else:
-                    # For non-WAV formats, use librosa
-                    import librosa
-                    print(f"Loading {ext} file with librosa...")
-                    try:
-                        audio_data, sample_rate = librosa.load(abs_temp_path, sr=16000, mono=True)
-                        print(f"Audio loaded: shape={audio_data.shape}, dtype={audio_data.dtype}")
-                    except Exception as e:
-                        print(f"Librosa failed: {e}")
-                        # Try soundfile as fallback
-                        import soundfile as sf
-                        audio_data, sample_rate = sf.read(abs_temp_path)
-                        if sample_rate != 16000:
-                            import scipy.signal
-                            audio_data = scipy.signal.resample(audio_data, int(len(audio_data) * 16000 / sample_rate))
-                        if len(audio_data.shape) > 1:
-                            audio_data = audio_data.mean(axis=1)
-                        audio_data = audio_data.astype(np.float32)
-                
-                # Ensure audio is properly normalized for Whisper
-                if audio_data.max() > 1.0 or audio_data.min() < -1.0:
-                    print(f"Normalizing audio from [{audio_data.min():.3f}, {audio_data.max():.3f}] to [-1, 1]")
-                    audio_data = audio_data / np.abs(audio_data).max()
-                
-                # Transcribe numpy array (bypasses ffmpeg completely)
-                print("Transcribing audio array with Whisper...")
-                result = model.transcribe(
-                    audio_data,  # numpy array, not file path!
-                    language="en",
-                    fp16=(torch.cuda.is_available()),
-                    no_speech_threshold=0.6,  # Higher threshold to reduce hallucinations
-                    compression_ratio_threshold=2.4  # Filter out repetitive text
-                )
-                
-                transcribed_text = result['text'].strip()
-                print(f"Transcription result: {transcribed_text}")
-                
-                # Filter out common Whisper hallucinations
-                hallucinations = [
-                    "thank you", "thanks for watching", "thanks", 
-                    "bye", "goodbye", "see you later",
-                    "♪", "[music]", "[Music]", "[MUSIC]",
-                    "you", "yeah", "uh", "um"
-                ]
-                
-                # Check if transcription is just a hallucination
-                if transcribed_text.lower() in hallucinations:
-                    print(f"Filtered out hallucination: {transcribed_text}")
-                    transcribed_text = ""
-                
-                if transcribed_text:
-                    socketio.emit('transcription', {
-                        'text': transcribed_text,
-                        'timestamp': time.time(),
-                        'language': result.get('language', 'en')
-                    }, room=client_id)
-                else:
-                    emit('error', {'message': 'No speech detected in audio'})
-                
-            except Exception as e:
-                print(f"Transcription error: {e}")
-                import traceback
-                traceback.print_exc()
-                emit('error', {'message': f'Transcription failed: {str(e)}'})
-            
-            # Clean up
-            try:
-                os.remove(temp_path)
-            except:
-                pass
-        else:
-            emit('error', {'message': 'Model not loaded yet'})
-        
-    except Exception as e:
-        print(f"Error handling audio blob: {e}")
-        import traceback
-        traceback.print_exc()
-        emit('error', {'message': str(e)})
+    handlers.audio_blob(request.sid, data)
 
 @socketio.on('save_transcript')
 def handle_save_transcript(data):
     """Save transcript to file"""
-    try:
-        client_id = request.sid
-        transcript = data.get('transcript', '')
-        
-        # Create filename with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"transcript_{timestamp}.txt"
-        filepath = os.path.join("transcripts", filename)
-        
-        # Ensure directory exists
-        os.makedirs("transcripts", exist_ok=True)
-        
-        # Save file
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(f"WhisperLive Transcript\n")
-            f.write(f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write("="*50 + "\n\n")
-            f.write(transcript)
-        
-        emit('save_complete', {
-            'filename': filename,
-            'path': filepath
-        })
-        
-    except Exception as e:
-        print(f"Error saving transcript: {e}")
-        emit('error', {'message': f"Failed to save: {str(e)}"})
-
-def load_model():
-    """Load Whisper model"""
-    global model, model_loading
-    
-    try:
-        model_loading = True
-        print(f"Loading Whisper {MODEL_SIZE} model...")
-        
-        device = "cuda" if torch.cuda.is_available() else "cpu"
-        model = whisper.load_model(MODEL_SIZE, device=device)
-        
-        print(f"Model loaded successfully on {device}")
-        model_loading = False
-        
-        # Notify all connected clients
-        socketio.emit('model_loaded', {'model_size': MODEL_SIZE})
-        
-    except Exception as e:
-        print(f"Error loading model: {e}")
-        model_loading = False
-        socketio.emit('error', {'message': f"Failed to load model: {str(e)}"})
-
-@app.route('/transcribe_file', methods=['POST'])
-def transcribe_file():
-    """Handle file upload and transcription"""
-    # Get file and parameters BEFORE entering generator
-    file = request.files.get('file')
-    model_size = request.form.get('model', MODEL_SIZE)
-    language = request.form.get('language', 'auto')
-    
-    if not file:
-        return Response(
-            f"data: {json.dumps({'status': 'error', 'message': 'No file provided'})}\n\n",
-            mimetype='text/event-stream'
-        )
-    
-    # Save uploaded file BEFORE entering generator
-    filename = secure_filename(file.filename)
-    temp_path = os.path.join("temp", f"upload_{int(time.time())}_{filename}")
-    os.makedirs("temp", exist_ok=True)
-    file.save(temp_path)
-    
-    def generate(saved_path, saved_filename, model_size_param, language_param):
-        global MODEL_SIZE
-        
-        try:
-            
-            # Check file format FIRST before any processing
-            file_ext = os.path.splitext(saved_filename)[1].lower()
-            video_extensions = ['.mp4', '.avi', '.mov', '.mkv', '.webm']
-            
-            # Check if file format is supported
-            # Audio files should be converted to WAV on client side, so we should only receive WAV files
-            # If we receive other audio formats, it means client-side conversion failed
-            if file_ext not in ['.wav'] + video_extensions:
-                yield f"data: {json.dumps({'status': 'error', 'message': f'Unsupported file format: {file_ext}. Audio files should be automatically converted to WAV format.'})}\n\n"
-                # Clean up
-                try:
-                    os.remove(saved_path)
-                except:
-                    pass
-                return
-            
-            # Send progress update
-            yield f"data: {json.dumps({'status': 'processing', 'message': 'File uploaded', 'progress': 10})}\n\n"
-            
-            # Check if model needs to be changed
-            if model_size_param != MODEL_SIZE:
-                yield f"data: {json.dumps({'status': 'processing', 'message': f'Loading {model_size_param} model...', 'progress': 20})}\n\n"
-                MODEL_SIZE = model_size_param
-                load_model()
-            
-            yield f"data: {json.dumps({'status': 'processing', 'message': 'Processing audio...', 'progress': 40})}\n\n"
-            
-            # Process the file
-            start_time = time.time()
-            
-            if file_ext in video_extensions:
-                yield f"data: {json.dumps({'status': 'processing', 'message': 'Extracting audio from video...', 'progress': 50})}\n\n"
-                # For now, we'll just try to process it directly
-                # In production, you'd use moviepy or ffmpeg to extract audio
-            
-            yield f"data: {json.dumps({'status': 'processing', 'message': 'Transcribing with Whisper...', 'progress': 70})}\n\n"
-            
-            # Transcribe with Whisper
-            if model is None:
-                yield f"data: {json.dumps({'status': 'error', 'message': 'Model not loaded'})}\n\n"
-                return
-            
-            # Determine language parameter
-            lang = None if language_param == 'auto' else language_param
-            
-            # Load audio and transcribe
-            try:
-                # For WAV files - no ffmpeg needed
-                if file_ext == '.wav':
-                    import scipy.io.wavfile
-                    sample_rate, audio_data = scipy.io.wavfile.read(saved_path)
-                    
-                    # Convert to float32 and normalize
-                    if audio_data.dtype == np.int16:
-                        audio_data = audio_data.astype(np.float32) / 32768.0
-                    elif audio_data.dtype == np.int32:
-                        audio_data = audio_data.astype(np.float32) / 2147483648.0
-                    else:
-                        audio_data = audio_data.astype(np.float32)
-                    
-                    # Resample if needed
-                    if sample_rate != 16000:
-                        import scipy.signal
-                        audio_data = scipy.signal.resample(audio_data, int(len(audio_data) * 16000 / sample_rate))
-                    
-                    # Transcribe numpy array
-                    result = model.transcribe(
-                        audio_data,
-                        language=lang,
-                        fp16=(torch.cuda.is_available()),
-                        verbose=False
-                    )
-                else:
-                    # For video formats - Whisper will handle with ffmpeg if available
-                    # If ffmpeg is not available, this will fail with a clear error
-                    result = model.transcribe(
-                        saved_path,
-                        language=lang,
-                        fp16=(torch.cuda.is_available()),
-                        verbose=False
-                    )
-                
-            except Exception as e:
-                print(f"Audio processing error: {e}")
-                error_msg = str(e)
-                if "ffmpeg" in error_msg.lower() or "FileNotFoundError" in str(type(e)):
-                    yield f"data: {json.dumps({'status': 'error', 'message': 'This file format requires ffmpeg which is not installed. For audio files, please convert to WAV format. For video files, please install ffmpeg.'})}\n\n"
-                else:
-                    yield f"data: {json.dumps({'status': 'error', 'message': f'Error processing file: {error_msg}'})}\n\n"
-                # Clean up
-                try:
-                    os.remove(saved_path)
-                except:
-                    pass
-                return
-            
-            processing_time = time.time() - start_time
-            
-            # Clean up temp file
-            try:
-                os.remove(saved_path)
-            except:
-                pass
-            
-            # Send final result
-            yield f"data: {json.dumps({
-                'status': 'complete',
-                'transcription': result['text'],
-                'language': result.get('language', language_param),
-                'model': MODEL_SIZE,
-                'processing_time': processing_time,
-                'progress': 100
-            })}\n\n"
-            
-        except Exception as e:
-            print(f"Transcription error: {e}")
-            import traceback
-            traceback.print_exc()
-            yield f"data: {json.dumps({'status': 'error', 'message': str(e)})}\n\n"
-    
-    return Response(generate(temp_path, filename, model_size, language), mimetype='text/event-stream')
+    handlers.save_transcript(request.sid, data)
 
 # Load model in background when server starts
-threading.Thread(target=load_model, daemon=True).start()
+handlers.start()
 
 if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="WhisperLive web server")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5000)  # One port per process behind a load balancer
+    args = parser.parse_args()
+
     print("Starting WhisperLive Web Server...")
-    print("Open http://localhost:5000 in your browser")
-    socketio.run(app, debug=False, port=5000, host='0.0.0.0')
\ No newline at end of file
+    print(f"Open http://localhost:{args.port} in your browser")
+    socketio.run(app, debug=False, port=args.port, host=args.host)
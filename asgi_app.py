@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+WhisperLive asyncio server
+Same routes and Socket.IO events as app.py, served from one event loop (ASGI)
+instead of one OS thread per connection. Request handling is shared with
+app.py (src/handlers.py); blocking work (model inference, file I/O) runs on
+the fair-scheduled inference workers or a thread executor, and upload
+windows are awaited without holding a thread.
+
+    python asgi_app.py --host 0.0.0.0 --port 5000
+"""
+
+import argparse
+import asyncio
+import shutil
+from concurrent.futures import Future
+from functools import partial
+
+import socketio
+import uvicorn
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Mount, Route
+from starlette.staticfiles import StaticFiles
+from starlette.templating import Jinja2Templates
+
+from src.handlers import build_handlers, sse
+from src.metrics import REGISTRY as METRICS, CONTENT_TYPE as METRICS_CONTENT_TYPE
+
+sio = socketio.AsyncServer(async_mode='asgi', cors_allowed_origins='*')
+
+templates = Jinja2Templates(directory='templates')
+# Templates are written for Flask's url_for('static', filename=...)
+templates.env.globals['url_for'] = lambda endpoint, filename: f"/static/{filename}"
+
+# The event loop serving this app, set at startup
+loop = None
+
+def emit(event, data, room=None):
+    """Thread-safe emit for the shared handlers: queued on the loop from any thread"""
+    asyncio.run_coroutine_threadsafe(sio.emit(event, data, to=room), loop)
+
+handlers = build_handlers(emit)
+
+async def run_blocking(fn, *args):
+    """Run blocking handler work (file I/O, model loads, SQLite) on the default executor"""
+    return await asyncio.get_running_loop().run_in_executor(None, partial(fn, *args))
+
+async def stream_steps(steps):
+    """Drive handlers.upload_steps on the loop: futures are awaited, blocking calls go to the executor"""
+    value, error = None, None
+    try:
+        while True:
+            try:
+                step = steps.throw(error) if error is not None else steps.send(value)
+            except StopIteration:
+                return
+            value, error = None, None
+            if isinstance(step, dict):
+                yield sse(step)
+                continue
+            try:
+                value = await (asyncio.wrap_future(step) if isinstance(step, Future) else run_blocking(step))
+            except Exception as e:
+                error = e
+    finally:
+        # Also on CancelledError when the client leaves mid-upload: the steps' own cleanup runs now
+        steps.close()
+
+# ---------------------------------------------------------------------------
+# HTTP routes
+# ---------------------------------------------------------------------------
+
+async def home(request):
+    """Serve the home page"""
+    return templates.TemplateResponse('home.html', {'request': request})
+
+async def record(request):
+    """Serve the recording page"""
+    return templates.TemplateResponse('record.html', {'request': request})
+
+async def upload(request):
+    """Serve the upload page"""
+    return templates.TemplateResponse('upload.html', {'request': request})
+
+async def test(request):
+    """Test page for debugging"""
+    return templates.TemplateResponse('test.html', {'request': request})
+
+async def status(request):
+    """Get server status"""
+    return JSONResponse(await run_blocking(handlers.status))
+
+async def metrics(request):
+    """Prometheus text exposition of the server's counters, gauges and histograms"""
+    return Response(METRICS.render(), media_type=METRICS_CONTENT_TYPE)
+
+async def change_model(request):
+    """Change the default Whisper model (resident models stay loaded for in-flight work)"""
+    payload, status_code = handlers.change_model(await request.json())
+    return JSONResponse(payload, status_code=status_code)
+
+def client_host(request):
+    return request.client.host if request.client else 'unknown'
+
+def save_to(file):
+    """Store a multipart upload at the path the handler picks"""
+    def save(path):
+        with open(path, 'wb') as out:
+            shutil.copyfileobj(file.file, out)
+    return save
+
+async def create_job(request):
+    """Queue a file for background transcription and return its job ID immediately"""
+    form = await request.form()
+    file = form.get('file')
+    if isinstance(file, str):
+        file = None
+    payload, status_code = await run_blocking(
+        handlers.create_job,
+        file.filename if file else None,
+        save_to(file),
+        form.get('model'),
+        form.get('language', 'auto'),
+        client_host(request)
+    )
+    return JSONResponse(payload, status_code=status_code)
+
+async def get_job(request):
+    """Job status, transcript so far and timings (?since=N returns segments from index N)"""
+    try:
+        since = int(request.query_params.get('since', 0))
+    except ValueError:
+        since = 0
+    payload, status_code = await run_blocking(handlers.get_job, request.path_params['job_id'], since)
+    return JSONResponse(payload, status_code=status_code)
+
+async def delete_job(request):
+    """Cancel a queued or running job, or delete a finished one"""
+    payload, status_code = await run_blocking(handlers.delete_job, request.path_params['job_id'])
+    return JSONResponse(payload, status_code=status_code)
+
+async def transcribe_file(request):
+    """Handle file upload and transcription, streaming progress as server-sent events"""
+    form = await request.form()
+    file = form.get('file')
+    if file is None or isinstance(file, str):
+        return Response(sse({'status': 'error', 'message': 'No file provided'}), media_type='text/event-stream')
+
+    temp_path = handlers.upload_temp_path(file.filename)
+    await run_blocking(save_to(file), temp_path)
+
+    # Uploads are scheduled per uploader so one user's batch can't starve live sessions
+    steps = handlers.upload_steps(f"upload:{client_host(request)}", temp_path, form.get('model'),
+                                  form.get('language', 'auto'))
+    return StreamingResponse(stream_steps(steps), media_type='text/event-stream')
+
+# ---------------------------------------------------------------------------
+# Socket.IO events
+# ---------------------------------------------------------------------------
+
+@sio.event
+async def connect(sid, environ, auth=None):
+    """Handle client connection"""
+    handlers.connect(sid)
+
+@sio.event
+async def disconnect(sid):
+    """Handle client disconnection"""
+    handlers.disconnect(sid)
+
+@sio.on('set_model')
+async def handle_set_model(sid, data):
+    """Pick the model for this client's live audio without touching the server default"""
+    handlers.set_model(sid, data)
+
+@sio.on('audio_data')
+async def handle_audio_data(sid, data):
+    """Handle incoming audio data"""
+    await run_blocking(handlers.audio_data, sid, data)
+
+@sio.on('audio_pcm')
+async def handle_audio_pcm(sid, payload):
+    """Handle binary PCM16 frames: 8-byte header (sequence, sample rate) + int16 samples"""
+    # Decoded in place on the loop: no disk, and cheaper than a trip to the executor
+    handlers.audio_pcm(sid, payload)
+
+@sio.on('stream_start')
+async def handle_stream_start(sid, data=None):
+    """Switch this client's audio_pcm frames to rolling-window streaming mode"""
+    handlers.stream_start(sid)
+
+@sio.on('stream_stop')
+async def handle_stream_stop(sid, data=None):
+    """Leave streaming mode, committing whatever is still pending"""
+    handlers.stream_stop(sid)
+
+@sio.on('audio_blob')
+async def handle_audio_blob(sid, data):
+    """Handle complete audio recording"""
+    await run_blocking(handlers.audio_blob, sid, data)
+
+@sio.on('save_transcript')
+async def handle_save_transcript(sid, data):
+    """Save transcript to file"""
+    await run_blocking(handlers.save_transcript, sid, data)
+
+async def on_startup():
+    global loop
+    loop = asyncio.get_running_loop()
+    # Load model in background when server starts
+    handlers.start()
+
+web = Starlette(
+    routes=[
+        Route('/', home),
+        Route('/record', record),
+        Route('/upload', upload),
+        Route('/test', test),
+        Route('/status', status),
+        Route('/metrics', metrics),
+        Route('/change_model', change_model, methods=['POST']),
+        Route('/transcribe_file', transcribe_file, methods=['POST']),
+        Route('/jobs', create_job, methods=['POST']),
+        Route('/jobs/{job_id}', get_job, methods=['GET']),
+        Route('/jobs/{job_id}', delete_job, methods=['DELETE']),
+        Mount('/static', app=StaticFiles(directory='static'), name='static'),
+    ],
+    on_startup=[on_startup],
+)
+
+# Socket.IO handles /socket.io; everything else falls through to the Starlette routes
+app = socketio.ASGIApp(sio, other_asgi_app=web)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="WhisperLive asyncio (ASGI) server")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5000)
+    args = parser.parse_args()
+
+    print("Starting WhisperLive asyncio server...")
+    print(f"Open http://localhost:{args.port} in your browser")
+    uvicorn.run(app, host=args.host, port=args.port, log_level='warning')
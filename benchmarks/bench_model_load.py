@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""Load time and memory of whisper.load_model against the memory-mapped model store.
+
+    python benchmarks/bench_model_load.py --model small
+    python benchmarks/bench_model_load.py --model large-v3 --device cuda --processes 4 --json load.json
+
+Each mode loads the model in a new process and reports load time, RSS
+growth and peak RSS. ``store`` converts the checkpoint first if the store
+has no file for it yet (that one-time cost is reported separately).
+``--processes N`` loads the model in N processes at once and reports the
+host memory in use while they hold it, which shows whether the weights
+are shared through the page cache.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+MODES = ("direct", "store")
+
+
+def available_mb():
+    # MemAvailable from /proc/meminfo (Linux only)
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def run_load(mode, args, hold_seconds=0.0):
+    """Load the model once and measure it (runs in a child process)"""
+    import torch
+    import whisper
+
+    from src.model_store import ModelStore, current_rss_mb, peak_rss_mb
+
+    dtype = torch.float16 if args.device == "cuda" else torch.float32
+    rss_before = current_rss_mb()
+    start = time.perf_counter()
+    if mode == "direct":
+        model = whisper.load_model(args.model, device=args.device)
+        if dtype == torch.float16:
+            model = model.half()
+    else:
+        model = ModelStore(args.store_dir).load(args.model, args.device, dtype)
+    load_seconds = time.perf_counter() - start
+
+    # Touch every weight once, as the first decode would
+    with torch.no_grad():
+        checksum = float(sum(p.float().sum() for p in model.parameters()))
+    first_use_seconds = time.perf_counter() - start - load_seconds
+
+    rss_after = current_rss_mb()
+    # Keep the model alive so parallel loads overlap
+    time.sleep(hold_seconds)
+    return {
+        "mode": mode,
+        "load_seconds": round(load_seconds, 2),
+        "first_use_seconds": round(first_use_seconds, 2),
+        "rss_growth_mb": round(rss_after - rss_before) if rss_before is not None else None,
+        "peak_rss_mb": round(peak_rss_mb()),
+        "checksum": checksum,
+    }
+
+
+def convert(args):
+    import torch
+
+    from src.model_store import ModelStore
+
+    store = ModelStore(args.store_dir)
+    dtype = torch.float16 if args.device == "cuda" else torch.float32
+    if store.path(args.model, dtype).exists():
+        return None
+    start = time.perf_counter()
+    store.convert(args.model, dtype)
+    return round(time.perf_counter() - start, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default="small")
+    parser.add_argument("--device", default=None, help="cuda or cpu (default: cuda when available)")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--store-dir", default="cache/models")
+    parser.add_argument("--processes", type=int, default=1, help="Concurrent loading processes per mode")
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+    if args.device is None:
+        import torch
+        args.device = "cuda" if torch.cuda.is_available() else "cpu"
+
+    convert_seconds = None
+    if "store" in args.modes:
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+            convert_seconds = pool.submit(convert, args).result()
+        if convert_seconds is not None:
+            print(f"One-time conversion: {convert_seconds:.1f}s")
+
+    results = []
+    for mode in args.modes:
+        print(f"Loading {args.model} ({mode}, {args.processes} process(es))...")
+        hold = 5.0 if args.processes > 1 else 0.0
+        available_before = available_mb()
+        with ProcessPoolExecutor(max_workers=args.processes, mp_context=get_context("spawn")) as pool:
+            futures = [pool.submit(run_load, mode, args, hold) for _ in range(args.processes)]
+            # Sampled while the processes hold their models
+            time.sleep(hold * 0.8)
+            available_during = available_mb()
+            loads = [future.result() for future in futures]
+        results.append({
+            "mode": mode,
+            "loads": loads,
+            "host_memory_used_mb": (round(available_before - available_during)
+                                    if hold and available_before is not None else None),
+        })
+
+    print(f"\n{'mode':<8} {'load s':>7} {'first use s':>12} {'RSS +MB':>8} {'peak RSS MB':>12}")
+    for result in results:
+        for load in result["loads"]:
+            growth = load["rss_growth_mb"] if load["rss_growth_mb"] is not None else float("nan")
+            print(f"{result['mode']:<8} {load['load_seconds']:>7.2f} {load['first_use_seconds']:>12.2f} "
+                  f"{growth:>8.0f} {load['peak_rss_mb']:>12.0f}")
+        if result["host_memory_used_mb"] is not None:
+            print(f"{result['mode']:<8} host memory used by {args.processes} processes: "
+                  f"{result['host_memory_used_mb']} MB")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "meta": {
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "model": args.model,
+                    "device": args.device,
+                    "processes": args.processes,
+                    "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                },
+                "convert_seconds": convert_seconds,
+                "results": results,
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
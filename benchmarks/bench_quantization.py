@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""Compare the dynamic int8 CPU model against fp32: speed, memory and transcript drift.
+
+    python benchmarks/bench_quantization.py --model small --samples samples/
+    python benchmarks/bench_quantization.py --model large-v3 --samples a.wav b.wav --json quant.json
+
+Each variant is loaded and run in its own process, so peak RSS is measured
+per model. Every sample is transcribed once to warm up, then timed over
+``--rounds`` runs (median reported). Drift is the word error rate of the
+int8 transcript against the fp32 one, after lower-casing and removing
+punctuation. The int8 checkpoint is cached in ``--cache-dir``; the first
+run also times quantization.
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+AUDIO_EXTENSIONS = {".wav", ".mp3", ".flac", ".m4a", ".ogg", ".webm"}
+
+
+def find_samples(paths):
+    samples = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            samples.extend(sorted(p for p in path.iterdir() if p.suffix.lower() in AUDIO_EXTENSIONS))
+        else:
+            samples.append(path)
+    return samples
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024**2 if sys.platform == "darwin" else peak / 1024
+
+
+def run_variant(model_size, samples, rounds, threads, cache_dir):
+    """Load one model variant and transcribe every sample (runs in a child process)"""
+    import torch
+    import whisper
+
+    from src.backends import WhisperBackend
+
+    if threads:
+        torch.set_num_threads(threads)
+
+    start = time.perf_counter()
+    model = WhisperBackend(cache_dir).load(model_size, "cpu")
+    load_seconds = time.perf_counter() - start
+
+    results = []
+    for path in samples:
+        audio = whisper.load_audio(str(path))
+        options = dict(language="en", temperature=0.0, beam_size=1, fp16=False, condition_on_previous_text=False)
+        text = model.transcribe(audio, **options)["text"].strip()  # Warm-up
+        times = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            model.transcribe(audio, **options)
+            times.append(time.perf_counter() - start)
+        results.append({
+            "sample": str(path),
+            "audio_seconds": round(len(audio) / whisper.audio.SAMPLE_RATE, 2),
+            "median_seconds": round(statistics.median(times), 3),
+            "text": text,
+        })
+
+    return {
+        "model": model_size,
+        "load_seconds": round(load_seconds, 2),
+        "weights_mb": round(model.memory_bytes() / 1024**2, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "samples": results,
+    }
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    from src.stitching import normalize_word
+
+    ref = [w for w in map(normalize_word, reference.split()) if w]
+    hyp = [w for w in map(normalize_word, hypothesis.split()) if w]
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    # Levenshtein distance over words, one row at a time
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref_word != hyp_word)))
+        previous = current
+    return previous[-1] / len(ref)
+
+
+def compare(fp32, int8) -> dict:
+    rows = []
+    print(f"\n{'sample':<36} {'audio s':>8} {'fp32 s':>8} {'int8 s':>8} {'speedup':>8} {'WER':>7}")
+    for base, quant in zip(fp32["samples"], int8["samples"]):
+        speedup = base["median_seconds"] / quant["median_seconds"] if quant["median_seconds"] else 0.0
+        wer = word_error_rate(base["text"], quant["text"])
+        rows.append({"sample": base["sample"], "speedup": round(speedup, 2), "wer": round(wer, 4)})
+        print(f"{Path(base['sample']).name[:36]:<36} {base['audio_seconds']:>8.1f} {base['median_seconds']:>8.2f} "
+              f"{quant['median_seconds']:>8.2f} {speedup:>7.2f}x {wer:>7.2%}")
+
+    fp32_total = sum(s["median_seconds"] for s in fp32["samples"])
+    int8_total = sum(s["median_seconds"] for s in int8["samples"])
+    words = sum(len(s["text"].split()) for s in fp32["samples"])
+    summary = {
+        "speedup": round(fp32_total / int8_total, 2) if int8_total else None,
+        "weights_saved_mb": round(fp32["weights_mb"] - int8["weights_mb"], 1),
+        "peak_rss_saved_mb": round(fp32["peak_rss_mb"] - int8["peak_rss_mb"], 1),
+        # Word-weighted, so short samples don't dominate
+        "wer": round(sum(r["wer"] * len(s["text"].split()) for r, s in zip(rows, fp32["samples"])) / words, 4)
+        if words else 0.0,
+        "samples": rows,
+    }
+
+    print(f"\n{'':<14} {'load s':>8} {'weights MB':>11} {'peak RSS MB':>12}")
+    for result in (fp32, int8):
+        print(f"{result['model']:<14} {result['load_seconds']:>8.2f} {result['weights_mb']:>11.1f} "
+              f"{result['peak_rss_mb']:>12.1f}")
+    print(f"\nint8 is {summary['speedup']}x faster, saves {summary['weights_saved_mb']} MB of weights "
+          f"({summary['peak_rss_saved_mb']} MB peak RSS), transcript drift {summary['wer']:.2%} WER")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default="small", help="Model size (the int8 variant is <size>-int8)")
+    parser.add_argument("--samples", nargs="+", required=True, help="Audio files or directories of them")
+    parser.add_argument("--rounds", type=int, default=3, help="Timed transcriptions per sample")
+    parser.add_argument("--threads", type=int, default=0, help="torch CPU threads (default: torch's choice)")
+    parser.add_argument("--cache-dir", default="cache/models", help="Where the int8 checkpoint is cached")
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    samples = find_samples(args.samples)
+    if not samples:
+        parser.error("no audio samples found")
+
+    results = {}
+    for variant in (args.model, args.model + "-int8"):
+        print(f"Running {variant} on {len(samples)} sample(s)...")
+        # A fresh process per variant: peak RSS must not include the other model
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+            results[variant] = pool.submit(
+                run_variant, variant, samples, args.rounds, args.threads, args.cache_dir
+            ).result()
+
+    summary = compare(results[args.model], results[args.model + "-int8"])
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "meta": {
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "processor": platform.processor(),
+                    "cpus": os.cpu_count(),
+                    "threads": args.threads or None,
+                    "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                },
+                "summary": summary,
+                "variants": results,
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
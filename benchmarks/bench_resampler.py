@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Compare resampling strategies for live chunks and long uploads.
+
+Uploads and recordings (``resample``, ``WavReader``) resample whole blocks
+with scipy's compiled polyphase filter; StreamingResampler trades throughput
+for carrying filter state across live frames and capture blocks.
+
+    python benchmarks/bench_resampler.py --rates 44100 48000 --seconds 600
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import scipy.signal
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.resampler import StreamingResampler, TARGET_SAMPLE_RATE, resample
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def fft_whole(audio, rate):
+    return scipy.signal.resample(audio, int(len(audio) * TARGET_SAMPLE_RATE / rate)).astype(np.float32)
+
+
+def fft_per_chunk(audio, rate, chunk):
+    # What the live path used to do: each chunk resampled on its own
+    return np.concatenate([
+        scipy.signal.resample(audio[i:i + chunk], int(len(audio[i:i + chunk]) * TARGET_SAMPLE_RATE / rate))
+        for i in range(0, len(audio), chunk)
+    ]).astype(np.float32)
+
+
+def poly_whole(audio, rate):
+    resampler = StreamingResampler(rate)
+    return scipy.signal.resample_poly(audio, resampler.up, resampler.down).astype(np.float32)
+
+
+def streaming(audio, rate, chunk):
+    resampler = StreamingResampler(rate)
+    parts = [resampler.process(audio[i:i + chunk]) for i in range(0, len(audio), chunk)]
+    parts.append(resampler.flush())
+    return np.concatenate(parts)
+
+
+def error_vs(reference, result):
+    n = min(len(reference), len(result))
+    return float(np.max(np.abs(reference[:n] - result[:n]))) if n else 0.0
+
+
+def run(rate: int, seconds: float, chunk_seconds: float):
+    rng = np.random.default_rng(0)
+    t = np.arange(int(rate * seconds)) / rate
+    # Speech-band tones plus noise; energy above 8kHz must be filtered out
+    audio = (0.3 * np.sin(2 * np.pi * 440 * t) + 0.2 * np.sin(2 * np.pi * 3000 * t)
+             + 0.05 * rng.standard_normal(len(t))).astype(np.float32)
+    chunk = int(rate * chunk_seconds)
+
+    reference, _, _ = measure(lambda: poly_whole(audio, rate))
+    cases = [
+        ("scipy.resample (whole)", lambda: fft_whole(audio, rate)),
+        (f"scipy.resample ({chunk_seconds:g}s chunks)", lambda: fft_per_chunk(audio, rate, chunk)),
+        ("resample_poly (whole)", lambda: poly_whole(audio, rate)),
+        ("resample (whole, cached filter)", lambda: resample(audio, rate)),
+        (f"StreamingResampler ({chunk_seconds:g}s chunks)", lambda: streaming(audio, rate, chunk)),
+    ]
+
+    print(f"\n{rate} Hz -> {TARGET_SAMPLE_RATE} Hz, {seconds:g}s of audio")
+    print(f"{'method':<36} {'time (s)':>9} {'x realtime':>11} {'peak MB':>9} {'max err':>9}")
+    for name, fn in cases:
+        result, elapsed, peak = measure(fn)
+        print(f"{name:<36} {elapsed:>9.3f} {seconds / elapsed:>11.0f} "
+              f"{peak / 1024**2:>9.1f} {error_vs(reference, result):>9.1e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rates", type=int, nargs="+", default=[44100, 48000, 22050, 8000])
+    parser.add_argument("--seconds", type=float, default=60.0)
+    parser.add_argument("--chunk-seconds", type=float, default=0.5)
+    args = parser.parse_args()
+
+    for rate in args.rates:
+        run(rate, args.seconds, args.chunk_seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""Compare connection capacity and tail latency of the threading and asyncio servers.
+
+Start each server on its own port, then point the benchmark at both:
+
+    python app.py                          # threading mode, port 5000
+    python asgi_app.py --port 5001         # asyncio mode
+    python benchmarks/bench_server_modes.py --url http://localhost:5000 --url http://localhost:5001 --clients 500
+
+Round trips use the cheap set_model/model_set event pair so the numbers
+measure the server's event handling, not Whisper.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import aiohttp
+import socketio
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def connect_client(url, timeout):
+    client = socketio.AsyncClient(reconnection=False)
+    replies = asyncio.Queue()
+    client.on('model_set', lambda data: replies.put_nowait(time.perf_counter()))
+    start = time.perf_counter()
+    try:
+        await asyncio.wait_for(client.connect(url, transports=['websocket']), timeout)
+    except Exception:
+        return None, None, None
+    return client, replies, time.perf_counter() - start
+
+
+async def round_trips(client, replies, count, timeout):
+    latencies = []
+    for _ in range(count):
+        sent = time.perf_counter()
+        await client.emit('set_model', {'model': None})
+        try:
+            received = await asyncio.wait_for(replies.get(), timeout)
+        except asyncio.TimeoutError:
+            continue
+        latencies.append(received - sent)
+    return latencies
+
+
+async def http_latencies(url, count):
+    latencies = []
+    async with aiohttp.ClientSession() as session:
+        for _ in range(count):
+            start = time.perf_counter()
+            async with session.get(f"{url}/status") as response:
+                await response.read()
+            latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def summarize(values):
+    if not values:
+        return {'count': 0}
+    return {
+        'count': len(values),
+        'p50_ms': round(percentile(values, 50) * 1000, 2),
+        'p95_ms': round(percentile(values, 95) * 1000, 2),
+        'p99_ms': round(percentile(values, 99) * 1000, 2),
+        'max_ms': round(max(values) * 1000, 2),
+        'mean_ms': round(statistics.fmean(values) * 1000, 2),
+    }
+
+
+async def run(url, clients, rounds, connect_timeout, reply_timeout, status_requests):
+    # Ramp all connections at once: capacity is how many the server accepts in time
+    started = time.perf_counter()
+    results = await asyncio.gather(*(connect_client(url, connect_timeout) for _ in range(clients)))
+    connect_wall = time.perf_counter() - started
+    connected = [(client, replies) for client, replies, _ in results if client is not None]
+    connect_times = [elapsed for client, _, elapsed in results if client is not None]
+
+    # Every connected client does its round trips concurrently; tail latency is the point
+    per_client = await asyncio.gather(*(round_trips(client, replies, rounds, reply_timeout)
+                                        for client, replies in connected))
+    event_latencies = [latency for latencies in per_client for latency in latencies]
+
+    status = await http_latencies(url, status_requests) if status_requests else []
+
+    await asyncio.gather(*(client.disconnect() for client, _ in connected), return_exceptions=True)
+
+    return {
+        'url': url,
+        'clients': clients,
+        'connected': len(connected),
+        'connect_wall_s': round(connect_wall, 3),
+        'connect': summarize(connect_times),
+        'round_trip': summarize(event_latencies),
+        'round_trips_lost': len(connected) * rounds - len(event_latencies),
+        'status': summarize(status),
+    }
+
+
+def print_report(report):
+    print(f"\n{report['url']}")
+    print(f"  connected {report['connected']}/{report['clients']} in {report['connect_wall_s']}s")
+    for name in ('connect', 'round_trip', 'status'):
+        stats = report[name]
+        if not stats['count']:
+            continue
+        print(f"  {name:<11} n={stats['count']:<6} p50={stats['p50_ms']}ms p95={stats['p95_ms']}ms "
+              f"p99={stats['p99_ms']}ms max={stats['max_ms']}ms")
+    if report['round_trips_lost']:
+        print(f"  round trips timed out: {report['round_trips_lost']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", action="append", required=True, help="Server base URL (repeatable)")
+    parser.add_argument("--clients", type=int, default=200, help="Concurrent Socket.IO connections")
+    parser.add_argument("--rounds", type=int, default=20, help="Round trips per client")
+    parser.add_argument("--connect-timeout", type=float, default=10.0)
+    parser.add_argument("--reply-timeout", type=float, default=5.0)
+    parser.add_argument("--status-requests", type=int, default=50, help="Sequential GET /status requests")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    reports = []
+    for url in args.url:
+        report = asyncio.run(run(url.rstrip('/'), args.clients, args.rounds, args.connect_timeout,
+                                 args.reply_timeout, args.status_requests))
+        print_report(report)
+        reports.append(report)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(reports, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
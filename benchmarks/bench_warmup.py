@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""First-request and steady-state latency of a freshly loaded model: cold, warmed up, compiled.
+
+    python benchmarks/bench_warmup.py --model small
+    python benchmarks/bench_warmup.py --model large-v3 --wav sample.wav --modes cold warm compiled --json warmup.json
+
+Each mode starts a new process, loads the model, optionally runs the
+server's warm-up (``warm``) or compiles and then warms up (``compiled``), and
+then times real requests: the first one, and the median of ``--rounds``
+after it. Requests go through the live batch path (one chunk of
+``--chunk-seconds``) and the full transcribe path. Run ``compiled`` twice
+to see how much the compile cache saves on a restart.
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+MODES = ("cold", "warm", "compiled")
+
+
+def run_mode(mode, args):
+    """Load, prepare and time one mode (runs in a child process)"""
+    import whisper
+
+    from src.backends import create_backend
+    from src.warmup import prepare_model, synthetic_speech
+
+    if args.wav:
+        audio = whisper.load_audio(args.wav)
+    else:
+        audio = synthetic_speech(max(args.chunk_seconds, 30.0), seed=1)
+    chunk = audio[:int(args.chunk_seconds * whisper.audio.SAMPLE_RATE)]
+
+    start = time.perf_counter()
+    model = create_backend(args.backend).load(args.model, args.device)
+    load_seconds = time.perf_counter() - start
+
+    prepare_seconds = 0.0
+    if mode != "cold":
+        start = time.perf_counter()
+        prepare_model(model, chunk_seconds=[args.chunk_seconds], batch_sizes=(1,),
+                      compile=(mode == "compiled"), compile_cache_dir=args.compile_cache_dir)
+        prepare_seconds = time.perf_counter() - start
+
+    requests = {
+        "live_chunk": lambda: model.transcribe_batch([chunk], language="en"),
+        "transcribe": lambda: model.transcribe(audio, language="en", temperature=0.0, word_timestamps=True),
+    }
+    timings = {}
+    for name, request in requests.items():
+        times = []
+        for _ in range(args.rounds + 1):
+            start = time.perf_counter()
+            request()
+            times.append(time.perf_counter() - start)
+        timings[name] = {
+            "first_ms": round(times[0] * 1000, 1),
+            "steady_ms": round(statistics.median(times[1:]) * 1000, 1),
+        }
+    return {
+        "mode": mode,
+        "load_seconds": round(load_seconds, 2),
+        "prepare_seconds": round(prepare_seconds, 2),
+        "requests": timings,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default="small")
+    parser.add_argument("--backend", default="whisper", help="Inference backend (see src/backends.py)")
+    parser.add_argument("--device", default=None, help="cuda or cpu (default: cuda when available)")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--wav", help="Audio to transcribe (default: synthetic speech-like signal)")
+    parser.add_argument("--chunk-seconds", type=float, default=1.0, help="Live chunk length")
+    parser.add_argument("--rounds", type=int, default=5, help="Requests timed after the first one")
+    parser.add_argument("--compile-cache-dir", default="cache/compile")
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+    if args.device is None:
+        import torch
+        args.device = "cuda" if torch.cuda.is_available() else "cpu"
+
+    results = []
+    for mode in args.modes:
+        print(f"Running {args.model} ({mode})...")
+        # A fresh process per mode: nothing may be warm from the previous one
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+            results.append(pool.submit(run_mode, mode, args).result())
+
+    print(f"\n{'mode':<10} {'load s':>7} {'prepare s':>10} {'request':<12} {'first ms':>10} {'steady ms':>10}")
+    for result in results:
+        for name, timing in result["requests"].items():
+            print(f"{result['mode']:<10} {result['load_seconds']:>7.2f} {result['prepare_seconds']:>10.2f} "
+                  f"{name:<12} {timing['first_ms']:>10.1f} {timing['steady_ms']:>10.1f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "meta": {
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "model": args.model,
+                    "backend": args.backend,
+                    "device": args.device,
+                    "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                },
+                "results": results,
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
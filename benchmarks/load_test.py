@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""Simulate many concurrent recorders against a running server.
+
+Each client streams WAV files at real-time pace through the same events the
+browser scripts use: ``audio_data`` (1 s chunks, like audio.js) or
+``audio_blob`` (longer WAV recordings, like audio-wav.js). Replies are
+matched to requests by the ``id`` field the server echoes back.
+
+On a CPU-only box, start the server with the tiny model:
+
+    WHISPERLIVE_MODEL=tiny python app.py
+    python benchmarks/load_test.py --wav samples/*.wav --clients 8 --seconds 60
+"""
+
+import argparse
+import asyncio
+import base64
+import io
+import json
+import time
+import wave
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+import socketio
+
+
+@dataclass
+class Results:
+    connect_failures: int = 0
+    sent: int = 0
+    answered: int = 0
+    empty: int = 0
+    merged: int = 0
+    dropped: int = 0
+    errors: int = 0
+    timeouts: int = 0
+    audio_seconds_answered: float = 0.0
+    latencies: List[float] = field(default_factory=list)
+    error_messages: dict = field(default_factory=dict)
+
+
+def load_wav(path: str) -> Tuple[tuple, bytes]:
+    with wave.open(path, "rb") as wav:
+        return wav.getparams(), wav.readframes(wav.getnframes())
+
+
+def wav_bytes(params, frames: bytes) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(params.nchannels)
+        wav.setsampwidth(params.sampwidth)
+        wav.setframerate(params.framerate)
+        wav.writeframes(frames)
+    return buffer.getvalue()
+
+
+def split_pieces(recordings, piece_seconds: float, total_seconds: float):
+    """Cut the recordings (looped) into WAV pieces until ``total_seconds`` of audio"""
+    pieces = []
+    elapsed = 0.0
+    while elapsed < total_seconds:
+        for params, frames in recordings:
+            frame_bytes = params.sampwidth * params.nchannels
+            step = int(piece_seconds * params.framerate) * frame_bytes
+            for start in range(0, len(frames), step):
+                chunk = frames[start:start + step]
+                seconds = len(chunk) / frame_bytes / params.framerate
+                pieces.append((wav_bytes(params, chunk), seconds))
+                elapsed += seconds
+                if elapsed >= total_seconds:
+                    return pieces
+        if not recordings:
+            break
+    return pieces
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def run_client(index: int, args, pieces, results: Results):
+    client = socketio.AsyncClient(reconnection=False)
+    loop = asyncio.get_running_loop()
+    pending = {}
+
+    def reply(kind):
+        async def handler(data):
+            future = pending.pop(data.get("id"), None)
+            if future is not None and not future.done():
+                future.set_result((kind, time.perf_counter(), data))
+        return handler
+
+    client.on("transcription", reply("transcription"))
+    client.on("error", reply("error"))
+    client.on("audio_dropped", reply("dropped"))
+
+    await asyncio.sleep(args.ramp * index / max(args.clients, 1))
+    try:
+        await asyncio.wait_for(client.connect(args.url, transports=["websocket"]), args.timeout)
+        if args.model:
+            await client.emit("set_model", {"model": args.model})
+    except Exception:
+        results.connect_failures += 1
+        return
+
+    async def await_reply(request_id, future, sent_at, seconds):
+        try:
+            kind, received_at, data = await asyncio.wait_for(future, args.timeout)
+        except asyncio.TimeoutError:
+            pending.pop(request_id, None)
+            results.timeouts += 1
+            return
+        if kind == "error":
+            results.errors += 1
+            message = data.get("message", "")
+            results.error_messages[message] = results.error_messages.get(message, 0) + 1
+            return
+        if kind == "dropped":
+            results.dropped += 1
+            return
+        results.answered += 1
+        results.audio_seconds_answered += seconds
+        results.latencies.append(received_at - sent_at)
+        if data.get("merged_into"):
+            results.merged += 1  # Decoded as part of a later chunk while the server shed load
+        elif not data.get("text"):
+            results.empty += 1
+
+    waiters = []
+    started = time.perf_counter()
+    audio_clock = 0.0
+    for seq, (payload, seconds) in enumerate(pieces):
+        # A piece can only be sent once it has been "recorded"
+        audio_clock += seconds
+        await asyncio.sleep(max(0.0, started + audio_clock - time.perf_counter()))
+
+        request_id = f"{index}-{seq}"
+        future = loop.create_future()
+        pending[request_id] = future
+        encoded = base64.b64encode(payload).decode("ascii")
+        if args.mode == "chunk":
+            message = ("audio_data", {"audio": encoded, "format": "wav", "id": request_id})
+        else:
+            message = ("audio_blob", {"audio": encoded, "mimeType": "audio/wav", "duration": seconds,
+                                      "model": args.model, "id": request_id})
+        sent_at = time.perf_counter()
+        try:
+            await client.emit(*message)
+        except Exception:
+            pending.pop(request_id, None)
+            results.errors += 1
+            continue
+        results.sent += 1
+        waiters.append(asyncio.create_task(await_reply(request_id, future, sent_at, seconds)))
+
+    await asyncio.gather(*waiters)
+    await client.disconnect()
+
+
+def report(args, results: Results, wall: float) -> dict:
+    latencies = results.latencies
+    summary = {
+        "url": args.url,
+        "mode": args.mode,
+        "clients": args.clients,
+        "model": args.model,
+        "wall_seconds": round(wall, 2),
+        "connect_failures": results.connect_failures,
+        "sent": results.sent,
+        "answered": results.answered,
+        "empty": results.empty,
+        "merged": results.merged,
+        "dropped": results.dropped,
+        "errors": results.errors,
+        "timeouts": results.timeouts,
+        "error_rate": round(results.errors / results.sent, 4) if results.sent else 0.0,
+        "timeout_rate": round(results.timeouts / results.sent, 4) if results.sent else 0.0,
+        "throughput_rps": round(results.answered / wall, 2) if wall else 0.0,
+        "audio_x_realtime": round(results.audio_seconds_answered / wall, 2) if wall else 0.0,
+        "time_to_transcript_ms": {
+            name: round(percentile(latencies, pct) * 1000, 1) if latencies else None
+            for name, pct in (("p50", 50), ("p90", 90), ("p95", 95), ("p99", 99), ("max", 100))
+        },
+        "error_messages": results.error_messages,
+    }
+
+    print(f"\n{args.clients} clients, {args.mode} mode, model {args.model or 'server default'} -> {args.url}")
+    print(f"  sent {results.sent}, answered {results.answered} ({results.empty} empty, {results.merged} merged), "
+          f"dropped {results.dropped}, "
+          f"errors {results.errors}, timeouts {results.timeouts}, connect failures {results.connect_failures}")
+    print(f"  throughput {summary['throughput_rps']} replies/s, {summary['audio_x_realtime']}x realtime audio")
+    ttt = summary["time_to_transcript_ms"]
+    if latencies:
+        print(f"  time to transcript p50={ttt['p50']}ms p90={ttt['p90']}ms p95={ttt['p95']}ms "
+              f"p99={ttt['p99']}ms max={ttt['max']}ms")
+    for message, count in sorted(results.error_messages.items(), key=lambda kv: -kv[1])[:5]:
+        print(f"  error x{count}: {message}")
+    return summary
+
+
+async def main_async(args):
+    recordings = [load_wav(path) for path in args.wav]
+    piece_seconds = args.chunk_seconds if args.mode == "chunk" else args.blob_seconds
+    pieces = split_pieces(recordings, piece_seconds, args.seconds)
+
+    results = Results()
+    started = time.perf_counter()
+    await asyncio.gather(*(run_client(i, args, pieces, results) for i in range(args.clients)))
+    return report(args, results, time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:5000")
+    parser.add_argument("--wav", nargs="+", required=True, help="WAV files to stream (looped)")
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--mode", choices=("chunk", "blob"), default="chunk",
+                        help="audio_data chunks (audio.js) or audio_blob recordings (audio-wav.js)")
+    parser.add_argument("--seconds", type=float, default=30.0, help="Audio streamed per client")
+    parser.add_argument("--chunk-seconds", type=float, default=1.0)
+    parser.add_argument("--blob-seconds", type=float, default=5.0)
+    parser.add_argument("--model", default="tiny", help="Model each client asks for ('' for the server default)")
+    parser.add_argument("--ramp", type=float, default=2.0, help="Seconds over which clients connect")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Seconds to wait for each reply")
+    parser.add_argument("--json", help="Also write the summary to this file")
+    args = parser.parse_args()
+    args.model = args.model or None
+
+    summary = asyncio.run(main_async(args))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
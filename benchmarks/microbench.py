@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""Time the audio and pre-processing hot paths, with baseline comparison.
+
+    python benchmarks/microbench.py --json results.json
+    python benchmarks/microbench.py --baseline results.json --threshold 0.15
+    python benchmarks/microbench.py --only resample log_mel
+
+Each stage runs on representative input sizes (browser/device block sizes up
+to a full Whisper window). A case is timed in repeated rounds of at least
+``--min-time`` seconds and the median per-call time is reported. With
+``--baseline``, cases slower than the baseline by more than ``--threshold``
+are listed as regressions and the exit status is 1.
+"""
+
+import argparse
+import base64
+import json
+import platform
+import statistics
+import struct
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+SAMPLE_RATE = 16000
+# 20 ms device block, 100 ms browser frame, 1 s live chunk, 30 s Whisper window
+BLOCK_SECONDS = (0.02, 0.1, 1.0, 30.0)
+
+STAGES = {}
+
+
+def stage(name):
+    """Register a function yielding ``(case, fn, audio_seconds)`` for each input size"""
+    def register(fn):
+        STAGES[name] = fn
+        return fn
+    return register
+
+
+def speech_like(seconds: float, rate: int = SAMPLE_RATE, seed: int = 0) -> np.ndarray:
+    # Tones plus noise with a slow amplitude envelope: realistic value ranges for the DSP paths
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * rate)) / rate
+    envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 3 * t)
+    audio = envelope * (0.3 * np.sin(2 * np.pi * 220 * t) + 0.1 * np.sin(2 * np.pi * 1800 * t))
+    return (audio + 0.02 * rng.standard_normal(len(t))).astype(np.float32)
+
+
+def pcm16(audio: np.ndarray) -> bytes:
+    return (np.clip(audio, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+
+
+def size_label(seconds: float) -> str:
+    return f"{seconds * 1000:g}ms" if seconds < 1 else f"{seconds:g}s"
+
+
+@stage("base64_decode")
+def bench_base64(args):
+    # audio_data / audio_blob payloads arrive base64-encoded
+    for seconds in BLOCK_SECONDS:
+        encoded = base64.b64encode(pcm16(speech_like(seconds)))
+        yield size_label(seconds), lambda encoded=encoded: base64.b64decode(encoded), seconds
+
+
+@stage("int16_to_float32")
+def bench_int16(args):
+    for seconds in BLOCK_SECONDS:
+        raw = pcm16(speech_like(seconds))
+        yield (f"astype/{size_label(seconds)}",
+               lambda raw=raw: np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0, seconds)
+
+
+@stage("pcm_frame_decode")
+def bench_pcm_frame(args):
+    from src.pcm_stream import PCMStreamDecoder
+
+    for rate in (16000, 48000):
+        for seconds in BLOCK_SECONDS[:3]:
+            decoder = PCMStreamDecoder()
+            payload = struct.pack("<II", 0, rate) + pcm16(speech_like(seconds, rate))
+
+            def decode(decoder=decoder, payload=payload):
+                decoder.decode(payload).release()
+            yield f"{rate}Hz/{size_label(seconds)}", decode, seconds
+
+
+@stage("resample")
+def bench_resample(args):
+    from src.resampler import StreamingResampler
+
+    for rate in (44100, 48000):
+        for seconds in BLOCK_SECONDS:
+            resampler = StreamingResampler(rate)
+            block = speech_like(seconds, rate)
+            yield f"{rate}Hz/{size_label(seconds)}", lambda r=resampler, b=block: r.process(b), seconds
+
+
+@stage("capture_callback")
+def bench_capture_callback(args):
+    # AudioCapture._audio_callback: first channel copied into the capture ring
+    from src.audio_handler import AudioCapture
+
+    capture = AudioCapture()
+    capture._open_ring()
+    for seconds in BLOCK_SECONDS[:3]:
+        indata = speech_like(seconds, capture.sample_rate).reshape(-1, 1)
+
+        def callback(indata=indata):
+            capture._audio_callback(indata, len(indata), None, None)
+            capture.ring.consume(capture.ring.available())
+        yield size_label(seconds), callback, seconds
+
+
+@stage("speech_detector")
+def bench_speech_detector(args):
+    # No-speech pre-classifier run on every live chunk and recording window
+    from src.vad import SpeechDetector
+
+    for seconds in BLOCK_SECONDS[1:]:
+        detector = SpeechDetector()
+        audio = speech_like(seconds)
+        yield size_label(seconds), lambda d=detector, a=audio: d.is_speech(a), seconds
+
+
+@stage("accumulate")
+def bench_accumulate(args):
+    # AudioCapture._process_audio: blocks go through the ring and are copied into the chunk in place
+    from src.ring_buffer import AudioRingBuffer
+
+    for block_seconds in BLOCK_SECONDS[:2]:
+        blocks = [speech_like(block_seconds, seed=i) for i in range(int(round(1.0 / block_seconds)))]
+        ring = AudioRingBuffer(2 * 16000)
+
+        def accumulate(blocks=blocks, ring=ring):
+            chunk = np.empty(16000, dtype=np.float32)
+            filled = 0
+            for block in blocks:
+                ring.write(block)
+                view = ring.peek(ring.available())
+                chunk[filled:filled + len(view)] = view
+                filled += len(view)
+                ring.consume(len(view))
+            return chunk
+        yield f"1s_of_{size_label(block_seconds)}", accumulate, 1.0
+
+
+@stage("log_mel")
+def bench_log_mel(args):
+    import whisper
+
+    for seconds in BLOCK_SECONDS[2:]:
+        audio = speech_like(seconds)
+        yield (f"{size_label(seconds)}",
+               lambda audio=audio: whisper.log_mel_spectrogram(audio), seconds)
+    # What every live chunk pays: padded to a full 30 s window before the mel
+    audio = speech_like(1.0)
+    yield ("1s_padded",
+           lambda: whisper.log_mel_spectrogram(whisper.pad_or_trim(audio)), 1.0)
+
+    # Streaming sessions: only the new second is framed, then the 30 s window is assembled
+    from src.features import IncrementalLogMel
+
+    features = IncrementalLogMel()
+    features.append(speech_like(30.0))
+
+    def incremental(features=features):
+        features.append(audio)
+        features.window()
+    yield "1s_incremental", incremental, 1.0
+
+
+@stage("confidence")
+def bench_confidence(args):
+    from src.transcriber import WhisperTranscriber
+
+    rng = np.random.default_rng(0)
+    for num_segments in (1, 10, 100):
+        result = {"segments": [
+            {"avg_logprob": float(rng.uniform(-1.0, 0.0)), "tokens": list(range(int(rng.integers(5, 40))))}
+            for _ in range(num_segments)
+        ]}
+        yield (f"{num_segments}_segments",
+               lambda result=result: WhisperTranscriber._calculate_confidence(None, result), None)
+
+
+def time_case(fn, rounds: int, min_time: float) -> dict:
+    fn()  # Warm up caches, lazily built filters and allocator pools
+    per_call = []
+    calls = 0
+    for _ in range(rounds):
+        count = 0
+        start = time.perf_counter()
+        while True:
+            fn()
+            count += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time:
+                break
+        per_call.append(elapsed / count)
+        calls += count
+    return {
+        "median_us": round(statistics.median(per_call) * 1e6, 3),
+        "min_us": round(min(per_call) * 1e6, 3),
+        "calls": calls,
+    }
+
+
+def run(args) -> dict:
+    results = {}
+    for name, cases in STAGES.items():
+        if args.only and name not in args.only:
+            continue
+        try:
+            for case, fn, audio_seconds in cases(args):
+                timing = time_case(fn, args.rounds, args.min_time)
+                if audio_seconds:
+                    timing["x_realtime"] = round(audio_seconds / (timing["median_us"] / 1e6), 1)
+                results[f"{name}/{case}"] = timing
+                realtime = f"{timing['x_realtime']:>12.1f}x" if audio_seconds else ""
+                print(f"{name + '/' + case:<40} {timing['median_us']:>12.2f} {timing['min_us']:>12.2f}{realtime}")
+        except (ImportError, OSError) as e:
+            # Optional dependency (sounddevice/PortAudio, whisper) missing on this machine
+            print(f"{name:<40} skipped: {e}")
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    regressions = []
+    print(f"\n{'case':<40} {'baseline us':>12} {'now us':>12} {'change':>8}")
+    for key, timing in results.items():
+        if key not in baseline:
+            continue
+        before = baseline[key]["median_us"]
+        change = timing["median_us"] / before - 1.0 if before else 0.0
+        flag = ""
+        if change > threshold:
+            regressions.append(key)
+            flag = "  REGRESSION"
+        elif change < -threshold:
+            flag = "  faster"
+        print(f"{key:<40} {before:>12.2f} {timing['median_us']:>12.2f} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", nargs="+", choices=sorted(STAGES), help="Stages to run (default: all)")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="Seconds per timing round")
+    parser.add_argument("--json", help="Write results to this file")
+    parser.add_argument("--baseline", help="Compare against results saved with --json")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed slowdown before flagging (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    print(f"{'case':<40} {'median us':>12} {'min us':>12} {'realtime':>13}")
+    results = run(args)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "meta": {
+                    "python": platform.python_version(),
+                    "numpy": np.__version__,
+                    "machine": platform.machine(),
+                    "processor": platform.processor(),
+                    "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                },
+                "results": results,
+            }, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
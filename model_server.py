@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+WhisperLive model server
+Owns the Whisper weights and runs inference for any number of web processes
+started with WHISPERLIVE_BACKEND=remote (see src/model_server.py)
+"""
+
+import argparse
+
+from src.config import SERVER_CONFIG
+from src.inference import build_registry
+from src.model_server import ModelServer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WhisperLive model server")
+    parser.add_argument('--socket', default=SERVER_CONFIG["model_server_socket"], help="Unix socket to listen on")
+    parser.add_argument('--backend', default=SERVER_CONFIG["model_server_backend"],
+                        help="Inference backend the models are loaded with (see src/backends.py)")
+    parser.add_argument('--preload', default=SERVER_CONFIG["default_model"],
+                        help="Model loaded (and pinned) before accepting connections; empty for none")
+    args = parser.parse_args()
+    if args.backend == "remote":
+        parser.error("the model server needs a local backend")
+
+    registry = build_registry(args.backend)
+    if args.preload:
+        registry.get(args.preload)
+        registry.set_pinned(args.preload)
+        print(f"Model {args.preload} loaded on {registry.device}")
+
+    try:
+        ModelServer(registry, args.socket).serve_forever()
+    except KeyboardInterrupt:
+        print("Model server stopped")
+
+
+if __name__ == '__main__':
+    main()
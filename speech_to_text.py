@@ -15,7 +15,8 @@ from src.audio_handler import AudioCapture, AudioDevice
 from src.transcriber import WhisperTranscriber
 from src.display import TerminalDisplay
 from src.utils import TranscriptManager, SystemMonitor, check_dependencies, cleanup_old_transcripts
-from src.config import UI_CONFIG, SHORTCUTS, PERFORMANCE
+from src.stitching import TranscriptStitcher, chunk_words, has_word_timings
+from src.config import UI_CONFIG, SHORTCUTS, PERFORMANCE, AUDIO_CONFIG, WHISPER_CONFIG
 
 import numpy as np
 import platform
@@ -98,6 +99,9 @@ class SpeechToTextApp:
         self.last_transcription = ""
         self.accumulated_text = []
         
+        # Chunks overlap; word timestamps tell which words are new
+        self.stitcher = TranscriptStitcher(AUDIO_CONFIG.get("chunk_overlap", 0.0))
+        
         # Auto-save
         self.last_autosave = time.time()
         
@@ -125,6 +129,9 @@ class SpeechToTextApp:
             
             # Audio capture
             self.audio_capture = AudioCapture()
+            if not WHISPER_CONFIG["word_timestamps"]:
+                # Overlapping chunks can't be de-duplicated without word timings
+                self.audio_capture.chunk_overlap = 0.0
             
             # Check microphone permission
             has_permission, msg = self.audio_capture.check_microphone_permission()
@@ -221,7 +228,7 @@ class SpeechToTextApp:
             self.keyboard_handler.add_hotkey(SHORTCUTS["toggle_timestamps"], self.toggle_timestamps)
             self.keyboard_handler.add_hotkey(SHORTCUTS["change_device"], self.change_device)
         
-    def process_audio_chunk(self, audio_data: np.ndarray):
+    def process_audio_chunk(self, audio_data: np.ndarray, offset: float = 0.0):
         if not self.is_recording:
             return
             
@@ -238,7 +245,26 @@ class SpeechToTextApp:
         self.display.set_audio_level(level)
         
         # Queue for transcription
-        self.transcription_queue.put(audio_data)
+        self.transcription_queue.put((audio_data, offset))
+        
+    def new_text(self, result) -> str:
+        # Only the words this chunk adds beyond the overlap with the previous one
+        if has_word_timings(result.segments):
+            words = chunk_words(result.segments, result.offset)
+            return self.stitcher.add(words, result.offset + result.duration)
+        # Nothing decoded (or no word timings): nothing will re-cover the held-back words
+        held = self.stitcher.flush()
+        return f"{held} {result.text}".strip()
+        
+    def add_text(self, text: str, confidence: float, timestamp: float):
+        if not text:
+            return
+            
+        # Add to display
+        self.display.add_transcription(text, confidence, timestamp)
+        
+        # Accumulate for saving
+        self.accumulated_text.append(text)
         
     def on_voice_activity_change(self, is_speaking: bool):
         # Could add visual indicator for voice activity
@@ -251,27 +277,19 @@ class SpeechToTextApp:
         while self.is_running:
             try:
                 # Get audio from queue
-                audio_data = self.transcription_queue.get(timeout=0.1)
+                audio_data, offset = self.transcription_queue.get(timeout=0.1)
                 processed_count += 1
                 
                 print(f"Transcribing audio chunk {processed_count}: shape={audio_data.shape}")
                 
                 # Transcribe
-                result = self.transcriber.transcribe(audio_data)
+                result = self.transcriber.transcribe(audio_data, offset)
                 
                 if result:
                     print(f"Transcription result: text='{result.text}', confidence={result.confidence:.2f}")
                     
-                    if result.text and not result.text.startswith("[Error"):
-                        # Add to display
-                        self.display.add_transcription(
-                            result.text,
-                            result.confidence,
-                            result.timestamp
-                        )
-                        
-                        # Accumulate for saving
-                        self.accumulated_text.append(result.text)
+                    if not result.text.startswith("[Error"):
+                        self.add_text(self.new_text(result), result.confidence, result.timestamp)
                     
                     # Show processing time in debug mode
                     if UI_CONFIG.get("show_processing_time"):
@@ -315,6 +333,8 @@ class SpeechToTextApp:
             return
             
         try:
+            self.stitcher.reset()  # Chunk offsets restart at zero
+            self.transcriber.reset_session()
             self.audio_capture.start()
             self.is_recording = True
             self.display.set_recording_status(True)
@@ -332,6 +352,7 @@ class SpeechToTextApp:
         
         # Process remaining audio
         time.sleep(0.5)
+        self.add_text(self.stitcher.flush(), 1.0, time.time())
         
     def save_transcript(self):
         transcript = self.display.get_full_transcript()
@@ -1,12 +1,13 @@
 import sounddevice as sd
 import numpy as np
-import queue
 import threading
 import time
 from typing import Optional, Callable, List, Tuple
 from dataclasses import dataclass
 
 from .config import AUDIO_CONFIG
+from .resampler import StreamingResampler
+from .ring_buffer import AudioRingBuffer, LevelMeter
 
 
 @dataclass
@@ -21,18 +22,27 @@ class AudioDevice:
 class AudioCapture:
     def __init__(self, device_index: Optional[int] = None):
         self.sample_rate = AUDIO_CONFIG["sample_rate"]
+        self.capture_rate = self.sample_rate  # Rate the device stream is opened at
+        self.resampler: Optional[StreamingResampler] = None
         self.channels = AUDIO_CONFIG["channels"]
         self.chunk_duration = AUDIO_CONFIG["chunk_duration"]
+        self.chunk_overlap = AUDIO_CONFIG.get("chunk_overlap", 0.0)
         self.buffer_duration = AUDIO_CONFIG["buffer_duration"]
+        self.block_duration = AUDIO_CONFIG.get("block_duration", 0.02)
         self.device_index = device_index
         
-        self.audio_queue = queue.Queue()
+        # Capture-rate samples from the PortAudio callback; replaced on every start()
+        self.ring: Optional[AudioRingBuffer] = None
+        self.meter: Optional[LevelMeter] = None
+        self.stream_errors = 0  # Callback status flags (input overflows etc.), reported by the consumer
+        self.last_status = None
         self.is_recording = False
         self.stream = None
         self.thread = None
         
         # Voice Activity Detection
         self.silence_threshold = AUDIO_CONFIG["silence_threshold"]
+        self.vad_window = AUDIO_CONFIG.get("vad_window", 0.3)
         self.is_speaking = False
         self.silence_start = None
         
@@ -43,10 +53,6 @@ class AudioCapture:
         self.on_audio_chunk: Optional[Callable] = None
         self.on_vad_change: Optional[Callable] = None
         
-        # Buffer for smooth audio
-        self.buffer_size = int(self.sample_rate * self.buffer_duration)
-        self.audio_buffer = np.zeros(self.buffer_size, dtype=np.float32)
-        
     def _configure_platform(self):
         import platform
         system = platform.system()
@@ -78,51 +84,50 @@ class AudioCapture:
         
         return devices
     
+    def _native_rate(self) -> int:
+        # Capture at the device's own rate and resample to 16kHz ourselves,
+        # rather than relying on the host API's converter (or failing to open)
+        if not AUDIO_CONFIG.get("capture_native_rate", True):
+            return self.sample_rate
+        try:
+            return int(sd.query_devices(self.device_index, 'input')['default_samplerate'])
+        except Exception:
+            return self.sample_rate
+
     def select_device(self, device_index: int):
         if self.is_recording:
             self.stop()
         self.device_index = device_index
         
     def _audio_callback(self, indata, frames, time, status):
+        # Runs on the PortAudio thread: no printing, locking or buffer allocation here.
+        # The first channel (mono) is copied straight into the ring.
         if status:
-            print(f"Audio callback status: {status}")
-            
-        # Debug: Check if we're getting audio
-        if hasattr(self, '_callback_count'):
-            self._callback_count += 1
-        else:
-            self._callback_count = 1
-            
-        # Log first few callbacks
-        if self._callback_count <= 5:
-            print(f"Audio callback #{self._callback_count}: shape={indata.shape}, max={np.max(np.abs(indata)):.4f}")
-            
-        # Convert to mono if needed
-        audio_data = indata[:, 0] if indata.shape[1] > 1 else indata.flatten()
-        
-        # Add to queue for processing
-        self.audio_queue.put(audio_data.copy())
+            self.stream_errors += 1
+            self.last_status = status
+        self.ring.write(indata[:, 0])
         
-        # Voice Activity Detection
-        energy = np.sqrt(np.mean(audio_data**2))
-        is_speech = energy > self.silence_threshold
+    def _open_ring(self):
+        # Room for a few chunks, so a slow chunk callback doesn't drop audio
+        ring_seconds = AUDIO_CONFIG.get("ring_seconds", 5.0)
+        capacity = int(self.capture_rate * max(ring_seconds, 2 * self.chunk_duration))
+        self.ring = AudioRingBuffer(capacity)
+        self.meter = LevelMeter(self.ring, int(self.capture_rate * self.vad_window))
         
-        if is_speech != self.is_speaking:
-            self.is_speaking = is_speech
-            if self.on_vad_change:
-                self.on_vad_change(is_speech)
-                
     def start(self):
         if self.is_recording:
             return
             
         try:
+            self.capture_rate = self._native_rate()
+            self.resampler = StreamingResampler(self.capture_rate, self.sample_rate)
+            self._open_ring()
             self.stream = sd.InputStream(
                 device=self.device_index,
                 channels=self.channels,
-                samplerate=self.sample_rate,
+                samplerate=self.capture_rate,
                 callback=self._audio_callback,
-                blocksize=int(self.sample_rate * self.chunk_duration),
+                blocksize=int(self.capture_rate * self.block_duration),  # Small blocks: low capture latency
                 dtype=np.float32
             )
             self.stream.start()
@@ -147,51 +152,77 @@ class AudioCapture:
         if self.thread:
             self.thread.join(timeout=1.0)
             
-        # Clear queue
-        while not self.audio_queue.empty():
-            try:
-                self.audio_queue.get_nowait()
-            except queue.Empty:
-                break
-                
     def _process_audio(self):
-        accumulated_audio = []
-        accumulated_duration = 0
+        chunk_samples = int(self.chunk_duration * self.sample_rate)
+        # Tail of the previous chunk, repeated at the start of the next one so
+        # words cut by a chunk boundary are heard whole at least once
+        overlap_samples = int(self.chunk_overlap * self.sample_rate)
+        overlap = np.zeros(0, dtype=np.float32)
+        position = 0  # Samples of new audio delivered so far this recording
+        # Each chunk is assembled in place in its own array, which is handed to on_audio_chunk
+        chunk = np.empty(chunk_samples, dtype=np.float32)
+        filled = 0
+        reported_drops = reported_errors = 0
         
         while self.is_recording:
             try:
-                # Get audio chunk with timeout
-                audio_chunk = self.audio_queue.get(timeout=0.1)
+                available = self.ring.available()
+                if not available:
+                    time.sleep(self.block_duration / 2)
+                    continue
                 
-                # Accumulate audio
-                accumulated_audio.append(audio_chunk)
-                accumulated_duration += len(audio_chunk) / self.sample_rate
+                # Native-rate samples -> 16kHz, continuous across reads; the ring
+                # view is released only once the resampler is done with it
+                audio_block = self.resampler.process(self.ring.peek(available))
                 
-                # Process when we have enough audio
-                if accumulated_duration >= self.chunk_duration:
-                    combined_audio = np.concatenate(accumulated_audio)
+                while len(audio_block):
+                    n = min(len(audio_block), len(chunk) - len(overlap) - filled)
+                    chunk[len(overlap) + filled:len(overlap) + filled + n] = audio_block[:n]
+                    filled += n
+                    audio_block = audio_block[n:]
+                    if filled < chunk_samples:
+                        break
+                    
+                    offset = (position - len(overlap)) / self.sample_rate
+                    position += chunk_samples
                     
-                    # Send to callback
+                    # Send to callback, with the chunk's start time in the recording
                     if self.on_audio_chunk:
-                        self.on_audio_chunk(combined_audio)
-                        
-                    # Reset accumulator
-                    accumulated_audio = []
-                    accumulated_duration = 0
+                        self.on_audio_chunk(chunk, offset)
+                    
+                    if overlap_samples:
+                        overlap = chunk[-overlap_samples:]
+                    chunk = np.empty(len(overlap) + chunk_samples, dtype=np.float32)
+                    chunk[:len(overlap)] = overlap
+                    filled = 0
+                self.ring.consume(available)
+                
+                self._update_vad()
+                
+                if self.ring.dropped > reported_drops or self.stream_errors > reported_errors:
+                    print(f"Audio capture falling behind: {self.ring.dropped} samples dropped, "
+                          f"{self.stream_errors} stream errors (last: {self.last_status})")
+                    reported_drops, reported_errors = self.ring.dropped, self.stream_errors
                     
-            except queue.Empty:
-                continue
             except Exception as e:
                 print(f"Error processing audio: {e}")
                 
+    def _update_vad(self):
+        # Voice Activity Detection on the meter's window, off the audio thread
+        _, rms = self.meter.read()
+        is_speech = rms > self.silence_threshold
+        
+        if is_speech != self.is_speaking:
+            self.is_speaking = is_speech
+            if self.on_vad_change:
+                self.on_vad_change(is_speech)
+                
+    def get_levels(self) -> Tuple[float, float]:
+        """Peak and RMS of the latest ``vad_window`` seconds, without consuming any audio"""
+        return self.meter.read() if self.meter is not None else (0.0, 0.0)
+        
     def get_level(self) -> float:
-        try:
-            # Get latest audio without blocking
-            audio_data = self.audio_queue.get_nowait()
-            self.audio_queue.put(audio_data)  # Put it back
-            return float(np.sqrt(np.mean(audio_data**2)))
-        except queue.Empty:
-            return 0.0
+        return self.get_levels()[1]
             
     def check_microphone_permission(self) -> Tuple[bool, str]:
         try:
@@ -199,7 +230,7 @@ class AudioCapture:
             test_stream = sd.InputStream(
                 device=self.device_index,
                 channels=1,
-                samplerate=self.sample_rate,
+                samplerate=self._native_rate(),
                 blocksize=1024
             )
             # Immediately close it
@@ -0,0 +1,350 @@
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from .features import N_FFT, HOP_LENGTH, N_SAMPLES, SAMPLE_RATE
+from .model_registry import base_model_size, estimate_model_bytes, is_quantized, model_n_mels
+
+# torch and whisper are imported where a Whisper model is loaded or run, so
+# the fake and remote backends work without them
+
+# model.transcribe's temperature fallback schedule
+FALLBACK_TEMPERATURES = (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)
+
+
+@dataclass(frozen=True)
+class BackendCapabilities:
+    batched: bool  # transcribe_batch decodes the whole batch in one pass
+    mel_input: bool  # transcribe_mel and detect_language take precomputed log-mel windows
+    word_timestamps: bool
+    multilingual: bool
+    n_mels: int
+    max_prompt_tokens: int
+
+
+class BackendModel:
+    """A loaded model of some inference engine.
+
+    Results use model.transcribe's format (``text``, ``segments``,
+    ``language``) so callers don't depend on the engine. Not thread-safe:
+    callers serialize decodes per model (the registry entry lock).
+    """
+
+    model_size: str
+    capabilities: BackendCapabilities
+    tokenizer = None  # encode(text) -> tokens, decode(tokens) -> text; used for prompts
+
+    def transcribe(self, audio: np.ndarray, **options) -> dict:
+        """Whole array, any length; ``options`` as for model.transcribe (unknown ones are ignored)"""
+        raise NotImplementedError
+
+    def transcribe_batch(self, audios: List[np.ndarray], language: Optional[str] = None,
+                         prompt: Optional[str] = None) -> List[dict]:
+        """Chunks of at most 30 s, without timestamps; one dict per chunk with ``text``,
+        ``language``, ``no_speech_prob`` and ``avg_logprob``"""
+        raise NotImplementedError
+
+    def transcribe_mel(self, mel, num_frames: int, language: str, prompt: Union[str, List[int], None],
+                       temperatures: Sequence[float] = FALLBACK_TEMPERATURES, word_timestamps: bool = True,
+                       **options) -> dict:
+        """One 30 s window whose log-mel is already computed (``capabilities.mel_input``)"""
+        raise NotImplementedError
+
+    def detect_language(self, mel) -> Dict[str, float]:
+        """Language probabilities for a (n_mels, N_FRAMES) window (``capabilities.mel_input``)"""
+        raise NotImplementedError
+
+    def memory_bytes(self) -> int:
+        raise NotImplementedError
+
+    def compile(self) -> bool:
+        """Switch to compiled execution where the engine supports it; False if it doesn't"""
+        return False
+
+
+class InferenceBackend:
+    """Loads models of one inference engine; selected by name in the config"""
+
+    name: str
+    owns_weights = True  # Loaded models hold their weights in this process (the registry budgets them)
+    mel_input = True  # Loaded models take precomputed log-mel windows (BackendCapabilities.mel_input)
+
+    def load(self, model_size: str, device: str) -> BackendModel:
+        raise NotImplementedError
+
+
+def log_mel_batch(audio_batch: "torch.Tensor", n_mels: int) -> "torch.Tensor":
+    # Same as whisper.log_mel_spectrogram but over a (batch, samples) tensor,
+    # with the dynamic-range clamp applied per item rather than across the batch
+    import torch
+    from whisper.audio import mel_filters
+
+    window = torch.hann_window(N_FFT, device=audio_batch.device)
+    stft = torch.stft(audio_batch, N_FFT, HOP_LENGTH, window=window, return_complex=True)
+    magnitudes = stft[..., :-1].abs() ** 2
+
+    mel_spec = mel_filters(audio_batch.device, n_mels) @ magnitudes
+    log_spec = torch.clamp(mel_spec, min=1e-10).log10()
+    log_spec = torch.maximum(log_spec, log_spec.amax(dim=(-2, -1), keepdim=True) - 8.0)
+    return (log_spec + 4.0) / 4.0
+
+
+def model_memory_bytes(model: "torch.nn.Module") -> int:
+    from .quantization import quantized_weight_bytes
+
+    tensors = list(model.parameters()) + list(model.buffers())
+    return sum(t.numel() * t.element_size() for t in tensors) + quantized_weight_bytes(model)
+
+
+class WhisperModel(BackendModel):
+    """openai-whisper's PyTorch model"""
+
+    def __init__(self, model, model_size: str):
+        from whisper.tokenizer import get_tokenizer
+
+        self.model = model
+        self.model_size = model_size
+        self.tokenizer = get_tokenizer(model.is_multilingual, num_languages=model.num_languages, task="transcribe")
+        self.capabilities = BackendCapabilities(
+            batched=True,
+            mel_input=True,
+            word_timestamps=True,
+            multilingual=model.is_multilingual,
+            n_mels=model.dims.n_mels,
+            max_prompt_tokens=model.dims.n_text_ctx // 2 - 1,  # Whisper keeps prompts to half the text context
+        )
+
+    @property
+    def device(self) -> "torch.device":
+        return self.model.device
+
+    def transcribe(self, audio: np.ndarray, **options) -> dict:
+        options.setdefault("fp16", self.device.type == "cuda")
+        return self.model.transcribe(audio, **options)
+
+    def transcribe_batch(self, audios: List[np.ndarray], language: Optional[str] = None,
+                         prompt: Optional[str] = None) -> List[dict]:
+        import torch
+        import whisper
+
+        # One padded (batch, 30s) tensor -> one mel tensor -> one forward pass
+        audio_batch = torch.zeros(len(audios), N_SAMPLES, dtype=torch.float32)
+        for i, audio in enumerate(audios):
+            audio_batch[i, :len(audio)] = torch.from_numpy(np.asarray(audio, dtype=np.float32))
+
+        options = whisper.DecodingOptions(
+            language=language,
+            task="transcribe",
+            prompt=prompt,
+            without_timestamps=True,
+            fp16=(self.device.type == "cuda"),
+        )
+        mel = log_mel_batch(audio_batch.to(self.device), self.capabilities.n_mels)
+        return [
+            {
+                "text": result.text,
+                "language": result.language,
+                "no_speech_prob": result.no_speech_prob,
+                "avg_logprob": result.avg_logprob,
+            }
+            for result in whisper.decode(self.model, mel, options)
+        ]
+
+    def transcribe_mel(self, mel, num_frames: int, language: str, prompt: Union[str, List[int], None],
+                       temperatures: Sequence[float] = FALLBACK_TEMPERATURES, word_timestamps: bool = True,
+                       **options) -> dict:
+        from .decoding import transcribe_mel_window
+
+        return transcribe_mel_window(self.model, mel, num_frames, language, prompt,
+                                     temperatures=temperatures, word_timestamps=word_timestamps, **options)
+
+    def detect_language(self, mel) -> Dict[str, float]:
+        import torch
+
+        if isinstance(mel, np.ndarray):
+            mel = torch.from_numpy(mel).to(self.device)
+        _, probs = self.model.detect_language(mel)
+        return probs
+
+    def memory_bytes(self) -> int:
+        return model_memory_bytes(self.model)
+
+    def compile(self) -> bool:
+        import torch
+
+        # Dynamically quantized Linear layers have no inductor lowering
+        if not hasattr(torch, "compile") or is_quantized(self.model_size):
+            return False
+        # Submodules stay reachable through the compiled wrappers, so the kv-cache and
+        # cross-attention hooks whisper installs on the decoder blocks still apply
+        self.model.encoder = torch.compile(self.model.encoder)
+        self.model.decoder = torch.compile(self.model.decoder, dynamic=True)  # Token count grows per step
+        return True
+
+
+class WhisperBackend(InferenceBackend):
+    """openai-whisper; ``<size>-int8`` names load the cached dynamic int8 variant on CPU.
+
+    With ``model_store_dir`` the other sizes are mapped from the memory-mapped
+    model store (see ModelStore) rather than read from the downloaded checkpoint.
+    """
+
+    name = "whisper"
+
+    def __init__(self, quantized_dir: Optional[str] = None, half: bool = False,
+                 model_store_dir: Optional[str] = None):
+        from .model_store import ModelStore
+
+        self.quantized_dir = quantized_dir
+        self.half = half  # Cast weights to fp16 on the GPU (decoding runs in fp16 there either way)
+        self.store = ModelStore(model_store_dir) if model_store_dir else None
+
+    def load(self, model_size: str, device: str) -> WhisperModel:
+        import torch
+        from .model_store import load_stored_model
+        from .quantization import load_quantized_model
+
+        if is_quantized(model_size):
+            model = load_quantized_model(base_model_size(model_size), self.quantized_dir)
+        else:
+            # fp16 weights are stored as such, so the GPU copy needs no cast afterwards
+            dtype = torch.float16 if self.half and device == "cuda" else torch.float32
+            model = load_stored_model(self.store, model_size, device, dtype)
+        return WhisperModel(model, model_size)
+
+
+class ByteTokenizer:
+    # UTF-8 bytes as tokens: enough for prompts to round-trip through the fake backend
+    def encode(self, text: str) -> List[int]:
+        return list(text.encode("utf-8"))
+
+    def decode(self, tokens: List[int]) -> str:
+        return bytes(t for t in tokens if 0 <= t < 256).decode("utf-8", errors="ignore")
+
+
+# Vocabulary of the fake backend's transcripts
+FAKE_WORDS = (
+    "alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel",
+    "india", "juliett", "kilo", "lima", "mike", "november", "oscar", "papa",
+    "quebec", "romeo", "sierra", "tango", "uniform", "victor", "whiskey", "yankee",
+)
+
+
+class FakeModel(BackendModel):
+    """Deterministic stand-in for a Whisper model: no weights, no real inference.
+
+    Audio is cut into ``word_seconds`` slots from its start; every slot
+    louder than ``silence_rms`` becomes one word picked by a checksum of its
+    samples, with word timestamps on the slot. The same audio always gives
+    the same transcript, and a slot gives the same word wherever the chunk
+    boundaries fall, as long as they fall on slot boundaries. A trailing
+    partial slot is not transcribed (the word is still being spoken).
+
+    Each call sleeps ``latency`` seconds plus ``rtf`` seconds per second of
+    audio, so a batch saves the fixed cost but not the per-audio cost.
+    """
+
+    def __init__(self, model_size: str, latency: float = 0.05, rtf: float = 0.05,
+                 word_seconds: float = 0.4, silence_rms: float = 0.005):
+        self.model_size = model_size
+        self.latency = latency
+        self.rtf = rtf
+        self.word_seconds = word_seconds
+        self.silence_rms = silence_rms
+        self.tokenizer = ByteTokenizer()
+        self.capabilities = BackendCapabilities(
+            batched=True,
+            mel_input=False,
+            word_timestamps=True,
+            multilingual=False,
+            n_mels=model_n_mels(model_size),
+            max_prompt_tokens=223,
+        )
+
+    def _words(self, audio: np.ndarray) -> List[dict]:
+        audio = np.ascontiguousarray(audio, dtype=np.float32)
+        slot = int(self.word_seconds * SAMPLE_RATE)
+        words = []
+        for i in range(len(audio) // slot):
+            samples = audio[i * slot:(i + 1) * slot]
+            if np.sqrt(np.mean(samples ** 2)) < self.silence_rms:
+                continue
+            words.append({
+                "word": " " + FAKE_WORDS[zlib.crc32(samples.tobytes()) % len(FAKE_WORDS)],
+                "start": round(i * self.word_seconds, 2),
+                "end": round((i + 1) * self.word_seconds, 2),
+                "probability": 0.9,
+            })
+        return words
+
+    def _wait(self, audio_seconds: float):
+        time.sleep(self.latency + self.rtf * audio_seconds)
+
+    def transcribe(self, audio: np.ndarray, **options) -> dict:
+        self._wait(len(audio) / SAMPLE_RATE)
+        words = self._words(audio)
+        if not words:
+            return {"text": "", "segments": [], "language": "en"}
+        text = "".join(w["word"] for w in words)
+        segment = {
+            "id": 0,
+            "seek": 0,
+            "start": words[0]["start"],
+            "end": words[-1]["end"],
+            "text": text,
+            "tokens": self.tokenizer.encode(text),
+            "temperature": 0.0,
+            "avg_logprob": -0.2,
+            "compression_ratio": 1.0,
+            "no_speech_prob": 0.0,
+        }
+        if options.get("word_timestamps"):
+            segment["words"] = words
+        return {"text": text, "segments": [segment], "language": "en"}
+
+    def transcribe_batch(self, audios: List[np.ndarray], language: Optional[str] = None,
+                         prompt: Optional[str] = None) -> List[dict]:
+        self._wait(sum(len(audio) for audio in audios) / SAMPLE_RATE)
+        results = []
+        for audio in audios:
+            words = self._words(audio)
+            results.append({
+                "text": "".join(w["word"] for w in words),
+                "language": "en",
+                "no_speech_prob": 0.0 if words else 1.0,
+                "avg_logprob": -0.2 if words else -2.0,
+            })
+        return results
+
+    def memory_bytes(self) -> int:
+        # What the real model would take, so registry budgeting behaves as in production
+        return estimate_model_bytes(self.model_size)
+
+
+class FakeBackend(InferenceBackend):
+    """Offline backend for throughput and latency tests of the whole server on CPU"""
+
+    name = "fake"
+    mel_input = False
+
+    def __init__(self, latency: float = 0.05, rtf: float = 0.05):
+        self.latency = latency
+        self.rtf = rtf
+
+    def load(self, model_size: str, device: str) -> FakeModel:
+        return FakeModel(model_size, latency=self.latency, rtf=self.rtf)
+
+
+BACKENDS = {backend.name: backend for backend in (WhisperBackend, FakeBackend)}
+
+
+def create_backend(name: str, **options) -> InferenceBackend:
+    if name == "remote":
+        from .model_server import RemoteBackend  # model_server builds on this module
+        return RemoteBackend(**options)
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown inference backend: {name} (available: {', '.join(BACKENDS)}, remote)")
+    return BACKENDS[name](**options)
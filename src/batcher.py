@@ -0,0 +1,157 @@
+import queue
+import threading
+import time
+import traceback
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .features import N_SAMPLES, SAMPLE_RATE
+from .model_registry import ModelRegistry
+
+
+@dataclass
+class BatchItem:
+    session_id: str
+    audio: np.ndarray
+    model_size: str
+    submitted_at: float = field(default_factory=time.time)
+    future: Future = field(default_factory=Future)
+
+
+class DynamicBatcher:
+    """Groups live chunks from different sessions into one encoder/decoder pass.
+
+    Chunks are collected for up to ``max_wait`` seconds after the first one
+    arrives, or until ``max_batch_size`` are pending, then decoded together
+    by the backend model's ``transcribe_batch`` (for Whisper, one
+    ``whisper.decode`` on a stacked mel tensor). Chunks for different
+    model sizes are split into one pass per model. Only chunks up to 30 s
+    (one Whisper window) can be batched.
+    """
+
+    def __init__(
+        self,
+        registry: ModelRegistry,
+        max_batch_size: int = 8,
+        max_wait: float = 0.02,
+        language: Optional[str] = "en",
+        initial_prompt: Optional[str] = None,
+        no_speech_threshold: float = 0.6,
+        logprob_threshold: float = -1.0,
+    ):
+        self.registry = registry
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait
+        self.language = language
+        self.initial_prompt = initial_prompt
+        self.no_speech_threshold = no_speech_threshold
+        self.logprob_threshold = logprob_threshold
+
+        # Bounded so admission order stays with the upstream fair scheduler
+        self.queue = queue.Queue(maxsize=self.max_batch_size * 2)
+        self.batches_run = 0
+        self.items_run = 0
+
+        self.is_running = True
+        self.thread = threading.Thread(target=self._batch_loop, name="dynamic-batcher")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def submit(self, session_id: str, audio: np.ndarray, model_size: str) -> Future:
+        if len(audio) > N_SAMPLES:
+            raise ValueError(f"Chunk of {len(audio)} samples is longer than one 30s window")
+        item = BatchItem(session_id=session_id, audio=audio, model_size=model_size)
+        self.queue.put(item)  # Blocks the submitting worker while the batcher is saturated
+        return item.future
+
+    def cancel_session(self, session_id: str) -> int:
+        # Drop a session's chunks still waiting for a batch (e.g. on disconnect)
+        with self.queue.mutex:
+            dropped = [item for item in self.queue.queue if item.session_id == session_id]
+            if dropped:
+                kept = [item for item in self.queue.queue if item.session_id != session_id]
+                self.queue.queue.clear()
+                self.queue.queue.extend(kept)
+                self.queue.unfinished_tasks -= len(dropped)
+                self.queue.not_full.notify(len(dropped))
+        for item in dropped:
+            item.future.cancel()
+        return len(dropped)
+
+    def _batch_loop(self):
+        while self.is_running:
+            try:
+                batch = [self.queue.get(timeout=0.1)]
+            except queue.Empty:
+                continue
+
+            deadline = time.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            by_model: Dict[str, List[BatchItem]] = {}
+            for item in batch:
+                by_model.setdefault(item.model_size, []).append(item)
+            for model_size, items in by_model.items():
+                self._run_batch(model_size, items)
+
+    def _run_batch(self, model_size: str, batch: List[BatchItem]):
+        try:
+            start_time = time.time()
+            with self.registry.acquire(model_size) as entry, entry.lock:
+                results = entry.model.transcribe_batch(
+                    [item.audio for item in batch],
+                    language=self.language,
+                    prompt=self.initial_prompt,
+                )
+            decode_time = time.time() - start_time
+
+            batch_audio_seconds = sum(len(item.audio) for item in batch) / SAMPLE_RATE
+            self.batches_run += 1
+            self.items_run += len(batch)
+
+            for item, result in zip(batch, results):
+                is_silence = (
+                    result["no_speech_prob"] > self.no_speech_threshold
+                    and result["avg_logprob"] < self.logprob_threshold
+                )
+                item.future.set_result({
+                    "text": "" if is_silence else result["text"].strip(),
+                    "language": result["language"],
+                    "no_speech_prob": result["no_speech_prob"],
+                    "avg_logprob": result["avg_logprob"],
+                    "model": model_size,
+                    "batch_size": len(batch),
+                    "decode_time": decode_time,
+                    "batch_audio_seconds": batch_audio_seconds,
+                    "queue_wait": start_time - item.submitted_at,
+                })
+
+        except Exception as e:
+            print(f"Batch decode error: {e}")
+            print(traceback.format_exc())
+            for item in batch:
+                if not item.future.done():
+                    item.future.set_exception(e)
+
+    def stop(self, timeout: float = 1.0):
+        self.is_running = False
+        self.thread.join(timeout=timeout)
+
+    def stats(self) -> dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait": self.max_wait,
+            "pending": self.queue.qsize(),
+            "batches": self.batches_run,
+            "avg_batch_size": (self.items_run / self.batches_run) if self.batches_run else 0.0,
+        }
@@ -9,8 +9,13 @@ TRANSCRIPT_DIR.mkdir(exist_ok=True)
 # Whisper configuration optimized for Indian accent and RTX 4090
 WHISPER_CONFIG = {
     "model_size": "large-v3",  # Best accuracy for accents
+    "backend": "whisper",  # Inference engine (src/backends.py); "fake" runs without weights
     "device": "cuda",  # Use GPU
-    "compute_type": "float16",  # FP16 for speed on RTX 4090
+    "compute_type": "float16",  # FP16 for speed on RTX 4090; "int8": dynamically quantized Linear layers on CPU
+    "quantized_model_dir": "cache/models",  # int8 checkpoints, written on first load and reused after
+    "model_store_dir": "cache/models",  # Memory-mapped checkpoints converted once per size and dtype; None: load directly
+    "compile": False,  # torch.compile the encoder and decoder at load time (slow first start, faster decodes)
+    "compile_cache_dir": "cache/compile",  # Compiled artifacts kept between restarts
     "language": "en",  # English
     "task": "transcribe",
     "initial_prompt": (
@@ -22,7 +27,9 @@ WHISPER_CONFIG = {
     "compression_ratio_threshold": 2.4,
     "logprob_threshold": -1.0,
     "no_speech_threshold": 0.6,
-    "condition_on_previous_text": True,
+    "condition_on_previous_text": True,  # Prompt each live chunk with the text committed before it
+    "prompt_max_tokens": 64,  # Prompt budget per live chunk (initial_prompt, then the latest committed text)
+    "language_lock_probability": 0.8,  # With language "auto": stop detecting once a chunk is this certain
     "beam_size": 5,  # Higher for better accuracy
     "best_of": 5,  # Sample 5 times and pick best
     "patience": 1.0,
@@ -37,9 +44,14 @@ AUDIO_CONFIG = {
     "sample_rate": 16000,  # Whisper expects 16kHz
     "channels": 1,  # Mono
     "chunk_duration": 1.0,  # Process 1 second chunks
+    "chunk_overlap": 0.4,  # Seconds of the previous chunk repeated at the start of each chunk (a little longer than a word; each one adds to every decode)
     "buffer_duration": 0.5,  # 500ms buffer for smooth streaming
+    "block_duration": 0.02,  # Audio callback block size (capture latency)
+    "ring_seconds": 5.0,  # Capture ring between the audio callback and chunk assembly
+    "vad_window": 0.3,  # Seconds of recent audio the level meter and voice activity check look at
     "silence_threshold": 0.01,  # Voice activity detection
     "device": None,  # Auto-select default device
+    "capture_native_rate": True,  # Open the device at its native rate and resample to sample_rate
 }
 
 # UI configuration
@@ -68,6 +80,53 @@ PERFORMANCE = {
     "enable_vad": True,  # Voice Activity Detection
     "vad_threshold": 0.5,
     "min_speech_duration": 0.5,  # Minimum speech duration in seconds
+    "load_shedding": True,  # Degrade decoding step by step while chunks pile up
+    "shed_max_queue_depth": 3,  # Chunks waiting before the transcriber counts as behind
+    "shed_max_rtf": 1.0,  # Seconds from capture to result per second of audio
+    "shed_fallback_model": "small",  # Used at the "small_model" level if smaller than model_size
+    "shed_stale_after": 5.0,  # Seconds a chunk may wait before it is dropped at the last level
+    "shed_merge_max_seconds": 10.0,  # Longest merged chunk at the "merge" level
+    "warmup": True,  # Decode synthetic audio at the chunk length before the first recording
+    "incremental_mel": True,  # Reuse the log-mel frames of the overlap each chunk shares with the previous one
+}
+
+# Web server settings (app.py)
+SERVER_CONFIG = {
+    "default_model": os.environ.get("WHISPERLIVE_MODEL", "large-v3"),  # e.g. "tiny" for CPU-only load tests
+    "backend": os.environ.get("WHISPERLIVE_BACKEND", "whisper"),  # "fake": no weights, synthetic latency (offline tests); "remote": use the model server
+    "model_server_socket": os.environ.get("WHISPERLIVE_MODEL_SERVER", "cache/model_server.sock"),  # Unix socket of model_server.py
+    "model_server_backend": "whisper",  # Backend the model server itself loads models with
+    "model_server_connect_timeout": 60.0,  # Seconds web processes wait for the model server to come up
+    "fake_latency": 0.05,  # Fake backend: seconds per decode call
+    "fake_rtf": 0.05,  # Fake backend: extra seconds per second of audio
+    "warmup": True,  # Decode synthetic audio on every newly loaded model before it serves requests
+    "warmup_chunk_seconds": [1.0, 5.0],  # Audio lengths warmed up (live chunks; uploads reuse the same kernels)
+    "inference_workers": 2,  # Threads pulling jobs from the fair scheduler
+    "scheduler_policy": "deficit",  # "round_robin" or "deficit"
+    "scheduler_quantum": 2.0,  # Seconds of audio credited per round (deficit policy)
+    "batch_max_size": 8,  # Live chunks decoded together in one forward pass
+    "batch_max_wait": 0.02,  # Seconds to wait for more chunks before running a batch
+    "stream_update_interval": 0.5,  # Re-decode a streaming session after this much new audio
+    "stream_max_buffer": 30.0,  # Seconds of uncommitted audio kept per streaming session
+    "stream_force_commit_after": 15.0,  # Commit without agreement once this much is pending
+    "stream_incremental_mel": True,  # Keep log-mel features up to date as audio arrives instead of per decode
+    "load_shedding": True,  # Degrade live decoding in steps while inference falls behind, recover when it catches up
+    "shed_max_queue_depth": 8,  # Live jobs waiting (scheduler + batcher) counted as overload
+    "shed_max_rtf": 1.0,  # Seconds from receipt to result per second of live audio counted as overload
+    "shed_up_after": 2.0,  # Seconds of sustained overload before the next step down in quality
+    "shed_down_after": 10.0,  # Seconds of low load before stepping back up
+    "shed_fallback_model": "base",  # Smaller model live audio switches to at the "small_model" step
+    "shed_stale_after": 5.0,  # At the last step, live chunks older than this are dropped (client is told)
+    "shed_merge_max_seconds": 10.0,  # Longest run of queued chunks merged into one decode
+    "vad_prefilter": True,  # Skip live chunks and recording windows without speech before Whisper
+    "vad_min_speech": 0.2,  # Seconds of speech frames a chunk needs to be decoded
+    "upload_window_seconds": 30.0,  # Uploads are decoded and streamed back one window at a time
+    "model_memory_budget_gb": 12.0,  # RAM/VRAM budget for resident Whisper models
+    "model_idle_timeout": 900,  # Unload non-default models unused for this many seconds
+    "result_cache_dir": "cache/results",  # Persistent upload transcription results
+    "result_cache_max_mb": 512,  # Least recently used results are evicted beyond this size
+    "jobs_dir": "cache/jobs",  # Job database (SQLite) and uploads of queued/running jobs
+    "job_workers": 1,  # Jobs transcribed concurrently (their windows still share the scheduler)
 }
 
 # File settings
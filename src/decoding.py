@@ -0,0 +1,236 @@
+from typing import List, Optional, Sequence, Union
+
+import numpy as np
+import torch
+import whisper
+from whisper.audio import HOP_LENGTH, SAMPLE_RATE
+from whisper.timing import add_word_timestamps
+from whisper.tokenizer import get_tokenizer
+
+from .backends import FALLBACK_TEMPERATURES
+
+# Thresholds of model.transcribe's defaults
+COMPRESSION_RATIO_THRESHOLD = 2.4
+LOGPROB_THRESHOLD = -1.0
+NO_SPEECH_THRESHOLD = 0.6
+TIME_PRECISION = 2 * HOP_LENGTH / SAMPLE_RATE  # Seconds per timestamp token
+
+# Seconds of slack when deciding whether committed text lies before a chunk's audio
+TIMELINE_TOLERANCE = 0.1
+
+
+def split_segments(tokens, tokenizer, num_frames) -> list:
+    """Cut one window's decoded tokens into segments at timestamp tokens (as model.transcribe does)"""
+    tokens = torch.tensor(tokens, dtype=torch.long)
+    is_timestamp = tokens.ge(tokenizer.timestamp_begin)
+    single_timestamp_ending = is_timestamp[-2:].tolist() == [False, True]
+    consecutive = (torch.where(is_timestamp[:-1] & is_timestamp[1:])[0] + 1).tolist()
+
+    def segment(start, end, segment_tokens):
+        segment_tokens = segment_tokens.tolist()
+        return {
+            "seek": 0,
+            "start": start,
+            "end": end,
+            "text": tokenizer.decode([t for t in segment_tokens if t < tokenizer.eot]),
+            "tokens": segment_tokens,
+        }
+
+    if consecutive:
+        if single_timestamp_ending:
+            consecutive.append(len(tokens))
+        segments = []
+        last = 0
+        for current in consecutive:
+            sliced = tokens[last:current]
+            segments.append(segment(
+                (sliced[0].item() - tokenizer.timestamp_begin) * TIME_PRECISION,
+                (sliced[-1].item() - tokenizer.timestamp_begin) * TIME_PRECISION,
+                sliced
+            ))
+            last = current
+        return segments
+
+    duration = num_frames * HOP_LENGTH / SAMPLE_RATE
+    timestamps = tokens[is_timestamp.nonzero().flatten()]
+    if len(timestamps) and timestamps[-1].item() != tokenizer.timestamp_begin:
+        duration = (timestamps[-1].item() - tokenizer.timestamp_begin) * TIME_PRECISION
+    return [segment(0.0, duration, tokens)]
+
+
+def transcribe_mel_window(
+    model,
+    mel: Union[np.ndarray, torch.Tensor],
+    num_frames: int,
+    language: str,
+    prompt: Union[str, List[int], None],
+    temperatures: Sequence[float] = FALLBACK_TEMPERATURES,
+    word_timestamps: bool = True,
+    **options
+) -> dict:
+    """model.transcribe for one window whose log-mel is already computed.
+
+    ``mel`` is a normalized (n_mels, N_FRAMES) window holding ``num_frames`` frames of audio.
+    Same temperature fallback and no-speech rule as transcribe, without recomputing features.
+    ``prompt`` may be text or already tokenized; ``options`` go to DecodingOptions
+    (beam_size only for greedy passes and best_of only for sampling, as transcribe does).
+    """
+    fp16 = model.device.type == "cuda"
+    if isinstance(mel, np.ndarray):
+        mel = torch.from_numpy(mel)
+    mel = mel.to(model.device, torch.float16 if fp16 else torch.float32)
+
+    for temperature in temperatures:
+        kwargs = dict(options)
+        if temperature > 0:
+            kwargs.pop("beam_size", None)
+            kwargs.pop("patience", None)
+        else:
+            kwargs.pop("best_of", None)
+        decode_options = whisper.DecodingOptions(
+            language=language, task="transcribe", prompt=prompt, temperature=temperature, fp16=fp16, **kwargs
+        )
+        result = whisper.decode(model, mel, decode_options)
+        if result.no_speech_prob > NO_SPEECH_THRESHOLD:
+            break  # Silence: a different temperature won't help
+        if result.compression_ratio <= COMPRESSION_RATIO_THRESHOLD and result.avg_logprob >= LOGPROB_THRESHOLD:
+            break
+
+    if result.no_speech_prob > NO_SPEECH_THRESHOLD and result.avg_logprob < LOGPROB_THRESHOLD:
+        return {"text": "", "segments": [], "language": result.language}
+
+    tokenizer = get_tokenizer(model.is_multilingual, num_languages=model.num_languages, language=language,
+                              task="transcribe")
+    segments = [s for s in split_segments(result.tokens, tokenizer, num_frames) if s["text"].strip()]
+    for segment in segments:
+        segment.update(
+            temperature=result.temperature,
+            avg_logprob=result.avg_logprob,
+            compression_ratio=result.compression_ratio,
+            no_speech_prob=result.no_speech_prob,
+        )
+    if segments and word_timestamps:
+        add_word_timestamps(segments=segments, model=model, tokenizer=tokenizer, mel=mel, num_frames=num_frames,
+                            last_speech_timestamp=0.0)
+    return {"text": "".join(s["text"] for s in segments), "segments": segments, "language": result.language}
+
+
+class DecodingSession:
+    """Decoding context carried from one chunk of a live recording to the next.
+
+    * Prompt: the initial prompt followed by the text committed so far, cut to
+      the last ``max_prompt_tokens`` tokens. Text is tokenized once when it
+      is committed, and the assembled prompt is cached until it changes.
+    * Language: with ``language=None`` it is detected on each chunk until
+      one detection reaches ``lock_probability``, then fixed for the session.
+
+    Chunks are placed on the recording timeline (seconds from the start), so
+    an overlapping chunk is prompted only with the text before its own audio,
+    and its words replace those the previous chunk decoded in the overlap.
+    ``model`` is a backends.BackendModel. Not thread-safe; callers serialize
+    access (e.g. under the model lock).
+    """
+
+    def __init__(
+        self,
+        model,
+        language: Optional[str] = None,
+        initial_prompt: Optional[str] = None,
+        max_prompt_tokens: int = 64,
+        lock_probability: float = 0.8,
+        condition_on_previous_text: bool = True,
+    ):
+        self.model = model
+        self.tokenizer = model.tokenizer
+        if not model.capabilities.multilingual:
+            language = "en"
+        self.configured_language = language
+        self.max_prompt_tokens = min(max_prompt_tokens, model.capabilities.max_prompt_tokens)
+        self.lock_probability = lock_probability
+        self.condition_on_previous_text = condition_on_previous_text
+        self.initial_tokens = self.encode(initial_prompt) if initial_prompt else []
+        self.reset()
+
+    def reset(self):
+        """Start a new recording: forget committed text and any detected language"""
+        self.language = self.configured_language
+        self.language_locked = self.language is not None
+        self.detections = 0
+        self.units = []  # (start, end, tokens) of committed words or segments, in timeline order
+        self.unit_tokens = 0
+        self.position = 0.0  # End of the latest chunk on the timeline
+        self.version = 0  # Bumped on every commit; invalidates the cached prompt
+        self.cached_key = None
+        self.cached_prompt: List[int] = []
+
+    def encode(self, text: str) -> List[int]:
+        return self.tokenizer.encode(" " + text.strip())
+
+    def place(self, duration: float, offset: Optional[float] = None) -> float:
+        """Timeline start of a chunk: ``offset`` when the caller knows it, else right after the previous chunk"""
+        start = self.position if offset is None else offset
+        self.position = max(self.position, start + duration)
+        return start
+
+    def prompt_tokens(self, offset: float) -> List[int]:
+        """Prompt for a chunk starting at ``offset``: committed text that ends before its audio"""
+        count = 0
+        if self.condition_on_previous_text:
+            while count < len(self.units) and self.units[count][1] <= offset + TIMELINE_TOLERANCE:
+                count += 1
+        if self.cached_key != (self.version, count):
+            tokens = list(self.initial_tokens)
+            for _, _, unit_tokens in self.units[:count]:
+                tokens.extend(unit_tokens)
+            self.cached_prompt = tokens[-self.max_prompt_tokens:]
+            self.cached_key = (self.version, count)
+        return self.cached_prompt
+
+    def prompt_text(self, offset: float) -> Optional[str]:
+        tokens = self.prompt_tokens(offset)
+        return self.tokenizer.decode(tokens).strip() if tokens else None
+
+    def detect_language(self, mel: torch.Tensor, model=None) -> str:
+        """Language for a chunk; ``mel`` is its (n_mels, N_FRAMES) window on the device of
+        ``model`` (the session's model unless another one decodes this chunk)"""
+        if self.language_locked:
+            return self.language
+        probs = (model or self.model).detect_language(mel)
+        language = max(probs, key=probs.get)
+        self.detections += 1
+        if probs[language] >= self.lock_probability:
+            self.language = language
+            self.language_locked = True
+        return language
+
+    def commit(self, segments: list, offset: float, duration: float):
+        """Add a decoded chunk's text (words if timed, else segments) to the context"""
+        units = []
+        for segment in segments:
+            for item in segment.get("words") or [segment]:
+                text = item.get("word", item.get("text", ""))
+                if text.strip():
+                    units.append((offset + item["start"], offset + item["end"], self.encode(text)))
+
+        # Where chunks overlap, text starting inside this chunk is replaced by this chunk's
+        # decode, and a word clipped at the chunk's start is left to the previous one
+        boundary = offset + TIMELINE_TOLERANCE if self.units and offset < self.units[-1][1] else offset
+        kept = [unit for unit in self.units if unit[0] < boundary]
+        kept.extend(unit for unit in units if unit[0] >= boundary)
+
+        # Only the tail can still reach a prompt
+        total = sum(len(unit[2]) for unit in kept)
+        while kept and total - len(kept[0][2]) >= self.max_prompt_tokens:
+            total -= len(kept.pop(0)[2])
+        self.units = kept
+        self.unit_tokens = total
+        self.version += 1
+
+    def stats(self) -> dict:
+        return {
+            "language": self.language,
+            "language_locked": self.language_locked,
+            "language_detections": self.detections,
+            "prompt_tokens": len(self.cached_prompt),
+            "context_tokens": self.unit_tokens,
+        }
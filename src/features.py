@@ -0,0 +1,134 @@
+from typing import Optional
+
+import numpy as np
+
+# Whisper's input format (whisper.audio), here so callers that never load a
+# Whisper model (fake backend, batching, scheduling) don't import whisper
+SAMPLE_RATE = 16000
+N_FFT = 400
+HOP_LENGTH = 160
+CHUNK_LENGTH = 30  # Seconds per model window
+N_SAMPLES = CHUNK_LENGTH * SAMPLE_RATE
+N_FRAMES = N_SAMPLES // HOP_LENGTH
+
+# Log10 of the clamp Whisper applies to empty (zero-padded) frames
+SILENT_LOG_MEL = -10.0
+
+
+def periodic_hann(length: int) -> np.ndarray:
+    # torch.hann_window's default (periodic) form, as used by whisper.log_mel_spectrogram
+    return (0.5 - 0.5 * np.cos(2 * np.pi * np.arange(length) / length)).astype(np.float32)
+
+
+class IncrementalLogMel:
+    """Whisper's log-mel frontend computed only for newly appended audio.
+
+    ``whisper.log_mel_spectrogram`` runs a centred STFT (reflect-padded at the
+    start) over the whole input every call. Here each STFT frame is computed
+    once, as soon as its 400-sample window is complete, and its log10 mel
+    energies go into a ring of ``capacity`` frames. ``window()`` assembles the
+    30 s model input from the ring plus the few frames that overlap the end
+    of the audio (computed against zero padding, as ``transcribe`` pads with
+    30 s of silence) and applies the per-window dynamic range clamp and
+    scaling. Feature cost per update is proportional to the new audio.
+
+    Audio can only be dropped from the front in whole hops (160 samples).
+    """
+
+    def __init__(self, n_mels: int = 80, capacity: int = N_FRAMES, filters: Optional[np.ndarray] = None):
+        self.n_mels = n_mels
+        self.capacity = capacity
+        if filters is None:
+            from whisper.audio import mel_filters
+            filters = mel_filters("cpu", n_mels).numpy()
+        self.filters = filters
+        self.window_fn = periodic_hann(N_FFT)
+        self.frames = np.zeros((n_mels, capacity), dtype=np.float32)
+        self.output = np.empty((n_mels, N_FRAMES), dtype=np.float32)
+        self.reset()
+
+    def reset(self):
+        self.head = 0  # Ring index of the oldest frame
+        self.count = 0  # Frames in the ring; frame i is centred on sample i * HOP_LENGTH
+        self.started = False  # Reflect padding applied to the start of the stream
+        # Samples from (count * HOP_LENGTH - N_FFT // 2) onwards, not yet fully consumed
+        self.tail = np.zeros(0, dtype=np.float32)
+        self.num_samples = 0
+
+    def _log_mel(self, padded: np.ndarray, num_frames: int) -> np.ndarray:
+        windows = np.lib.stride_tricks.sliding_window_view(padded, N_FFT)[::HOP_LENGTH][:num_frames]
+        magnitudes = np.abs(np.fft.rfft(windows * self.window_fn, axis=1)) ** 2
+        mel = self.filters @ magnitudes.T.astype(np.float32)
+        return np.log10(np.maximum(mel, 1e-10))
+
+    def append(self, audio: np.ndarray):
+        """Compute the frames that new samples complete"""
+        self.num_samples += len(audio)
+        tail = np.concatenate([self.tail, np.asarray(audio, dtype=np.float32)])
+        if not self.started:
+            if len(tail) <= N_FFT // 2:
+                self.tail = tail  # Reflect padding needs N_FFT // 2 + 1 samples
+                return
+            tail = np.concatenate([tail[N_FFT // 2:0:-1], tail])
+            self.started = True
+
+        num_frames = (len(tail) - N_FFT) // HOP_LENGTH + 1 if len(tail) >= N_FFT else 0
+        if num_frames > 0:
+            self._push(self._log_mel(tail, num_frames))
+        self.tail = tail[num_frames * HOP_LENGTH:]
+
+    def _push(self, log_mel: np.ndarray):
+        num_frames = log_mel.shape[1]
+        if num_frames > self.capacity:
+            log_mel = log_mel[:, -self.capacity:]
+            num_frames = self.capacity
+        overflow = self.count + num_frames - self.capacity
+        if overflow > 0:
+            self.head = (self.head + overflow) % self.capacity
+            self.count -= overflow
+        start = (self.head + self.count) % self.capacity
+        first = min(num_frames, self.capacity - start)
+        self.frames[:, start:start + first] = log_mel[:, :first]
+        self.frames[:, :num_frames - first] = log_mel[:, first:]
+        self.count += num_frames
+
+    def drop(self, num_samples: int) -> bool:
+        """Forget the first ``num_samples`` (a multiple of HOP_LENGTH); False if they aren't framed yet"""
+        if num_samples % HOP_LENGTH:
+            raise ValueError(f"Can only drop whole hops of {HOP_LENGTH} samples")
+        num_frames = num_samples // HOP_LENGTH
+        if num_frames > self.count:
+            return False
+        self.head = (self.head + num_frames) % self.capacity
+        self.count -= num_frames
+        self.num_samples -= num_samples
+        return True
+
+    @property
+    def content_frames(self) -> int:
+        # Frames that hold audio, as counted by whisper.transcribe
+        return self.num_samples // HOP_LENGTH
+
+    def window(self) -> np.ndarray:
+        """The model input for the buffered audio: (n_mels, N_FRAMES), normalized like Whisper.
+
+        Returns a view into an internal buffer that is overwritten by the next call.
+        """
+        out = self.output
+        ring = min(self.count, N_FRAMES)
+        first = min(ring, self.capacity - self.head)
+        out[:, :first] = self.frames[:, self.head:self.head + first]
+        out[:, first:ring] = self.frames[:, :ring - first]
+
+        # Frames overlapping the end of the audio see zeros, like transcribe's 30 s of padding
+        tail = self.tail if self.started else np.pad(self.tail, (N_FFT // 2, 0))
+        edge = min(-(-len(tail) // HOP_LENGTH), N_FRAMES - ring) if len(tail) else 0
+        if edge > 0:
+            padded = np.concatenate([tail, np.zeros(edge * HOP_LENGTH + N_FFT, dtype=np.float32)])
+            out[:, ring:ring + edge] = self._log_mel(padded, edge)
+        out[:, ring + edge:] = SILENT_LOG_MEL
+
+        np.maximum(out, out.max() - 8.0, out=out)
+        out += 4.0
+        out /= 4.0
+        return out
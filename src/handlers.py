@@ -0,0 +1,771 @@
+"""Socket.IO event and HTTP route logic shared by the Flask and asyncio servers.
+
+``app.py`` and ``asgi_app.py`` only parse requests and deliver what the
+handlers here produce. Socket.IO replies go through the ``emit(event,
+payload, room=None)`` callable each server passes in; it is called from
+request threads, inference workers and the batcher thread alike, so it
+must be thread-safe. Handlers may block on disk and model loads: the
+asyncio server runs them on its executor.
+
+Uploads streamed over SSE are produced by ``upload_steps``, a generator
+of steps each server drives its own way (see ``run_steps``): a dict is an
+event for the client, a Future is a result to wait for, and any other
+callable is blocking work to run.
+"""
+
+import base64
+import json
+import os
+import threading
+import time
+import traceback
+from concurrent.futures import Future
+from datetime import datetime
+from functools import partial
+from typing import Callable, Dict, Generator, Iterator, Optional, Tuple
+
+from werkzeug.utils import secure_filename
+
+from .config import SERVER_CONFIG
+from .inference import (
+    SAMPLE_RATE, InferenceServices, build_services, register_gauges, estimate_audio_seconds, load_live_audio,
+    is_mergeable, load_upload_audio, new_speech_detector, has_speech, transcribe_stream_window,
+    transcribe_upload_window, transcribe_recording
+)
+from .jobs import JobRunner, build_job_runner
+from .load_shedding import ChunkMerger, LiveChunk
+from .metrics import AUDIO_INGESTED_SECONDS, CHUNKS_DROPPED, CHUNKS_FILTERED, observe_decode
+from .model_registry import AVAILABLE_MODELS, QUANTIZED_SUFFIX, cuda_device_name, is_quantized, model_n_mels
+from .pcm_stream import PCMStreamDecoder, PCMFrame, PCMFrameError
+from .progressive import WindowedTranscription
+from .result_cache import ResultCache, audio_digest
+from .streaming import StreamingSession
+from .wav_reader import WavReader
+
+# Audio is converted to WAV in the browser; video containers are decoded by ffmpeg
+VIDEO_EXTENSIONS = ['.mp4', '.avi', '.mov', '.mkv', '.webm']
+
+
+def sse(payload: dict) -> str:
+    """One server-sent event"""
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+def run_steps(steps: Generator) -> Iterator[dict]:
+    """Drive a step generator on the calling thread; yields its events"""
+    value, error = None, None
+    try:
+        while True:
+            try:
+                step = steps.throw(error) if error is not None else steps.send(value)
+            except StopIteration:
+                return
+            value, error = None, None
+            if isinstance(step, dict):
+                yield step
+                continue
+            try:
+                value = step.result() if isinstance(step, Future) else step()
+            except Exception as e:
+                error = e
+    finally:
+        # Also when the client leaves mid-stream: the steps' own cleanup runs now
+        steps.close()
+
+
+def cleanup_audio_item(audio_item):
+    """Remove a temp file or return a PCM frame's buffer to its pool"""
+    if isinstance(audio_item, PCMFrame):
+        audio_item.release()
+        return
+    try:
+        os.remove(audio_item)
+    except OSError:
+        pass
+
+
+def with_id(payload, request_id):
+    """Echo a client-supplied request id back in the reply (used by load-testing tools)"""
+    if request_id is not None:
+        payload['id'] = request_id
+    return payload
+
+
+def write_file(path, data: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def recording_extension(mime_type: str) -> str:
+    """File extension for a browser recording's MIME type"""
+    for ext in ('wav', 'ogg', 'mp4'):
+        if ext in mime_type:
+            return ext
+    return 'webm'
+
+
+class ServerHandlers:
+    """Per-client state and request handling of one server process.
+
+    ``clients`` maps a Socket.IO session id to its state (PCM decoder,
+    model choice, streaming session, speech detector, waiting chunks).
+    ``model_size`` is the server default, changed through ``change_model``.
+    """
+
+    def __init__(self, services: InferenceServices, jobs: JobRunner, emit: Callable[..., None]):
+        self.services = services
+        self.registry = services.registry
+        self.inference_pool = services.inference_pool
+        self.batcher = services.batcher
+        self.shedder = services.shedder
+        self.jobs = jobs
+        self.emit = emit
+        self.clients: Dict[str, dict] = {}
+        self.model_size = SERVER_CONFIG["default_model"]  # large-v3: best accuracy for Indian accents (~10GB VRAM)
+        # Streams keep log-mel features up to date only for models that take them
+        self.incremental_mel = SERVER_CONFIG["stream_incremental_mel"] and self.registry.backend.mel_input
+
+    def start(self):
+        """Load the default model in the background and resume stored jobs; call once the server is up"""
+        threading.Thread(target=self.load_model, daemon=True).start()
+        self.jobs.start()
+
+    def client_model_size(self, client_id):
+        """Model a client's live audio uses: its own choice, else the server default"""
+        client = self.clients.get(client_id)
+        return (client and client.get('model_size')) or self.model_size
+
+    # ------------------------------------------------------------------
+    # HTTP routes
+    # ------------------------------------------------------------------
+
+    def status(self) -> dict:
+        """Server status for /status"""
+        gpu_name = cuda_device_name()
+        return {
+            'model_loaded': self.registry.is_loaded(self.model_size),
+            'model_loading': self.registry.is_loading(),
+            'model_size': self.model_size,
+            'models': self.registry.stats(),
+            'gpu_available': gpu_name is not None,
+            'gpu_name': gpu_name,
+            'scheduler': self.inference_pool.stats(),
+            'batcher': self.batcher.stats(),
+            'load_shedding': self.shedder.stats(),
+            'result_cache': self.services.result_cache.stats(),
+            'jobs': self.jobs.stats(),
+            'available_models': AVAILABLE_MODELS
+        }
+
+    def change_model(self, data: dict) -> Tuple[dict, int]:
+        """Change the default Whisper model (resident models stay loaded for in-flight work)"""
+        new_model_size = data.get('model', 'small')
+        if data.get('compute_type') == 'int8' and not is_quantized(new_model_size):
+            new_model_size += QUANTIZED_SUFFIX  # Dynamic int8 CPU variant
+
+        if new_model_size not in AVAILABLE_MODELS:
+            return {'error': 'Invalid model size'}, 400
+
+        # Load new model in background
+        self.model_size = new_model_size
+        threading.Thread(target=self.load_model, daemon=True).start()
+
+        return {'message': f'Loading {new_model_size} model...', 'model_size': new_model_size}, 200
+
+    def load_model(self):
+        """Load the default Whisper model into the registry and tell every client"""
+        model_size = self.model_size
+        try:
+            print(f"Loading Whisper {model_size} model...")
+            self.registry.get(model_size)
+            self.registry.set_pinned(model_size)
+            print(f"Model loaded successfully on {self.registry.device}")
+            self.emit('model_loaded', {'model_size': model_size})
+        except Exception as e:
+            print(f"Error loading model: {e}")
+            self.emit('error', {'message': f"Failed to load model: {str(e)}"})
+
+    def create_job(self, upload_name: Optional[str], save: Callable[[str], None], model_size: Optional[str],
+                   language: str, uploader: str) -> Tuple[dict, int]:
+        """Queue a file for background transcription; ``save(path)`` stores the upload"""
+        if not upload_name:
+            return {'error': 'No file provided'}, 400
+
+        filename = secure_filename(upload_name)
+        model_size = model_size or self.model_size
+        error = self.jobs.check_request(filename, model_size)
+        if error:
+            return {'error': error}, 400
+
+        job_id = self.jobs.new_job_id()
+        path = self.jobs.upload_path(job_id, filename)
+        save(path)
+        self.jobs.submit(job_id, filename, path, model_size, language, f"upload:{uploader}")
+
+        return {'job_id': job_id, 'status': 'queued', 'url': f'/jobs/{job_id}'}, 202
+
+    def get_job(self, job_id: str, since: int = 0) -> Tuple[dict, int]:
+        """Job status, transcript so far and timings (segments from index ``since``)"""
+        job = self.jobs.describe(job_id, since=since)
+        if job is None:
+            return {'error': 'Unknown job'}, 404
+        return job, 200
+
+    def delete_job(self, job_id: str) -> Tuple[dict, int]:
+        """Cancel a queued or running job, or delete a finished one"""
+        outcome = self.jobs.cancel(job_id)
+        if outcome is None:
+            return {'error': 'Unknown job'}, 404
+        return {'job_id': job_id, 'status': outcome}, 200
+
+    @staticmethod
+    def upload_temp_path(upload_name: str) -> str:
+        """Where /transcribe_file stores an upload until it is transcribed"""
+        os.makedirs("temp", exist_ok=True)
+        return os.path.join("temp", f"upload_{int(time.time())}_{secure_filename(upload_name)}")
+
+    def upload_steps(self, session_id, saved_path, model_size, language) -> Generator:
+        """Transcribe an uploaded file window by window, as steps for ``run_steps`` or an async driver.
+
+        Uploads are scheduled under ``session_id`` (per uploader), so one
+        user's batch can't starve live sessions. Each window is its own
+        scheduled job and its segments are sent as soon as it is decoded.
+        The upload is removed when the steps finish or are closed.
+        """
+        model_size = model_size or self.model_size
+        result_cache = self.services.result_cache
+        try:
+            # Check file format FIRST before any processing
+            file_ext = os.path.splitext(saved_path)[1].lower()
+            if file_ext not in ['.wav'] + VIDEO_EXTENSIONS:
+                # Audio files are converted to WAV in the browser; anything else means that failed
+                yield {'status': 'error', 'message': f'Unsupported file format: {file_ext}. Audio files should be automatically converted to WAV format.'}
+                cleanup_audio_item(saved_path)
+                return
+
+            yield {'status': 'processing', 'message': 'File uploaded', 'progress': 0}
+
+            if model_size not in AVAILABLE_MODELS:
+                yield {'status': 'error', 'message': f'Invalid model size: {model_size}'}
+                cleanup_audio_item(saved_path)
+                return
+
+            start_time = time.time()
+            if file_ext in VIDEO_EXTENSIONS:
+                yield {'status': 'processing', 'message': 'Extracting audio from video...', 'progress': 0}
+
+            lang = None if language == 'auto' else language
+
+            audio_data = None
+            cache_key = None
+            owns_cache_key = False
+            try:
+                audio_data = yield partial(load_upload_audio, saved_path, file_ext)
+
+                # Same decoded audio + model + options as an earlier (or running) upload: reuse its result
+                window_seconds = SERVER_CONFIG["upload_window_seconds"]
+                digest = yield partial(audio_digest, audio_data)
+                cache_key = ResultCache.make_key(
+                    digest, model_size, lang, {'window_seconds': window_seconds, 'initial_prompt': None}
+                )
+                while True:
+                    cached, pending, owns_cache_key = result_cache.claim(cache_key)
+                    if cached is not None or owns_cache_key:
+                        break
+                    yield {'status': 'processing', 'message': 'Identical file is already being transcribed, waiting for it...', 'progress': 0}
+                    try:
+                        yield pending
+                    except Exception:
+                        pass  # That request failed; claim again and transcribe it here
+
+                if cached is not None:
+                    yield dict(cached, status='complete', cached=True, processing_time=time.time() - start_time,
+                               progress=100)
+                    return
+
+                # Load the requested model into the registry if needed (global default untouched)
+                if not self.registry.is_loaded(model_size):
+                    yield {'status': 'processing', 'message': f'Loading {model_size} model...', 'progress': 0}
+                    yield partial(self.registry.get, model_size)
+
+                windows = WindowedTranscription(audio_data, window_seconds=window_seconds)
+                AUDIO_INGESTED_SECONDS.labels('upload').inc(windows.total_seconds)
+
+                yield {'status': 'processing', 'message': 'Transcribing with Whisper...', 'progress': 0,
+                       'total_seconds': round(windows.total_seconds, 2)}
+
+                while not windows.done:
+                    _, window_audio = yield windows.next_window
+                    result = yield self.inference_pool.submit(
+                        session_id,
+                        partial(transcribe_upload_window, self.registry, model_size, window_audio, lang,
+                                windows.prompt(), time.time()),
+                        cost=len(window_audio) / SAMPLE_RATE
+                    )
+
+                    # Lock the language detected on the first window
+                    lang = lang or result.get('language')
+                    new_segments = windows.commit(result)
+
+                    yield {
+                        'status': 'segment',
+                        'text': ''.join(seg['text'] for seg in new_segments).strip(),
+                        'segments': new_segments,
+                        'progress': round(windows.progress, 1),
+                        'processed_seconds': round(windows.processed_seconds, 2),
+                        'total_seconds': round(windows.total_seconds, 2),
+                        'rtf': round(windows.rtf, 3) if windows.rtf else None,
+                        'eta': round(windows.eta, 1) if windows.eta is not None else None
+                    }
+
+                cached = {
+                    'transcription': windows.text,
+                    'segments': windows.segments,
+                    'language': lang or language,
+                    'model': model_size,
+                    'rtf': windows.rtf
+                }
+                yield partial(result_cache.complete, cache_key, cached)
+                owns_cache_key = False
+
+            except Exception as e:
+                print(f"Audio processing error: {e}")
+                error_msg = str(e)
+                if "ffmpeg" in error_msg.lower() or isinstance(e, FileNotFoundError):
+                    yield {'status': 'error', 'message': 'This file format requires ffmpeg which is not installed. For audio files, please convert to WAV format. For video files, please install ffmpeg.'}
+                else:
+                    yield {'status': 'error', 'message': f'Error processing file: {error_msg}'}
+                return
+            finally:
+                # Failed or client went away: release waiting duplicates
+                if owns_cache_key:
+                    result_cache.fail(cache_key, RuntimeError("Transcription did not complete"))
+                # Also runs when the steps are closed because the client left mid-upload.
+                # Unmap the file first so Windows allows the delete
+                if isinstance(audio_data, WavReader):
+                    audio_data.close()
+                cleanup_audio_item(saved_path)
+
+            yield dict(cached, status='complete', cached=False, processing_time=time.time() - start_time,
+                       progress=100)
+
+        except Exception as e:
+            print(f"Transcription error: {e}")
+            traceback.print_exc()
+            yield {'status': 'error', 'message': str(e)}
+
+    # ------------------------------------------------------------------
+    # Socket.IO events
+    # ------------------------------------------------------------------
+
+    def connect(self, client_id):
+        self.clients[client_id] = {
+            'connected_at': time.time(),
+            'transcriptions': [],
+            'pcm_decoder': PCMStreamDecoder(),
+            'model_size': None,  # None follows the server default
+            'stream': None,  # StreamingSession while rolling-window mode is active
+            'vad': new_speech_detector(),  # No-speech pre-classifier for this session's chunks
+            'chunks': ChunkMerger(SERVER_CONFIG["shed_merge_max_seconds"])  # Live chunks waiting to be decoded
+        }
+        print(f"Client connected: {client_id}")
+
+        self.emit('connected', {
+            'client_id': client_id,
+            'model_loaded': self.registry.is_loaded(self.model_size),
+            'model_loading': self.registry.is_loading()
+        }, room=client_id)
+
+    def disconnect(self, client_id):
+        self.clients.pop(client_id, None)
+        # Nobody is left to receive results: free the workers for live sessions
+        cancelled = self.services.scheduler.cancel_session(client_id) + self.batcher.cancel_session(client_id)
+        print(f"Client disconnected: {client_id}" + (f" ({cancelled} queued jobs cancelled)" if cancelled else ""))
+
+    def set_model(self, client_id, data):
+        """Pick the model for this client's live audio without touching the server default"""
+        if client_id not in self.clients:
+            return
+        model_size = data.get('model')
+
+        if model_size is not None and model_size not in AVAILABLE_MODELS:
+            self.emit('error', {'message': f'Invalid model size: {model_size}'}, room=client_id)
+            return
+
+        self.clients[client_id]['model_size'] = model_size
+        model_size = self.client_model_size(client_id)
+        self.emit('model_set', {'model_size': model_size}, room=client_id)
+
+        # Warm it up in the background so the first chunk doesn't pay the load
+        if not self.registry.is_loaded(model_size):
+            threading.Thread(target=self.registry.get, args=(model_size,), daemon=True).start()
+
+    def audio_data(self, client_id, data):
+        """A live chunk in a container (base64): stored as a temp file, then scheduled"""
+        try:
+            audio_bytes = base64.b64decode(data['audio'])
+            audio_format = data.get('format', 'wav')
+
+            # Saved to a temporary file for Whisper to process
+            temp_path = os.path.join("temp", f"temp_audio_{client_id}_{int(time.time()*1000)}.{audio_format}")
+            write_file(temp_path, audio_bytes)
+
+            print(f"Received audio chunk: {len(audio_bytes)} bytes, format: {audio_format}")
+            seconds = estimate_audio_seconds(len(audio_bytes))
+            AUDIO_INGESTED_SECONDS.labels('chunk').inc(seconds)
+
+            # Hand off to the fair scheduler
+            self.queue_chunk(client_id, temp_path, seconds, data.get('id'))
+            self.emit('audio_received', with_id({'timestamp': time.time()}, data.get('id')), room=client_id)
+
+        except Exception as e:
+            print(f"Error handling audio data: {e}")
+            print(traceback.format_exc())
+            self.emit('error', {'message': str(e)}, room=client_id)
+
+    def audio_pcm(self, client_id, payload):
+        """Binary PCM16 frames: 8-byte header (sequence, sample rate) + int16 samples"""
+        try:
+            client = self.clients.get(client_id)
+            if client is None:
+                return
+
+            # Decode straight into a preallocated float32 buffer (no temp file, no ffmpeg)
+            decoder = client['pcm_decoder']
+            frame = decoder.decode(bytes(payload))
+
+            if frame is None:
+                # All buffers still queued for inference - drop rather than grow
+                CHUNKS_DROPPED.labels('no_buffer').inc()
+                self.emit('audio_dropped', {'timestamp': time.time(), 'stats': decoder.stats()}, room=client_id)
+                return
+
+            AUDIO_INGESTED_SECONDS.labels('pcm').inc(frame.duration)
+            if frame.gap:
+                print(f"Client {client_id} missing {frame.gap} PCM frame(s) before #{frame.sequence}")
+                CHUNKS_DROPPED.labels('missing_frame').inc(frame.gap)
+
+            # Streaming mode: grow the session buffer, re-decode every update interval
+            stream = client['stream']
+            if stream is not None:
+                stream.append(frame.audio)
+                frame.release()
+                if stream.ready():
+                    self.schedule_stream_update(client_id, stream)
+            else:
+                self.queue_chunk(client_id, frame, frame.duration)
+
+            self.emit('audio_received', {'timestamp': time.time(), 'sequence': frame.sequence}, room=client_id)
+
+        except PCMFrameError as e:
+            self.emit('error', {'message': f'Invalid PCM frame: {e}'}, room=client_id)
+        except Exception as e:
+            print(f"Error handling PCM data: {e}")
+            print(traceback.format_exc())
+            self.emit('error', {'message': str(e)}, room=client_id)
+
+    def queue_chunk(self, client_id, audio_item, seconds, chunk_id=None):
+        """Schedule a live chunk; while shedding load, it joins the session's group still waiting instead"""
+        client = self.clients.get(client_id)
+        if client is None:
+            CHUNKS_DROPPED.labels('client_gone').inc()
+            cleanup_audio_item(audio_item)
+            return
+        chunk = LiveChunk(audio_item, seconds, time.time(), chunk_id, mergeable=is_mergeable(audio_item))
+        group = client['chunks'].add(chunk, self.shedder.merging)
+        if group is None:
+            self.shedder.record_merge()
+            return
+        future = self.inference_pool.submit(client_id, partial(self.transcribe_chunk, client_id, group), cost=seconds)
+        future.add_done_callback(partial(self.release_cancelled_chunks, group))
+
+    @staticmethod
+    def release_cancelled_chunks(group, future):
+        """A chunk group cancelled on disconnect never runs: free its audio here"""
+        if future.cancelled():
+            for chunk in group:
+                cleanup_audio_item(chunk.item)
+
+    def drop_stale_chunks(self, client_id, chunks):
+        """Last load-shedding step: skip audio that waited too long and tell the client"""
+        fresh = []
+        for chunk in chunks:
+            if not self.shedder.is_stale(chunk.received_at):
+                fresh.append(chunk)
+                continue
+            CHUNKS_DROPPED.labels('overload').inc()
+            self.shedder.record_drop()
+            cleanup_audio_item(chunk.item)
+            self.emit('audio_dropped', with_id({
+                'timestamp': time.time(),
+                'reason': 'overload',
+                'seconds': chunk.seconds,
+                'waited': time.time() - chunk.received_at
+            }, chunk.request_id), room=client_id)
+        return fresh
+
+    def transcribe_chunk(self, client_id, group):
+        """Prepare a live chunk group (temp file paths or decoded PCM frames) and hand it to the batcher"""
+        chunks = list(group)
+        try:
+            # Skip work for clients that went away
+            client = self.clients.get(client_id)
+            if client is None:
+                CHUNKS_DROPPED.labels('client_gone').inc(len(chunks))
+                for chunk in chunks:
+                    cleanup_audio_item(chunk.item)
+                return
+
+            # Chunks that arrive from now on start a new group
+            chunks = self.drop_stale_chunks(client_id, client['chunks'].take(group))
+            if not chunks:
+                return
+
+            # Make sure the model is resident before taking a batcher slot (loads on this worker)
+            model_size = self.shedder.model_for(self.client_model_size(client_id))
+            self.registry.get(model_size)
+
+            audio_input = load_live_audio([chunk.item for chunk in chunks])
+            for chunk in chunks:
+                if not isinstance(chunk.item, PCMFrame):
+                    cleanup_audio_item(chunk.item)
+
+            # Silence and background noise never reach the model
+            source = 'pcm' if isinstance(chunks[0].item, PCMFrame) else 'chunk'
+            if not has_speech(client.get('vad'), audio_input, source):
+                for chunk in chunks:
+                    cleanup_audio_item(chunk.item)
+                    if chunk.request_id is not None:
+                        self.emit('transcription', with_id({'text': '', 'timestamp': time.time(), 'processing_time': 0.0}, chunk.request_id), room=client_id)
+                return
+
+            # Batched with chunks from other sessions; result is emitted from the batcher thread
+            start_time = time.time()
+            future = self.batcher.submit(client_id, audio_input, model_size)
+            future.add_done_callback(partial(self.emit_chunk_result, client_id, chunks, start_time))
+
+        except Exception as e:
+            print(f"Transcription error: {e}")
+            print(traceback.format_exc())
+            for chunk in chunks:
+                cleanup_audio_item(chunk.item)
+                if client_id in self.clients:
+                    self.emit('error', with_id({'message': str(e)}, chunk.request_id), room=client_id)
+
+    def emit_chunk_result(self, client_id, chunks, start_time, future):
+        """Send a batched chunk group's transcription back to its client's room"""
+        last = chunks[-1]
+        try:
+            if future.cancelled():
+                return  # Client left while its chunk waited for a batch
+            result = future.result()
+            processing_time = time.time() - start_time
+
+            # Waiting covers the fair scheduler and the batcher's collection window, from the oldest chunk
+            received_at = chunks[0].received_at
+            observe_decode('chunk', result['model'], (start_time - received_at) + result['queue_wait'],
+                           result['decode_time'], result['batch_audio_seconds'])
+            self.shedder.observe(sum(chunk.seconds for chunk in chunks), time.time() - received_at)
+
+            if not result['text']:
+                CHUNKS_FILTERED.labels('no_speech').inc()
+            if client_id not in self.clients:
+                return
+            for chunk in chunks[:-1]:
+                if chunk.request_id is not None:
+                    # Merged under load: its text arrives with the group's last chunk
+                    self.emit('transcription', with_id({
+                        'text': '', 'timestamp': time.time(), 'merged_into': last.request_id
+                    }, chunk.request_id), room=client_id)
+            if result['text'] or last.request_id is not None:
+                # Chunks sent with an id are always answered, even when nothing was said
+                self.emit('transcription', with_id({
+                    'text': result['text'],
+                    'timestamp': time.time(),
+                    'processing_time': processing_time,
+                    'language': result.get('language', 'en'),
+                    'merged': len(chunks)
+                }, last.request_id), room=client_id)
+                print(f"Transcribed: {result['text']} (batch of {result['batch_size']})")
+
+        except Exception as e:
+            print(f"Transcription error: {e}")
+            if client_id in self.clients:
+                for chunk in chunks:
+                    self.emit('error', with_id({'message': str(e)}, chunk.request_id), room=client_id)
+        finally:
+            # PCM buffers stay in use until the batch has been decoded
+            for chunk in chunks:
+                cleanup_audio_item(chunk.item)
+
+    def stream_start(self, client_id):
+        """Switch this client's audio_pcm frames to rolling-window streaming mode"""
+        if client_id not in self.clients:
+            return
+        self.clients[client_id]['stream'] = StreamingSession(
+            update_interval=SERVER_CONFIG["stream_update_interval"],
+            max_buffer_seconds=SERVER_CONFIG["stream_max_buffer"],
+            force_commit_after=SERVER_CONFIG["stream_force_commit_after"],
+            # Features for the model this client uses now; decodes on another model recompute them
+            n_mels=model_n_mels(self.client_model_size(client_id)) if self.incremental_mel else None
+        )
+        self.emit('stream_started', {'timestamp': time.time()}, room=client_id)
+
+    def stream_stop(self, client_id):
+        """Leave streaming mode, committing whatever is still pending"""
+        client = self.clients.get(client_id)
+        if client is None or client['stream'] is None:
+            return
+        stream = client['stream']
+        client['stream'] = None
+        self.inference_pool.submit(
+            client_id,
+            partial(self.finish_stream, client_id, stream, self.client_model_size(client_id)),
+            cost=stream.buffered_seconds
+        )
+
+    def schedule_stream_update(self, client_id, stream):
+        """Queue a re-decode of the session buffer (cost grows with buffered audio)"""
+        self.inference_pool.submit(
+            client_id,
+            partial(self.run_stream_update, client_id, stream,
+                    self.shedder.model_for(self.client_model_size(client_id)), time.time()),
+            cost=stream.buffered_seconds
+        )
+
+    def run_stream_update(self, client_id, stream, model_size, scheduled_at):
+        """Re-decode the rolling buffer and emit committed (final) and unstable (partial) text"""
+        try:
+            if client_id not in self.clients:
+                return
+
+            start_time = time.time()
+            final_text, partial_text = stream.process(partial(
+                transcribe_stream_window, self.registry, model_size, scheduled_at=scheduled_at,
+                greedy=self.shedder.greedy))
+            processing_time = time.time() - start_time
+
+            if final_text:
+                self.emit('final', {
+                    'text': final_text,
+                    'timestamp': time.time(),
+                    'processing_time': processing_time
+                }, room=client_id)
+            self.emit('partial', {'text': partial_text, 'timestamp': time.time()}, room=client_id)
+
+            # More audio arrived while decoding
+            if stream.ready():
+                self.schedule_stream_update(client_id, stream)
+
+        except Exception as e:
+            print(f"Streaming transcription error: {e}")
+            print(traceback.format_exc())
+            self.emit('error', {'message': str(e)}, room=client_id)
+
+    def finish_stream(self, client_id, stream, model_size):
+        """Decode the tail of a stopped stream and commit everything left"""
+        try:
+            final_text, _ = stream.process(partial(transcribe_stream_window, self.registry, model_size))
+            remaining = stream.flush()
+            final_text = " ".join(t for t in (final_text, remaining) if t)
+
+            if final_text:
+                self.emit('final', {'text': final_text, 'timestamp': time.time()}, room=client_id)
+            self.emit('partial', {'text': '', 'timestamp': time.time()}, room=client_id)
+            self.emit('stream_stopped', {'timestamp': time.time()}, room=client_id)
+
+        except Exception as e:
+            print(f"Error finishing stream: {e}")
+            self.emit('error', {'message': str(e)}, room=client_id)
+
+    def audio_blob(self, client_id, data):
+        """A complete browser recording: stored as a temp file and transcribed on an inference worker"""
+        try:
+            audio_bytes = base64.b64decode(data['audio'])
+            mime_type = data.get('mimeType', 'audio/webm')
+            duration = data.get('duration', 0)
+            print(f"Received audio blob: {len(audio_bytes)} bytes, type: {mime_type}, duration: {duration}s")
+
+            model_size = data.get('model') or self.client_model_size(client_id)
+            if model_size not in AVAILABLE_MODELS:
+                self.emit('error', {'message': f'Invalid model size: {model_size}'}, room=client_id)
+                return
+
+            ext = recording_extension(mime_type)
+            temp_path = os.path.join("temp", f"recording_{client_id}_{int(time.time())}.{ext}")
+            write_file(temp_path, audio_bytes)
+            print(f"Saved audio to: {temp_path}")
+
+            # Queue on the fair scheduler instead of blocking the handler
+            cost = duration or estimate_audio_seconds(len(audio_bytes))
+            AUDIO_INGESTED_SECONDS.labels('recording').inc(cost)
+            future = self.inference_pool.submit(
+                client_id,
+                partial(self.transcribe_blob, client_id, temp_path, ext, model_size, time.time(), data.get('id')),
+                cost=cost
+            )
+            # Cancelled on disconnect before it ran: the recording is still on disk
+            future.add_done_callback(lambda f: f.cancelled() and cleanup_audio_item(temp_path))
+
+        except Exception as e:
+            print(f"Error handling audio blob: {e}")
+            traceback.print_exc()
+            self.emit('error', {'message': str(e)}, room=client_id)
+
+    def transcribe_blob(self, client_id, temp_path, ext, model_size, submitted_at, request_id=None):
+        """Load a complete recording and transcribe it (runs on an inference worker)"""
+        try:
+            if client_id not in self.clients:
+                return
+
+            print(f"Processing with Whisper (model: {model_size})...")
+            transcribed_text, language = transcribe_recording(self.registry, temp_path, ext, model_size, submitted_at)
+
+            if transcribed_text:
+                self.emit('transcription', with_id({
+                    'text': transcribed_text,
+                    'timestamp': time.time(),
+                    'language': language
+                }, request_id), room=client_id)
+            else:
+                self.emit('error', with_id({'message': 'No speech detected in audio'}, request_id), room=client_id)
+
+        except Exception as e:
+            print(f"Transcription error: {e}")
+            traceback.print_exc()
+            self.emit('error', with_id({'message': f'Transcription failed: {str(e)}'}, request_id), room=client_id)
+        finally:
+            cleanup_audio_item(temp_path)
+
+    def save_transcript(self, client_id, data):
+        """Save a client's transcript under transcripts/"""
+        try:
+            transcript = data.get('transcript', '')
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"transcript_{timestamp}.txt"
+            filepath = os.path.join("transcripts", filename)
+
+            content = (
+                "WhisperLive Transcript\n"
+                f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+                + "=" * 50 + "\n\n"
+                + transcript
+            )
+            write_file(filepath, content.encode('utf-8'))
+
+            self.emit('save_complete', {'filename': filename, 'path': filepath}, room=client_id)
+
+        except Exception as e:
+            print(f"Error saving transcript: {e}")
+            self.emit('error', {'message': f"Failed to save: {str(e)}"}, room=client_id)
+
+
+def build_handlers(emit: Callable[..., None]) -> ServerHandlers:
+    """Inference services, job runner and handlers from SERVER_CONFIG; call ``start()`` once the server is up"""
+    services = build_services()
+    jobs = build_job_runner(services)  # Durable file transcription jobs (/jobs), resumed after a restart
+    handlers = ServerHandlers(services, jobs, emit)
+    # Gauges read state the server already keeps, only when /metrics is scraped
+    register_gauges(services, handlers.clients)
+    return handlers
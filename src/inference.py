@@ -0,0 +1,333 @@
+"""Transport-independent server pieces shared by the Flask and asyncio entry points.
+
+Everything here is blocking and meant to run on an inference worker (or a
+plain thread); the entry points only differ in how they receive audio and
+deliver results.
+"""
+
+import os
+import time
+from dataclasses import dataclass
+from functools import partial
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .batcher import DynamicBatcher
+from .config import SERVER_CONFIG, WHISPER_CONFIG
+from .backends import FALLBACK_TEMPERATURES, create_backend
+from .features import HOP_LENGTH, SAMPLE_RATE
+from .load_shedding import LoadShedder
+from .metrics import (
+    QUEUE_DEPTH, ACTIVE_SESSIONS, INFERENCE_WORKERS_BUSY, MODELS_RESIDENT, CHUNKS_FILTERED, VAD_SKIPPED_SECONDS,
+    observe_decode
+)
+from .model_registry import ModelRegistry
+from .pcm_stream import PCMFrame
+from .progressive import WindowedTranscription
+from .resampler import resample
+from .result_cache import ResultCache
+from .scheduler import FairScheduler, InferencePool
+from .vad import SpeechDetector
+from .warmup import prepare_model
+from .wav_reader import WavReader
+
+# Short outputs Whisper tends to produce on silence or noise
+HALLUCINATIONS = [
+    "thank you", "thanks for watching", "thanks",
+    "bye", "goodbye", "see you later",
+    "♪", "[music]", "[Music]", "[MUSIC]",
+    "you", "yeah", "uh", "um"
+]
+
+
+@dataclass
+class InferenceServices:
+    registry: ModelRegistry
+    scheduler: FairScheduler
+    inference_pool: InferencePool
+    batcher: DynamicBatcher
+    result_cache: ResultCache
+    shedder: LoadShedder
+
+
+def build_backend(name: Optional[str] = None):
+    """Inference engine ``name`` (default: SERVER_CONFIG["backend"])"""
+    name = name or SERVER_CONFIG["backend"]
+    if name == "remote":
+        return create_backend(name, socket_path=SERVER_CONFIG["model_server_socket"],
+                              connect_timeout=SERVER_CONFIG["model_server_connect_timeout"])
+    if name == "fake":
+        return create_backend(name, latency=SERVER_CONFIG["fake_latency"], rtf=SERVER_CONFIG["fake_rtf"])
+    if name == "whisper":
+        return create_backend(name, quantized_dir=WHISPER_CONFIG["quantized_model_dir"],
+                              model_store_dir=WHISPER_CONFIG["model_store_dir"])
+    return create_backend(name)
+
+
+def build_warmup(backend_name: Optional[str] = None):
+    """Compile (if enabled) and warm-up step run on every model the registry loads, or None"""
+    # A model server warms up the models it loads; handles to them need nothing
+    if not SERVER_CONFIG["warmup"] or (backend_name or SERVER_CONFIG["backend"]) == "remote":
+        return None
+    return partial(
+        prepare_model,
+        chunk_seconds=SERVER_CONFIG["warmup_chunk_seconds"],
+        batch_sizes=sorted({1, SERVER_CONFIG["batch_max_size"]}),
+        compile=WHISPER_CONFIG["compile"],
+        compile_cache_dir=WHISPER_CONFIG["compile_cache_dir"],
+    )
+
+
+def build_registry(backend_name: Optional[str] = None) -> ModelRegistry:
+    """Model registry from SERVER_CONFIG, loading through backend ``backend_name``"""
+    # Resident Whisper models, LRU-evicted under a memory budget. Each entry carries its
+    # own lock because Whisper installs kv-cache hooks on the model during decode.
+    return ModelRegistry(
+        memory_budget_gb=SERVER_CONFIG["model_memory_budget_gb"],
+        idle_timeout=SERVER_CONFIG["model_idle_timeout"],
+        backend=build_backend(backend_name),
+        warmup=build_warmup(backend_name)
+    )
+
+
+def build_services() -> InferenceServices:
+    """Create the model registry, fair scheduler, worker pool, batcher and result cache from SERVER_CONFIG"""
+    registry = build_registry()
+
+    # Every ingest path goes through one fair scheduler drained by a pool of inference workers
+    scheduler = FairScheduler(
+        policy=SERVER_CONFIG["scheduler_policy"],
+        quantum=SERVER_CONFIG["scheduler_quantum"]
+    )
+    inference_pool = InferencePool(scheduler, num_workers=SERVER_CONFIG["inference_workers"])
+
+    # Finished upload transcriptions, keyed by decoded audio + model + options
+    result_cache = ResultCache(
+        SERVER_CONFIG["result_cache_dir"],
+        max_bytes=int(SERVER_CONFIG["result_cache_max_mb"] * 1024**2)
+    )
+
+    # Live chunks from all sessions are decoded together in small batches
+    batcher = DynamicBatcher(
+        registry,
+        max_batch_size=SERVER_CONFIG["batch_max_size"],
+        max_wait=SERVER_CONFIG["batch_max_wait"],
+        language="en",
+        initial_prompt="This is a speech transcription in Indian English."
+    )
+
+    # Degrades live decoding step by step while the live queues back up (interval 0: never sheds)
+    shedder = LoadShedder(
+        lambda: scheduler_depth(scheduler, 'live') + batcher.queue.qsize(),
+        max_depth=SERVER_CONFIG["shed_max_queue_depth"],
+        max_rtf=SERVER_CONFIG["shed_max_rtf"],
+        up_after=SERVER_CONFIG["shed_up_after"],
+        down_after=SERVER_CONFIG["shed_down_after"],
+        fallback_model=SERVER_CONFIG["shed_fallback_model"],
+        stale_after=SERVER_CONFIG["shed_stale_after"],
+        interval=0.5 if SERVER_CONFIG["load_shedding"] else 0
+    )
+
+    return InferenceServices(registry, scheduler, inference_pool, batcher, result_cache, shedder)
+
+
+def scheduler_depth(scheduler: FairScheduler, queue_class: str) -> int:
+    """Jobs waiting in the fair scheduler for live sessions or uploads"""
+    sessions = scheduler.stats()['sessions']
+    return sum(n for sid, n in sessions.items() if sid.startswith('upload:') == (queue_class == 'upload'))
+
+
+def register_gauges(services: InferenceServices, clients: dict):
+    """Point the scrape-time gauges at this server's state"""
+    QUEUE_DEPTH.labels('live').set_function(partial(scheduler_depth, services.scheduler, 'live'))
+    QUEUE_DEPTH.labels('upload').set_function(partial(scheduler_depth, services.scheduler, 'upload'))
+    QUEUE_DEPTH.labels('batcher').set_function(services.batcher.queue.qsize)
+    ACTIVE_SESSIONS.labels('connected').set_function(lambda: len(clients))
+    ACTIVE_SESSIONS.labels('streaming').set_function(
+        lambda: sum(1 for c in list(clients.values()) if c['stream'] is not None))
+    INFERENCE_WORKERS_BUSY.set_function(lambda: services.inference_pool.busy)
+    MODELS_RESIDENT.set_function(lambda: len(services.registry.entries))
+
+
+def estimate_audio_seconds(num_bytes):
+    """Rough audio duration used as the scheduling cost of a job (16-bit mono at 16kHz)"""
+    return num_bytes / (SAMPLE_RATE * 2)
+
+
+def load_chunk_audio(path):
+    """Load a short live chunk from a temp file as 16kHz mono float32"""
+    if path.endswith('.wav'):
+        reader = WavReader(path)
+        audio_data = reader.read(0, len(reader))
+        reader.close()
+        return audio_data
+    # Other containers (e.g. webm from MediaRecorder) still need ffmpeg
+    import whisper
+    return whisper.load_audio(path)
+
+
+def load_live_audio(items):
+    """Samples of one or more live chunks (temp file paths or PCM frames), joined in arrival order"""
+    parts = [item.audio if isinstance(item, PCMFrame) else load_chunk_audio(item) for item in items]
+    return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+
+def is_mergeable(item) -> bool:
+    # Only audio whose duration is known up front can be merged safely under the 30 s window
+    return isinstance(item, PCMFrame) or item.endswith('.wav')
+
+
+def load_upload_audio(path, file_ext):
+    """Open an uploaded file as 16kHz mono float32 audio (sliceable, sized by len())"""
+    if file_ext == '.wav':
+        # WAV files - no ffmpeg needed; memory-mapped, converted one window at a time
+        return WavReader(path)
+
+    # Video formats - decoded by ffmpeg if available; fails with a clear error otherwise
+    import whisper
+    return whisper.load_audio(path)
+
+
+def load_recording_audio(path, ext):
+    """Load a browser recording without ffmpeg: WAV is memory-mapped, other formats go through librosa"""
+    if ext == 'wav':
+        # Memory-map the WAV file (no ffmpeg needed); blocks are converted to 16kHz mono on demand
+        print("Mapping WAV file...")
+        try:
+            audio_data = WavReader(path)
+            print(f"WAV mapped: sample_rate={audio_data.sample_rate}, channels={audio_data.channels}, duration={audio_data.duration:.1f}s")
+            return audio_data
+        except Exception as e:
+            print(f"WAV reader failed: {e}")
+    else:
+        # For non-WAV formats, use librosa
+        import librosa
+        print(f"Loading {ext} file with librosa...")
+        try:
+            audio_data, sample_rate = librosa.load(path, sr=16000, mono=True)
+            print(f"Audio loaded: shape={audio_data.shape}, dtype={audio_data.dtype}")
+            return audio_data
+        except Exception as e:
+            print(f"Librosa failed: {e}")
+
+    # Fallback to soundfile
+    import soundfile as sf
+    audio_data, sample_rate = sf.read(path, dtype='float32')
+    if len(audio_data.shape) > 1:
+        audio_data = audio_data.mean(axis=1)
+    return resample(audio_data, sample_rate)
+
+
+def new_speech_detector() -> Optional[SpeechDetector]:
+    """Per-session no-speech pre-classifier, or None when disabled"""
+    if not SERVER_CONFIG["vad_prefilter"]:
+        return None
+    return SpeechDetector(min_speech=SERVER_CONFIG["vad_min_speech"])
+
+
+def has_speech(detector: Optional[SpeechDetector], audio, source: str) -> bool:
+    """Ask the pre-classifier whether audio is worth decoding; count what it skips"""
+    if detector is None or detector.is_speech(audio):
+        return True
+    CHUNKS_FILTERED.labels('vad').inc()
+    VAD_SKIPPED_SECONDS.labels(source).inc(len(audio) / SAMPLE_RATE)
+    return False
+
+
+def filter_hallucination(text: str) -> str:
+    """Drop a transcription that is only a typical silence hallucination"""
+    if text.lower() in HALLUCINATIONS:
+        print(f"Filtered out hallucination: {text}")
+        CHUNKS_FILTERED.labels('hallucination').inc()
+        return ""
+    return text
+
+
+def transcribe_stream_window(registry, model_size, audio, prompt, mel=None, scheduled_at=None, greedy=False):
+    """Decode a streaming session's uncommitted buffer with word timestamps (``greedy``: no temperature fallback)"""
+    temperatures = (0.0,) if greedy else FALLBACK_TEMPERATURES
+    with registry.acquire(model_size) as entry, entry.lock:
+        started = time.time()
+        capabilities = entry.model.capabilities
+        if mel is not None and capabilities.mel_input and mel.shape[0] == capabilities.n_mels:
+            # Features were kept up to date as audio arrived
+            result = entry.model.transcribe_mel(mel, len(audio) // HOP_LENGTH, "en", prompt,
+                                                temperatures=temperatures)
+        else:
+            result = entry.model.transcribe(
+                audio,
+                language="en",
+                task="transcribe",
+                temperature=temperatures,
+                initial_prompt=prompt,
+                condition_on_previous_text=False,
+                word_timestamps=True
+            )
+    observe_decode('stream', model_size, started - (scheduled_at or started), time.time() - started,
+                   len(audio) / SAMPLE_RATE)
+    return result
+
+
+def transcribe_upload_window(registry, model_size, audio, language, prompt, submitted_at):
+    """Transcribe one window of an uploaded file (runs on an inference worker)"""
+    with registry.acquire(model_size) as entry, entry.lock:
+        started = time.time()
+        result = entry.model.transcribe(
+            audio,
+            language=language,
+            initial_prompt=prompt,
+            verbose=None
+        )
+    observe_decode('upload', model_size, started - submitted_at, time.time() - started, len(audio) / SAMPLE_RATE)
+    return result
+
+
+def transcribe_recording(registry, path, ext, model_size, submitted_at) -> Tuple[str, Optional[str]]:
+    """Transcribe a complete recording window by window; returns (filtered text, language)"""
+    abs_path = os.path.abspath(path)
+    print(f"Processing audio file: {abs_path}")
+    print(f"File size: {os.path.getsize(abs_path)} bytes, extension: {ext}")
+
+    audio_data = load_recording_audio(abs_path, ext)
+
+    # Transcribe window by window (bypasses ffmpeg completely); peak memory follows
+    # the window size, not the recording length
+    print("Transcribing audio array with Whisper...")
+    windows = WindowedTranscription(audio_data, window_seconds=SERVER_CONFIG["upload_window_seconds"])
+    detector = new_speech_detector()
+    result = {}
+    try:
+        while not windows.done:
+            _, window_audio = windows.next_window()
+
+            if not has_speech(detector, window_audio, 'recording'):
+                windows.commit({'segments': []})  # Silent window: move past it without decoding
+                continue
+
+            # Ensure audio is properly normalized for Whisper
+            peak = np.abs(window_audio).max() if len(window_audio) else 0.0
+            if peak > 1.0:
+                print(f"Normalizing window with peak {peak:.3f} to [-1, 1]")
+                window_audio = window_audio / peak
+
+            with registry.acquire(model_size) as entry, entry.lock:
+                started = time.time()
+                result = entry.model.transcribe(
+                    window_audio,  # numpy array, not file path!
+                    language="en",
+                    no_speech_threshold=0.6,  # Higher threshold to reduce hallucinations
+                    compression_ratio_threshold=2.4,  # Filter out repetitive text
+                    initial_prompt=windows.prompt(),
+                    verbose=None
+                )
+            observe_decode('recording', model_size, started - submitted_at, time.time() - started,
+                           len(window_audio) / SAMPLE_RATE)
+            submitted_at = time.time()  # Later windows don't wait in a queue
+            windows.commit(result)
+    finally:
+        if isinstance(audio_data, WavReader):
+            audio_data.close()
+
+    print(f"Transcription result: {windows.text}")
+    return filter_hallucination(windows.text), result.get('language', 'en')
@@ -0,0 +1,383 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from functools import partial
+from typing import Dict, List, Optional
+
+from .config import SERVER_CONFIG
+from .inference import SAMPLE_RATE, InferenceServices, load_upload_audio, transcribe_upload_window
+from .metrics import AUDIO_INGESTED_SECONDS
+from .model_registry import AVAILABLE_MODELS
+from .progressive import WindowedTranscription
+from .result_cache import ResultCache, audio_digest
+from .wav_reader import WavReader
+
+ACTIVE_STATUSES = ("queued", "running")
+JOB_STATUSES = ACTIVE_STATUSES + ("completed", "failed", "cancelled")
+
+# WAV is read directly; video containers need ffmpeg (other audio is converted to WAV in the browser)
+JOB_EXTENSIONS = (".wav", ".mp4", ".avi", ".mov", ".mkv", ".webm")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    path TEXT NOT NULL,
+    model TEXT NOT NULL,
+    language TEXT NOT NULL,
+    detected_language TEXT,
+    session_id TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    position INTEGER NOT NULL DEFAULT 0,
+    processed_seconds REAL NOT NULL DEFAULT 0,
+    total_seconds REAL,
+    processing_time REAL NOT NULL DEFAULT 0,
+    cached INTEGER NOT NULL DEFAULT 0,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);
+CREATE TABLE IF NOT EXISTS job_segments (
+    job_id TEXT NOT NULL REFERENCES jobs (id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    start REAL NOT NULL,
+    end REAL NOT NULL,
+    text TEXT NOT NULL,
+    PRIMARY KEY (job_id, seq)
+);
+"""
+
+
+class JobStore:
+    """File transcription jobs in SQLite (WAL mode).
+
+    Each decoded window is committed in one transaction together with the new
+    read position, so after a crash or restart a job resumes at the last
+    committed window instead of starting over. One connection is shared
+    between threads behind a lock; WAL keeps readers (status polls) from
+    blocking the writer.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")  # Durable at each WAL checkpoint; enough for resumable work
+        self.db.execute("PRAGMA foreign_keys=ON")
+        self.db.executescript(SCHEMA)
+
+    def create(self, job_id: str, filename: str, path: str, model: str, language: str, session_id: str):
+        with self.lock:
+            self.db.execute(
+                "INSERT INTO jobs (id, status, filename, path, model, language, session_id, created_at) "
+                "VALUES (?, 'queued', ?, ?, ?, ?, ?, ?)",
+                (job_id, filename, path, model, language, session_id, time.time()),
+            )
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self.lock:
+            row = self.db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def status(self, job_id: str) -> Optional[str]:
+        with self.lock:
+            row = self.db.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return row["status"] if row is not None else None
+
+    def segments(self, job_id: str, since: int = 0) -> List[dict]:
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT start, end, text FROM job_segments WHERE job_id = ? AND seq >= ? ORDER BY seq",
+                (job_id, since),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def pending(self) -> List[str]:
+        """Queued and interrupted jobs, oldest first."""
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT id FROM jobs WHERE status IN (?, ?) ORDER BY created_at", ACTIVE_STATUSES
+            ).fetchall()
+        return [row["id"] for row in rows]
+
+    def start(self, job_id: str, total_seconds: float) -> bool:
+        with self.lock:
+            cursor = self.db.execute(
+                "UPDATE jobs SET status = 'running', started_at = COALESCE(started_at, ?), total_seconds = ? "
+                "WHERE id = ? AND status IN (?, ?)",
+                (time.time(), total_seconds, job_id) + ACTIVE_STATUSES,
+            )
+        return cursor.rowcount > 0
+
+    def commit_window(self, job_id: str, position: int, processed_seconds: float, first_seq: int,
+                      segments: List[dict], processing_time: float, language: Optional[str]):
+        with self.lock:
+            self.db.execute("BEGIN")
+            try:
+                self.db.executemany(
+                    "INSERT OR REPLACE INTO job_segments (job_id, seq, start, end, text) VALUES (?, ?, ?, ?, ?)",
+                    [(job_id, first_seq + i, s["start"], s["end"], s["text"]) for i, s in enumerate(segments)],
+                )
+                self.db.execute(
+                    "UPDATE jobs SET position = ?, processed_seconds = ?, processing_time = ?, "
+                    "detected_language = COALESCE(detected_language, ?) WHERE id = ?",
+                    (position, processed_seconds, processing_time, language, job_id),
+                )
+                self.db.execute("COMMIT")
+            except Exception:
+                self.db.execute("ROLLBACK")
+                raise
+
+    def finish(self, job_id: str, status: str, error: Optional[str] = None, cached: Optional[dict] = None) -> bool:
+        """Move an active job to a terminal status; a cancelled job stays cancelled."""
+        with self.lock:
+            self.db.execute("BEGIN")
+            try:
+                cursor = self.db.execute(
+                    "UPDATE jobs SET status = ?, finished_at = ?, error = ? WHERE id = ? AND status IN (?, ?)",
+                    (status, time.time(), error, job_id) + ACTIVE_STATUSES,
+                )
+                if cursor.rowcount and cached is not None:
+                    # Served from the result cache: the segments come from there
+                    self.db.execute("DELETE FROM job_segments WHERE job_id = ?", (job_id,))
+                    self.db.executemany(
+                        "INSERT INTO job_segments (job_id, seq, start, end, text) VALUES (?, ?, ?, ?, ?)",
+                        [(job_id, i, s["start"], s["end"], s["text"]) for i, s in enumerate(cached["segments"])],
+                    )
+                    self.db.execute(
+                        "UPDATE jobs SET cached = 1, detected_language = ?, processed_seconds = total_seconds "
+                        "WHERE id = ?",
+                        (cached.get("language"), job_id),
+                    )
+                self.db.execute("COMMIT")
+            except Exception:
+                self.db.execute("ROLLBACK")
+                raise
+        return cursor.rowcount > 0
+
+    def cancel(self, job_id: str) -> bool:
+        return self.finish(job_id, "cancelled")
+
+    def delete(self, job_id: str) -> bool:
+        with self.lock:
+            cursor = self.db.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+        return cursor.rowcount > 0
+
+    def counts(self) -> Dict[str, int]:
+        with self.lock:
+            rows = self.db.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+
+class JobRunner:
+    """Runs file transcription jobs from a JobStore in the background.
+
+    A few driver threads walk each job window by window, submitting every
+    window to the shared fair scheduler (so jobs interleave with live
+    sessions and SSE uploads) and committing it to the store before the next.
+    ``start()`` re-queues whatever was queued or running when the server
+    stopped.
+    """
+
+    def __init__(self, store: JobStore, services: InferenceServices, upload_dir: str, num_workers: int = 1):
+        self.store = store
+        self.services = services
+        self.upload_dir = upload_dir
+        self.num_workers = max(1, num_workers)
+        self.queue: "queue.Queue[str]" = queue.Queue()
+        self.threads: List[threading.Thread] = []
+        os.makedirs(upload_dir, exist_ok=True)
+
+    def start(self):
+        resumed = self.store.pending()
+        for job_id in resumed:
+            self.queue.put(job_id)
+        if resumed:
+            print(f"Resuming {len(resumed)} transcription job(s)")
+        for i in range(self.num_workers):
+            thread = threading.Thread(target=self._worker_loop, name=f"jobs-{i}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def upload_path(self, job_id: str, filename: str) -> str:
+        return os.path.join(self.upload_dir, f"{job_id}{os.path.splitext(filename)[1].lower()}")
+
+    def new_job_id(self) -> str:
+        return uuid.uuid4().hex
+
+    @staticmethod
+    def check_request(filename: str, model_size: str) -> Optional[str]:
+        """Why a job can't be accepted, or None"""
+        file_ext = os.path.splitext(filename)[1].lower()
+        if file_ext not in JOB_EXTENSIONS:
+            return f"Unsupported file format: {file_ext}"
+        if model_size not in AVAILABLE_MODELS:
+            return f"Invalid model size: {model_size}"
+        return None
+
+    def submit(self, job_id: str, filename: str, path: str, model: str, language: str, session_id: str):
+        """Queue a job whose upload has already been saved to ``path``"""
+        self.store.create(job_id, filename, path, model, language, session_id)
+        self.queue.put(job_id)
+
+    def cancel(self, job_id: str) -> Optional[str]:
+        """Cancel an active job, or forget a finished one. Returns the resulting status (None if unknown)."""
+        job = self.store.get(job_id)
+        if job is None:
+            return None
+        if self.store.cancel(job_id):
+            # A running job stops before its next window; its driver removes the upload
+            if job["status"] == "queued":
+                self._remove_upload(job["path"])
+            return "cancelled"
+        self.store.delete(job_id)
+        return "deleted"
+
+    def describe(self, job_id: str, since: int = 0) -> Optional[dict]:
+        job = self.store.get(job_id)
+        if job is None:
+            return None
+        segments = self.store.segments(job_id)
+        total = job["total_seconds"]
+        processed = job["processed_seconds"]
+        rtf = job["processing_time"] / processed if processed and not job["cached"] else None
+        eta = rtf * (total - processed) if rtf is not None and total and job["status"] == "running" else None
+        return {
+            "job_id": job["id"],
+            "status": job["status"],
+            "filename": job["filename"],
+            "model": job["model"],
+            "language": job["detected_language"] or job["language"],
+            "cached": bool(job["cached"]),
+            "progress": round(100.0 * processed / total, 1) if total else (100.0 if job["status"] == "completed" else 0.0),
+            "processed_seconds": round(processed, 2),
+            "total_seconds": round(total, 2) if total is not None else None,
+            "text": "".join(s["text"] for s in segments).strip(),
+            "segments": segments[since:],
+            "next_segment": len(segments),
+            "error": job["error"],
+            "created_at": job["created_at"],
+            "started_at": job["started_at"],
+            "finished_at": job["finished_at"],
+            "queue_wait": round(job["started_at"] - job["created_at"], 3) if job["started_at"] else None,
+            "processing_time": round(job["processing_time"], 3),
+            "rtf": round(rtf, 3) if rtf else None,
+            "eta": round(eta, 1) if eta is not None else None,
+        }
+
+    def stats(self) -> dict:
+        return {"workers": self.num_workers, "queued": self.queue.qsize(), "jobs": self.store.counts()}
+
+    def _worker_loop(self):
+        while True:
+            job_id = self.queue.get()
+            try:
+                self._run(job_id)
+            except Exception as e:
+                print(f"Job {job_id} error: {e}")
+                print(traceback.format_exc())
+
+    def _run(self, job_id: str):
+        job = self.store.get(job_id)
+        if job is None or job["status"] not in ACTIVE_STATUSES:
+            return
+
+        services = self.services
+        model_size = job["model"]
+        lang = job["detected_language"] or (None if job["language"] == "auto" else job["language"])
+        file_ext = os.path.splitext(job["path"])[1].lower()
+
+        audio_data = None
+        cache_key = None
+        owns_cache_key = False
+        try:
+            audio_data = load_upload_audio(job["path"], file_ext)
+            if not self.store.start(job_id, len(audio_data) / SAMPLE_RATE):
+                return  # Cancelled while queued
+
+            # Same key as /transcribe_file, so jobs and SSE uploads share results
+            window_seconds = SERVER_CONFIG["upload_window_seconds"]
+            requested_lang = None if job["language"] == "auto" else job["language"]
+            cache_key = ResultCache.make_key(
+                audio_digest(audio_data), model_size, requested_lang,
+                {"window_seconds": window_seconds, "initial_prompt": None}
+            )
+            while True:
+                cached, pending, owns_cache_key = services.result_cache.claim(cache_key)
+                if cached is not None or owns_cache_key:
+                    break
+                try:
+                    pending.result()
+                except Exception:
+                    pass  # That request failed; claim again and transcribe it here
+
+            if cached is not None:
+                self.store.finish(job_id, "completed", cached=cached)
+                return
+
+            windows = WindowedTranscription(audio_data, window_seconds=window_seconds)
+            windows.restore(job["position"], self.store.segments(job_id), job["processing_time"])
+            AUDIO_INGESTED_SECONDS.labels("upload").inc(windows.total_seconds - windows.processed_seconds)
+
+            while not windows.done:
+                if self.store.status(job_id) != "running":
+                    return  # Cancelled (or deleted) between windows
+                _, window_audio = windows.next_window()
+                result = services.inference_pool.submit(
+                    job["session_id"],
+                    partial(transcribe_upload_window, services.registry, model_size, window_audio, lang,
+                            windows.prompt(), time.time()),
+                    cost=len(window_audio) / SAMPLE_RATE
+                ).result()
+
+                # Lock the language detected on the first window
+                lang = lang or result.get("language")
+                new_segments = windows.commit(result)
+                self.store.commit_window(
+                    job_id, windows.position, windows.processed_seconds,
+                    len(windows.segments) - len(new_segments), new_segments, windows.processing_time, lang
+                )
+
+            services.result_cache.complete(cache_key, {
+                "transcription": windows.text,
+                "segments": windows.segments,
+                "language": lang or job["language"],
+                "model": model_size,
+                "rtf": windows.rtf
+            })
+            owns_cache_key = False
+            self.store.finish(job_id, "completed")
+
+        except Exception as e:
+            print(f"Job {job_id} failed: {e}")
+            self.store.finish(job_id, "failed", error=str(e))
+        finally:
+            if owns_cache_key:
+                services.result_cache.fail(cache_key, RuntimeError("Transcription did not complete"))
+            if isinstance(audio_data, WavReader):
+                audio_data.close()
+            if self.store.status(job_id) != "running":
+                self._remove_upload(job["path"])
+
+    @staticmethod
+    def _remove_upload(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def build_job_runner(services: InferenceServices) -> JobRunner:
+    """Job store and runner from SERVER_CONFIG; call ``start()`` once the server is up"""
+    jobs_dir = SERVER_CONFIG["jobs_dir"]
+    store = JobStore(os.path.join(jobs_dir, "jobs.db"))
+    return JobRunner(store, services, os.path.join(jobs_dir, "uploads"), num_workers=SERVER_CONFIG["job_workers"])
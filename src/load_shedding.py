@@ -0,0 +1,238 @@
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Optional
+
+from .metrics import LOAD_SHED_LEVEL, LOAD_SHED_TRANSITIONS
+from .model_registry import model_params_m
+
+# Cumulative: each level also applies every cheaper measure before it
+SHED_LEVELS = ("normal", "greedy", "merge", "small_model", "drop_stale")
+
+
+@dataclass
+class ShedEvent:
+    at: float
+    from_level: str
+    to_level: str
+    queue_depth: int
+    rtf: float
+
+    def as_dict(self) -> dict:
+        return {
+            "at": self.at,
+            "from": self.from_level,
+            "to": self.to_level,
+            "queue_depth": self.queue_depth,
+            "rtf": round(self.rtf, 3),
+        }
+
+
+class LoadShedder:
+    """Steps live transcription down to cheaper modes while inference falls behind.
+
+    Load is read from ``depth_fn`` (live jobs waiting) and from the real-time
+    factor of finished live decodes (seconds from receipt to result per second
+    of audio), smoothed with an exponential moving average. The level goes up
+    one step when either signal stays above its limit for ``up_after``
+    seconds, and back down one step when both stay below ``recover_ratio``
+    of their limits for ``down_after`` seconds:
+
+    * ``greedy``: single greedy pass (no beam search, sampling or fallback);
+    * ``merge``: consecutive queued chunks of a session are decoded as one;
+    * ``small_model``: live audio uses ``fallback_model`` when it is smaller;
+    * ``drop_stale``: chunks waiting longer than ``stale_after`` seconds are
+      dropped and the client is told.
+
+    Every transition is recorded (``events``, metrics) and passed to
+    ``on_change``.
+    """
+
+    def __init__(
+        self,
+        depth_fn: Callable[[], int],
+        max_depth: int = 8,
+        max_rtf: float = 1.0,
+        up_after: float = 2.0,
+        down_after: float = 10.0,
+        recover_ratio: float = 0.5,
+        fallback_model: Optional[str] = "base",
+        stale_after: float = 5.0,
+        interval: float = 0.5,
+        on_change: Optional[Callable[[ShedEvent], Any]] = None,
+    ):
+        self.depth_fn = depth_fn
+        self.max_depth = max_depth
+        self.max_rtf = max_rtf
+        self.up_after = up_after
+        self.down_after = down_after
+        self.recover_ratio = recover_ratio
+        self.fallback_model = fallback_model
+        self.stale_after = stale_after
+        self.on_change = on_change
+
+        self.lock = threading.Lock()
+        self.level = 0
+        self.rtf = 0.0
+        self.last_observed = 0.0
+        self.overloaded_since: Optional[float] = None
+        self.recovered_since: Optional[float] = None
+        self.events: deque = deque(maxlen=50)
+        self.dropped = 0
+        self.merged = 0
+        LOAD_SHED_LEVEL.set(0)
+
+        self.is_running = interval > 0
+        if self.is_running:
+            self.thread = threading.Thread(target=self._monitor_loop, args=(interval,), name="load-shedder")
+            self.thread.daemon = True
+            self.thread.start()
+
+    @property
+    def level_name(self) -> str:
+        return SHED_LEVELS[self.level]
+
+    def at_least(self, level_name: str) -> bool:
+        return self.level >= SHED_LEVELS.index(level_name)
+
+    @property
+    def greedy(self) -> bool:
+        return self.at_least("greedy")
+
+    @property
+    def merging(self) -> bool:
+        return self.at_least("merge")
+
+    def model_for(self, model_size: str) -> str:
+        """Model to decode live audio with: the fallback while shedding, if it is smaller"""
+        if not self.at_least("small_model") or not self.fallback_model:
+            return model_size
+        if model_params_m(self.fallback_model) < model_params_m(model_size):
+            return self.fallback_model
+        return model_size
+
+    def is_stale(self, received_at: float) -> bool:
+        return self.at_least("drop_stale") and time.time() - received_at > self.stale_after
+
+    def observe(self, audio_seconds: float, elapsed: float):
+        """Record a finished live decode: ``elapsed`` seconds from receipt to result"""
+        if audio_seconds <= 0:
+            return
+        with self.lock:
+            rtf = elapsed / audio_seconds
+            self.rtf = rtf if not self.last_observed else 0.7 * self.rtf + 0.3 * rtf
+            self.last_observed = time.time()
+
+    def record_drop(self, count: int = 1):
+        with self.lock:
+            self.dropped += count
+
+    def record_merge(self, count: int = 1):
+        with self.lock:
+            self.merged += count
+
+    def update(self, now: Optional[float] = None) -> Optional[ShedEvent]:
+        """Re-evaluate the load and move at most one level; returns the transition, if any"""
+        now = now or time.time()
+        depth = self.depth_fn()
+        with self.lock:
+            if self.last_observed and now - self.last_observed > self.down_after and not depth:
+                self.rtf = 0.0  # Idle: nothing left to measure
+            pressure = max(depth / self.max_depth, self.rtf / self.max_rtf)
+
+            target = self.level
+            if pressure > 1.0:
+                self.recovered_since = None
+                if self.overloaded_since is None:
+                    self.overloaded_since = now
+                elif now - self.overloaded_since >= self.up_after and self.level < len(SHED_LEVELS) - 1:
+                    target = self.level + 1
+            elif pressure < self.recover_ratio:
+                self.overloaded_since = None
+                if self.recovered_since is None:
+                    self.recovered_since = now
+                elif now - self.recovered_since >= self.down_after and self.level > 0:
+                    target = self.level - 1
+            else:
+                self.overloaded_since = self.recovered_since = None
+
+            if target == self.level:
+                return None
+            event = ShedEvent(now, SHED_LEVELS[self.level], SHED_LEVELS[target], depth, self.rtf)
+            self.level = target
+            # Each step gets a full period to take effect before the next one
+            self.overloaded_since = self.recovered_since = None
+            self.events.append(event)
+
+        LOAD_SHED_LEVEL.set(target)
+        direction = "up" if target > SHED_LEVELS.index(event.from_level) else "down"
+        LOAD_SHED_TRANSITIONS.labels(event.to_level, direction).inc()
+        print(f"Load shedding: {event.from_level} -> {event.to_level} (queue depth {depth}, rtf {event.rtf:.2f})")
+        if self.on_change:
+            self.on_change(event)
+        return event
+
+    def _monitor_loop(self, interval: float):
+        while self.is_running:
+            time.sleep(interval)
+            try:
+                self.update()
+            except Exception as e:
+                print(f"Load shedder error: {e}")
+
+    def stop(self):
+        self.is_running = False
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "level": SHED_LEVELS[self.level],
+                "rtf": round(self.rtf, 3),
+                "dropped": self.dropped,
+                "merged": self.merged,
+                "events": [event.as_dict() for event in self.events],
+            }
+
+
+@dataclass
+class LiveChunk:
+    item: Any  # Temp file path or PCMFrame
+    seconds: float
+    received_at: float = field(default_factory=time.time)
+    request_id: Optional[str] = None
+    mergeable: bool = True  # Duration known up front (PCM, WAV), so a merged group stays under 30 s
+
+
+class ChunkMerger:
+    """Holds a session's newest live chunk group that is still waiting to be decoded.
+
+    While merging is on, chunks arriving behind it join the group (up to
+    ``max_seconds`` of audio) instead of queueing jobs of their own, so a
+    backed-up session is decoded in fewer, longer passes.
+    """
+
+    def __init__(self, max_seconds: float = 10.0):
+        self.max_seconds = max_seconds
+        self.lock = threading.Lock()
+        self.waiting: Optional[List[LiveChunk]] = None
+        self.waiting_seconds = 0.0
+
+    def add(self, chunk: LiveChunk, merge: bool) -> Optional[List[LiveChunk]]:
+        """Returns a new group to schedule, or None when the chunk joined the waiting group"""
+        with self.lock:
+            if (merge and chunk.mergeable and self.waiting is not None and self.waiting[0].mergeable
+                    and self.waiting_seconds + chunk.seconds <= self.max_seconds):
+                self.waiting.append(chunk)
+                self.waiting_seconds += chunk.seconds
+                return None
+            self.waiting = [chunk]
+            self.waiting_seconds = chunk.seconds
+            return self.waiting
+
+    def take(self, group: List[LiveChunk]) -> List[LiveChunk]:
+        """Close a group when its job starts; later chunks start a new one"""
+        with self.lock:
+            if self.waiting is group:
+                self.waiting = None
+            return list(group)
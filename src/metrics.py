@@ -0,0 +1,287 @@
+import bisect
+import math
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Latency buckets (seconds) sized for chunk decoding: tens of ms up to a long window
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+RTF_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 4.0)
+LOAD_BUCKETS = (0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+
+class _Shards:
+    """Per-thread value arrays, summed when scraped.
+
+    Each thread only ever writes its own list, so updates take no lock and
+    never contend; the lock is taken once per thread (to register its shard)
+    and on scrape. Shards of finished threads are folded into ``retired``.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.local = threading.local()
+        self.shards: List[Tuple[threading.Thread, List[float]]] = []
+        self.retired = [0.0] * size
+        self.lock = threading.Lock()
+
+    def shard(self) -> List[float]:
+        shard = getattr(self.local, "shard", None)
+        if shard is None:
+            shard = self.local.shard = [0.0] * self.size
+            with self.lock:
+                self.shards.append((threading.current_thread(), shard))
+        return shard
+
+    def totals(self) -> List[float]:
+        with self.lock:
+            totals = list(self.retired)
+            live = []
+            for thread, shard in self.shards:
+                for i, value in enumerate(shard):
+                    totals[i] += value
+                if thread.is_alive():
+                    live.append((thread, shard))
+                else:
+                    for i, value in enumerate(shard):
+                        self.retired[i] += value
+            self.shards = live
+            return totals
+
+
+class CounterChild:
+    def __init__(self):
+        self._shards = _Shards(1)
+
+    def inc(self, amount: float = 1.0):
+        self._shards.shard()[0] += amount
+
+    def samples(self):
+        yield "_total", {}, self._shards.totals()[0]
+
+
+class GaugeChild:
+    def __init__(self):
+        self._value = 0.0
+        self._function: Optional[Callable[[], float]] = None
+        self._lock = threading.Lock()
+
+    def set(self, value: float):
+        self._value = value  # Single assignment; no lock needed
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.inc(-amount)
+
+    def set_function(self, function: Callable[[], float]):
+        # Evaluated on scrape, for values the server already tracks (queue sizes, sessions)
+        self._function = function
+
+    def samples(self):
+        value = self._value
+        if self._function is not None:
+            try:
+                value = self._function()
+            except Exception:
+                value = math.nan
+        yield "", {}, value
+
+
+class HistogramChild:
+    def __init__(self, buckets: Sequence[float]):
+        self._buckets = tuple(buckets)
+        # Per-bucket counts (non-cumulative), then +Inf, sum, count
+        self._shards = _Shards(len(self._buckets) + 3)
+
+    def observe(self, value: float):
+        shard = self._shards.shard()
+        shard[bisect.bisect_left(self._buckets, value)] += 1
+        shard[-2] += value
+        shard[-1] += 1
+
+    def samples(self):
+        totals = self._shards.totals()
+        cumulative = 0.0
+        for bound, count in zip(self._buckets + (math.inf,), totals):
+            cumulative += count
+            yield "_bucket", {"le": _format_value(bound)}, cumulative
+        yield "_sum", {}, totals[-2]
+        yield "_count", {}, totals[-1]
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 registry: Optional["MetricsRegistry"] = None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._children[()] = self._make_child()
+        (registry or REGISTRY).register(self)
+
+    def _make_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values, **kwargs):
+        if kwargs:
+            values = tuple(kwargs[name] for name in self.labelnames)
+        key = tuple(str(v) for v in values)
+        if len(key) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._make_child())
+        return child
+
+    def _default(self):
+        if self.labelnames:
+            raise ValueError(f"{self.name} has labels; call .labels() first")
+        return self._children[()]
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        with self._lock:
+            children = sorted(self._children.items())
+        for key, child in children:
+            base_labels = dict(zip(self.labelnames, key))
+            for suffix, extra, value in child.samples():
+                labels = dict(base_labels, **extra)
+                lines.append(f"{self.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def _make_child(self):
+        return CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        self._default().inc(amount)
+
+
+class Gauge(_Metric):
+    type_name = "gauge"
+
+    def _make_child(self):
+        return GaugeChild()
+
+    def set(self, value: float):
+        self._default().set(value)
+
+    def set_function(self, function: Callable[[], float]):
+        self._default().set_function(function)
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS, registry: Optional["MetricsRegistry"] = None):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _make_child(self):
+        return HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self._default().observe(value)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric):
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self.metrics[metric.name] = metric
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + "}"
+
+
+REGISTRY = MetricsRegistry()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Server metrics, updated from the hot paths in app.py and the src modules
+
+QUEUE_DEPTH = Gauge(
+    "whisper_queue_depth", "Jobs waiting, by queue (live/upload scheduler classes, batcher)", ["queue"])
+ACTIVE_SESSIONS = Gauge(
+    "whisper_active_sessions", "Connected Socket.IO sessions, by mode", ["mode"])
+INFERENCE_WORKERS_BUSY = Gauge(
+    "whisper_inference_workers_busy", "Inference workers currently running a job")
+
+QUEUE_WAIT_SECONDS = Histogram(
+    "whisper_queue_wait_seconds", "Time from receipt until decoding started", ["mode", "model"])
+DECODE_SECONDS = Histogram(
+    "whisper_decode_seconds", "Time spent in the model", ["mode", "model"])
+LATENCY_SECONDS = Histogram(
+    "whisper_latency_seconds", "Time from receipt until the result was ready", ["mode", "model"])
+REAL_TIME_FACTOR = Histogram(
+    "whisper_real_time_factor", "Decode seconds per second of audio", ["model"], buckets=RTF_BUCKETS)
+
+AUDIO_INGESTED_SECONDS = Counter(
+    "whisper_audio_ingested_seconds", "Seconds of audio received", ["source"])
+CHUNKS_DROPPED = Counter(
+    "whisper_chunks_dropped", "Audio dropped before decoding", ["reason"])
+CHUNKS_FILTERED = Counter(
+    "whisper_chunks_filtered", "Decoded results discarded", ["reason"])
+VAD_SKIPPED_SECONDS = Counter(
+    "whisper_vad_skipped_audio_seconds", "Audio the no-speech pre-classifier kept away from the model", ["source"])
+JOBS_COMPLETED = Counter(
+    "whisper_inference_jobs", "Inference jobs finished, by outcome", ["outcome"])
+LOAD_SHED_LEVEL = Gauge(
+    "whisper_load_shed_level", "Live load-shedding level (0 normal, 1 greedy, 2 merge, 3 small model, 4 drop stale)")
+LOAD_SHED_TRANSITIONS = Counter(
+    "whisper_load_shed_transitions", "Load-shedding level changes, by new level and direction", ["level", "direction"])
+
+MODEL_LOAD_SECONDS = Histogram(
+    "whisper_model_load_seconds", "Model load duration", ["model"], buckets=LOAD_BUCKETS)
+MODELS_RESIDENT = Gauge(
+    "whisper_models_resident", "Whisper models currently loaded")
+
+
+def observe_decode(mode: str, model: str, queue_wait: float, decode_time: float, audio_seconds: float):
+    """Record one decode pass: latency split, total and real-time factor."""
+    QUEUE_WAIT_SECONDS.labels(mode, model).observe(queue_wait)
+    DECODE_SECONDS.labels(mode, model).observe(decode_time)
+    LATENCY_SECONDS.labels(mode, model).observe(queue_wait + decode_time)
+    if audio_seconds > 0:
+        REAL_TIME_FACTOR.labels(model).observe(decode_time / audio_seconds)
@@ -0,0 +1,267 @@
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+from .metrics import MODEL_LOAD_SECONDS
+
+# Appended to a size for its dynamically int8-quantized CPU variant, e.g. "large-v3-int8"
+QUANTIZED_SUFFIX = '-int8'
+
+MODEL_SIZES = ['tiny', 'base', 'small', 'medium', 'large', 'large-v2', 'large-v3']
+AVAILABLE_MODELS = MODEL_SIZES + [size + QUANTIZED_SUFFIX for size in MODEL_SIZES]
+
+# Parameter counts (millions), used to budget a model before it is loaded
+MODEL_PARAMS_M = {
+    'tiny': 39, 'base': 74, 'small': 244, 'medium': 769,
+    'large': 1550, 'large-v2': 1550, 'large-v3': 1550,
+}
+
+
+def is_quantized(model_size: str) -> bool:
+    return model_size.endswith(QUANTIZED_SUFFIX)
+
+
+def base_model_size(model_size: str) -> str:
+    return model_size[:-len(QUANTIZED_SUFFIX)] if is_quantized(model_size) else model_size
+
+
+def model_params_m(model_size: str, default: int = 0) -> int:
+    return MODEL_PARAMS_M.get(base_model_size(model_size), default)
+
+
+def model_n_mels(model_size: str) -> int:
+    # large-v3 was trained on 128 mel bins, earlier models on 80
+    return 128 if base_model_size(model_size) == 'large-v3' else 80
+
+
+def estimate_model_bytes(model_size: str) -> int:
+    # Weights are materialized as fp32 by whisper.load_model; int8 variants keep
+    # Linear weights (most of the model) in one byte and the rest in fp32
+    bytes_per_param = 1.5 if is_quantized(model_size) else 4
+    return int(model_params_m(model_size, 1550) * 1_000_000 * bytes_per_param)
+
+
+def cuda_device_name() -> Optional[str]:
+    # None without a GPU, or without torch at all (CPU-only installs running the fake backend)
+    try:
+        import torch
+    except ImportError:
+        return None
+    return torch.cuda.get_device_name(0) if torch.cuda.is_available() else None
+
+
+@dataclass
+class ModelEntry:
+    size: str
+    model: Any  # backends.BackendModel
+    memory_bytes: int
+    load_time: float
+    lock: threading.Lock = field(default_factory=threading.Lock)  # One decode per instance
+    loaded_at: float = field(default_factory=time.time)
+    last_used: float = field(default_factory=time.time)
+    in_use: int = 0
+    warmup: Optional[dict] = None  # Compile and warm-up timings, when the registry warms models up
+
+
+class ModelRegistry:
+    """Keeps several Whisper sizes resident under a memory budget.
+
+    Models are loaded through the inference ``backend`` (openai-whisper by
+    default) on first use and kept in least-recently-used order. Loading a
+    model that doesn't fit evicts idle models from the LRU end; models
+    currently in use are never evicted. A background reaper unloads models
+    that have not been used for ``idle_timeout`` seconds, except pinned ones
+    (the server default). With ``warmup``, each newly loaded model goes
+    through it (compilation, synthetic decodes) before anyone can use it.
+    """
+
+    def __init__(
+        self,
+        memory_budget_gb: float = 12.0,
+        idle_timeout: float = 900.0,
+        device: Optional[str] = None,
+        backend=None,
+        warmup: Optional[Callable[[Any], dict]] = None,
+    ):
+        if backend is None:
+            from .backends import WhisperBackend  # backends imports this module
+            backend = WhisperBackend()
+        self.memory_budget = int(memory_budget_gb * 1024**3)
+        self.idle_timeout = idle_timeout
+        self.device = device or ("cuda" if cuda_device_name() else "cpu")
+        self.backend = backend
+        self.warmup = warmup
+
+        self.entries: "OrderedDict[str, ModelEntry]" = OrderedDict()
+        self.loading: Dict[str, threading.Event] = {}
+        self.pinned = set()
+        self.lock = threading.Lock()
+        self.evictions = 0
+
+        if idle_timeout > 0:
+            self.reaper = threading.Thread(target=self._reap_loop, name="model-reaper")
+            self.reaper.daemon = True
+            self.reaper.start()
+
+    def is_loaded(self, model_size: str) -> bool:
+        with self.lock:
+            return model_size in self.entries
+
+    def is_loading(self, model_size: Optional[str] = None) -> bool:
+        with self.lock:
+            return bool(self.loading) if model_size is None else model_size in self.loading
+
+    def set_pinned(self, *model_sizes: str):
+        # Pinned models are exempt from idle unloading
+        with self.lock:
+            self.pinned = set(model_sizes)
+
+    def get(self, model_size: str, pin: bool = False) -> ModelEntry:
+        """Return the resident entry for ``model_size``, loading it if needed.
+
+        With ``pin``, the entry's ``in_use`` count is raised before the lock
+        is released, so it can't be evicted between lookup and use; the
+        caller must drop it again (see ``acquire``).
+        """
+        if model_size not in AVAILABLE_MODELS:
+            raise ValueError(f"Invalid model size: {model_size}")
+
+        while True:
+            with self.lock:
+                entry = self.entries.get(model_size)
+                if entry is not None:
+                    entry.last_used = time.time()
+                    self.entries.move_to_end(model_size)
+                    if pin:
+                        entry.in_use += 1
+                    return entry
+
+                event = self.loading.get(model_size)
+                if event is None:
+                    # This thread loads it; others wait on the event
+                    event = self.loading[model_size] = threading.Event()
+                    break
+            event.wait()
+
+        try:
+            if self.backend.owns_weights:
+                # Handles to weights held elsewhere (model server) take no room here
+                self._make_room(estimate_model_bytes(model_size))
+
+            device = "cpu" if is_quantized(model_size) else self.device  # Quantized kernels are CPU-only
+            print(f"Loading Whisper {model_size} model on {device} ({self.backend.name} backend)...")
+            start_time = time.time()
+            model = self.backend.load(model_size, device)
+            entry = ModelEntry(
+                size=model_size,
+                model=model,
+                memory_bytes=model.memory_bytes(),
+                load_time=time.time() - start_time,
+            )
+            print(f"Loaded {model_size} in {entry.load_time:.1f}s ({entry.memory_bytes / 1024**2:.0f} MB)")
+            MODEL_LOAD_SECONDS.labels(model_size).observe(entry.load_time)
+            if self.warmup is not None:
+                # Still invisible to get(): requests wait on the loading event instead of going in cold
+                try:
+                    entry.warmup = self.warmup(model)
+                except Exception as e:
+                    print(f"Warm-up of {model_size} failed: {e}")
+
+            with self.lock:
+                self.entries[model_size] = entry
+                if pin:
+                    entry.in_use += 1
+            return entry
+        finally:
+            with self.lock:
+                self.loading.pop(model_size).set()
+
+    @contextmanager
+    def acquire(self, model_size: str):
+        # Pins the model against eviction for the duration of the block
+        entry = self.get(model_size, pin=True)
+        try:
+            yield entry
+        finally:
+            with self.lock:
+                entry.in_use -= 1
+                entry.last_used = time.time()
+
+    def _make_room(self, needed_bytes: int):
+        with self.lock:
+            used = sum(e.memory_bytes for e in self.entries.values())
+            for size in list(self.entries):
+                if used + needed_bytes <= self.memory_budget:
+                    break
+                entry = self.entries[size]
+                if entry.in_use:
+                    continue
+                print(f"Evicting {size} model to stay within memory budget")
+                used -= entry.memory_bytes
+                self._unload(size)
+                self.evictions += 1
+
+    def _unload(self, model_size: str):
+        # Caller holds self.lock
+        # Threads still holding the entry keep the weights alive until they finish
+        self.entries.pop(model_size)
+        if self.device == "cuda":
+            import torch
+            torch.cuda.empty_cache()
+
+    def unload(self, model_size: str) -> bool:
+        with self.lock:
+            entry = self.entries.get(model_size)
+            if entry is None or entry.in_use:
+                return False
+            self._unload(model_size)
+            return True
+
+    def unload_idle(self) -> int:
+        now = time.time()
+        unloaded = 0
+        with self.lock:
+            for size, entry in list(self.entries.items()):
+                if size in self.pinned or entry.in_use:
+                    continue
+                if now - entry.last_used > self.idle_timeout:
+                    print(f"Unloading idle {size} model")
+                    self._unload(size)
+                    unloaded += 1
+        return unloaded
+
+    def _reap_loop(self):
+        while True:
+            time.sleep(min(self.idle_timeout, 60.0))
+            try:
+                self.unload_idle()
+            except Exception as e:
+                print(f"Model reaper error: {e}")
+
+    def stats(self) -> dict:
+        now = time.time()
+        with self.lock:
+            resident = [
+                {
+                    'model': size,
+                    'memory_mb': round(entry.memory_bytes / 1024**2, 1),
+                    'load_time': round(entry.load_time, 2),
+                    'warmup': entry.warmup,
+                    'idle_seconds': round(now - entry.last_used, 1),
+                    'in_use': entry.in_use,
+                    'pinned': size in self.pinned,
+                }
+                for size, entry in self.entries.items()
+            ]
+            return {
+                'backend': self.backend.name,
+                'device': self.device,
+                'memory_budget_mb': round(self.memory_budget / 1024**2, 1),
+                'memory_used_mb': round(sum(e.memory_bytes for e in self.entries.values()) / 1024**2, 1),
+                'resident': resident,
+                'loading': list(self.loading),
+                'evictions': self.evictions,
+            }
@@ -0,0 +1,342 @@
+"""Local model server: one process owns the weights, web worker processes borrow them.
+
+The server (``model_server.py``) keeps a ModelRegistry with the real
+backend and answers requests on a Unix socket. Web processes started with
+``backend: "remote"`` load RemoteModel handles instead of weights. Each
+request carries only a small pickled header over the socket. The audio or
+log-mel arrays go through a shared-memory segment owned by the
+connection, which the server reads in place.
+"""
+
+import atexit
+import os
+import pickle
+import socket
+import struct
+import sys
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from dataclasses import asdict
+from multiprocessing import resource_tracker, shared_memory
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import torch
+
+from .backends import FALLBACK_TEMPERATURES, BackendCapabilities, BackendModel, InferenceBackend
+from .model_registry import ModelRegistry
+
+_LENGTH = struct.Struct("!I")
+_ALIGNMENT = 64  # Arrays start on cache-line boundaries in the segment
+
+# Calls forwarded to the resident model; their first argument(s) travel through shared memory
+MODEL_OPS = ("transcribe", "transcribe_batch", "transcribe_mel", "detect_language")
+
+
+class ModelServerError(RuntimeError):
+    """A request failed inside the model server"""
+
+
+def send_message(sock: socket.socket, message: dict):
+    data = pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)
+    sock.sendall(_LENGTH.pack(len(data)) + data)
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> Optional[bytes]:
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        n = sock.recv_into(view[received:])
+        if n == 0:
+            return None  # Peer closed the connection
+        received += n
+    return bytes(buffer)
+
+
+def recv_message(sock: socket.socket) -> Optional[dict]:
+    header = _recv_exactly(sock, _LENGTH.size)
+    if header is None:
+        return None
+    data = _recv_exactly(sock, _LENGTH.unpack(header)[0])
+    if data is None:
+        return None
+    return pickle.loads(data)
+
+
+def attach_segment(name: str) -> shared_memory.SharedMemory:
+    # Before 3.13 attaching registers the segment with this process's resource tracker,
+    # which would unlink it (and warn) when the server exits; the client owns it
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    segment = shared_memory.SharedMemory(name=name)
+    resource_tracker.unregister(segment._name, "shared_memory")
+    return segment
+
+
+def close_segment(segment: shared_memory.SharedMemory):
+    try:
+        segment.close()
+    except BufferError:
+        pass  # An array view is still referenced somewhere; the mapping goes with the process
+
+
+class SharedArrays:
+    """Client side of a connection's shared-memory segment.
+
+    ``write`` copies the arrays of one request into the segment and returns
+    their layout. It grows (replaces) the segment when a request doesn't
+    fit, so the server re-attaches only after growth.
+    """
+
+    def __init__(self, min_bytes: int = 4 * 1024**2):
+        self.min_bytes = min_bytes
+        self.segment: Optional[shared_memory.SharedMemory] = None
+
+    @property
+    def name(self) -> Optional[str]:
+        return self.segment.name if self.segment is not None else None
+
+    def write(self, arrays: Sequence[np.ndarray]) -> List[tuple]:
+        arrays = [np.ascontiguousarray(array) for array in arrays]
+        offsets = []
+        total = 0
+        for array in arrays:
+            offsets.append(total)
+            total += -(-array.nbytes // _ALIGNMENT) * _ALIGNMENT
+        if self.segment is None or self.segment.size < total:
+            self._grow(total)
+
+        layout = []
+        for array, offset in zip(arrays, offsets):
+            np.ndarray(array.shape, array.dtype, buffer=self.segment.buf, offset=offset)[...] = array
+            layout.append((offset, array.shape, array.dtype.str))
+        return layout
+
+    def _grow(self, needed: int):
+        size = max(needed, self.min_bytes, 2 * self.segment.size if self.segment is not None else 0)
+        self.close()
+        self.segment = shared_memory.SharedMemory(create=True, size=size)
+
+    def close(self):
+        if self.segment is not None:
+            self.segment.close()
+            self.segment.unlink()
+            self.segment = None
+
+
+class ModelServerConnection:
+    """One socket to the model server and its shared-memory segment; one request at a time"""
+
+    def __init__(self, socket_path: str, connect_timeout: float = 0.0):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        deadline = time.time() + connect_timeout
+        while True:
+            try:
+                self.sock.connect(socket_path)
+                break
+            except (FileNotFoundError, ConnectionRefusedError):
+                # The server may still be starting next to us
+                if time.time() >= deadline:
+                    self.sock.close()
+                    raise
+                time.sleep(0.5)
+        self.arrays = SharedArrays()
+
+    def request(self, op: str, model_size: str, arrays: Sequence[np.ndarray] = (), **kwargs):
+        layout = self.arrays.write(arrays) if arrays else []
+        send_message(self.sock, {
+            "op": op,
+            "model": model_size,
+            "kwargs": kwargs,
+            "segment": self.arrays.name if arrays else None,
+            "arrays": layout,
+        })
+        reply = recv_message(self.sock)
+        if reply is None:
+            raise ConnectionError("Model server closed the connection")
+        if "error" in reply:
+            raise ModelServerError(reply["error"])
+        return reply["result"]
+
+    def close(self):
+        self.sock.close()
+        self.arrays.close()
+
+
+class RemoteModel(BackendModel):
+    """Handle to a model resident in the model server.
+
+    Calls are forwarded over the backend's connections. The weights live in
+    the server, so this process's registry budgets nothing for them.
+    """
+
+    def __init__(self, backend: "RemoteBackend", model_size: str, capabilities: BackendCapabilities):
+        self.backend = backend
+        self.model_size = model_size
+        self.capabilities = capabilities
+
+    def transcribe(self, audio: np.ndarray, **options) -> dict:
+        return self.backend.call("transcribe", self.model_size, [np.asarray(audio, dtype=np.float32)], **options)
+
+    def transcribe_batch(self, audios: List[np.ndarray], language: Optional[str] = None,
+                         prompt: Optional[str] = None) -> List[dict]:
+        audios = [np.asarray(audio, dtype=np.float32) for audio in audios]
+        return self.backend.call("transcribe_batch", self.model_size, audios, language=language, prompt=prompt)
+
+    def transcribe_mel(self, mel, num_frames: int, language: str, prompt: Union[str, List[int], None],
+                       temperatures: Sequence[float] = FALLBACK_TEMPERATURES, word_timestamps: bool = True,
+                       **options) -> dict:
+        return self.backend.call("transcribe_mel", self.model_size, [_as_float32(mel)], num_frames=num_frames,
+                                 language=language, prompt=prompt, temperatures=tuple(temperatures),
+                                 word_timestamps=word_timestamps, **options)
+
+    def detect_language(self, mel) -> Dict[str, float]:
+        return self.backend.call("detect_language", self.model_size, [_as_float32(mel)])
+
+    def memory_bytes(self) -> int:
+        return 0
+
+
+def _as_float32(mel) -> np.ndarray:
+    if isinstance(mel, torch.Tensor):
+        mel = mel.detach().float().cpu().numpy()
+    return np.asarray(mel, dtype=np.float32)
+
+
+class RemoteBackend(InferenceBackend):
+    """Models served by a local model server over the Unix socket at ``socket_path``.
+
+    Connections are pooled: each concurrent caller (inference worker,
+    batcher) borrows one, so requests from one process run in parallel
+    up to the server's per-model locks.
+    """
+
+    name = "remote"
+    owns_weights = False  # The model server holds (and budgets) the weights
+
+    def __init__(self, socket_path: str, connect_timeout: float = 60.0):
+        self.socket_path = socket_path
+        self.connect_timeout = connect_timeout
+        self.idle: List[ModelServerConnection] = []
+        self.lock = threading.Lock()
+        atexit.register(self.close)  # Unlinks the shared-memory segments of pooled connections
+
+    @contextmanager
+    def _connection(self):
+        with self.lock:
+            connection = self.idle.pop() if self.idle else None
+        if connection is None:
+            connection = ModelServerConnection(self.socket_path, self.connect_timeout)
+        reusable = False
+        try:
+            yield connection
+            reusable = True
+        except ModelServerError:
+            reusable = True  # The error reply was read in full
+            raise
+        finally:
+            if reusable:
+                with self.lock:
+                    self.idle.append(connection)
+            else:
+                connection.close()  # The stream may be out of step; never reuse it
+
+    def call(self, op: str, model_size: str, arrays: Sequence[np.ndarray] = (), **kwargs):
+        with self._connection() as connection:
+            return connection.request(op, model_size, arrays, **kwargs)
+
+    def load(self, model_size: str, device: str) -> RemoteModel:
+        # The server picks the device; this returns once the model is loaded and warmed up there
+        reply = self.call("load", model_size)
+        return RemoteModel(self, model_size, BackendCapabilities(**reply["capabilities"]))
+
+    def close(self):
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for connection in idle:
+            connection.close()
+
+
+class ModelServer:
+    """Serves the models of ``registry`` to web processes on a Unix socket.
+
+    Each connection gets a thread. Decodes go through the registry, as
+    they would in-process: the model is loaded on first use and one decode
+    runs per model at a time (the entry lock).
+    """
+
+    def __init__(self, registry: ModelRegistry, socket_path: str):
+        self.registry = registry
+        self.socket_path = socket_path
+
+    def serve_forever(self):
+        path = Path(self.socket_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.exists():
+            path.unlink()  # Left behind by a previous server that didn't shut down cleanly
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # Requests are pickled: only this user's processes may connect. The socket is created
+        # with owner-only permissions, so it is never reachable by others, even briefly.
+        old_umask = os.umask(0o077)
+        try:
+            listener.bind(str(path))
+        finally:
+            os.umask(old_umask)
+        path.chmod(0o600)
+        listener.listen(64)
+        print(f"Model server listening on {path}")
+        try:
+            while True:
+                conn, _ = listener.accept()
+                thread = threading.Thread(target=self._serve_connection, args=(conn,), name="model-server-conn")
+                thread.daemon = True
+                thread.start()
+        finally:
+            listener.close()
+            path.unlink(missing_ok=True)
+
+    def _serve_connection(self, conn: socket.socket):
+        segment = None
+        try:
+            while True:
+                request = recv_message(conn)
+                if request is None:
+                    break
+                if request["segment"] and (segment is None or segment.name != request["segment"]):
+                    if segment is not None:
+                        close_segment(segment)
+                    segment = attach_segment(request["segment"])
+                arrays = [
+                    np.ndarray(shape, np.dtype(dtype), buffer=segment.buf, offset=offset)
+                    for offset, shape, dtype in request["arrays"]
+                ]
+                try:
+                    reply = {"result": self._handle(request["op"], request["model"], arrays, request["kwargs"])}
+                except Exception as e:
+                    print(f"Model server error ({request['op']} {request['model']}): {e}")
+                    print(traceback.format_exc())
+                    reply = {"error": f"{type(e).__name__}: {e}"}
+                del arrays  # Views into the segment; it can't be closed while they are alive
+                send_message(conn, reply)
+        except OSError as e:
+            print(f"Model server connection error: {e}")
+        finally:
+            conn.close()
+            if segment is not None:
+                close_segment(segment)
+
+    def _handle(self, op: str, model_size: str, arrays: List[np.ndarray], kwargs: dict):
+        if op == "load":
+            entry = self.registry.get(model_size)
+            return {"capabilities": asdict(entry.model.capabilities)}
+        if op not in MODEL_OPS:
+            raise ValueError(f"Unknown model server request: {op}")
+
+        with self.registry.acquire(model_size) as entry, entry.lock:
+            if op == "transcribe_batch":
+                return entry.model.transcribe_batch(arrays, **kwargs)
+            return getattr(entry.model, op)(arrays[0], **kwargs)
@@ -0,0 +1,139 @@
+import os
+import resource
+import sys
+import time
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+import torch
+import whisper
+from whisper import _ALIGNMENT_HEADS, _MODELS, _download
+from whisper.model import AudioEncoder, ModelDimensions, TextDecoder, Whisper
+
+STORE_FORMAT = 1
+
+
+def current_rss_mb() -> Optional[float]:
+    # Resident set size now (Linux only); file-backed mmap pages count once touched
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024**2
+    except (OSError, ValueError):
+        return None
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024**2 if sys.platform == "darwin" else peak / 1024
+
+
+class ModelStore:
+    """Whisper checkpoints converted once into files that load memory-mapped.
+
+    The downloaded checkpoints are read into RAM in full by whisper.load_model
+    and copied into a model built with random weights, so loading briefly
+    holds two copies. Here each checkpoint is re-saved once per dtype in
+    torch's zip format. Later loads map it with ``torch.load(mmap=True)`` and
+    assign the mapped tensors to a model built on the meta device, so no
+    weights are copied. On CPU the weights stay file-backed: pages are read
+    on first use, and processes on the same host share them through the page
+    cache. On the GPU they are copied from the mapping straight to the device.
+    """
+
+    def __init__(self, root: Union[str, Path], download_root: Optional[str] = None):
+        self.root = Path(root)
+        self.download_root = download_root
+
+    def path(self, model_size: str, dtype: torch.dtype) -> Path:
+        # The checkpoint's hash is part of its download URL; a new upstream release gets a new file
+        digest = _MODELS[model_size].split("/")[-2][:12]
+        return self.root / f"{model_size}-{digest}-{str(dtype).split('.')[-1]}.mmap.pt"
+
+    def convert(self, model_size: str, dtype: torch.dtype) -> Path:
+        """Write the store file for a model and dtype (downloading the checkpoint if needed)"""
+        path = self.path(model_size, dtype)
+        checkpoint_file = _download(_MODELS[model_size], self.download_root or self._default_download_root(), False)
+        start_time = time.time()
+        checkpoint = torch.load(checkpoint_file, map_location="cpu", weights_only=True)
+        state = {name: tensor.to(dtype).contiguous() for name, tensor in checkpoint["model_state_dict"].items()}
+        del checkpoint["model_state_dict"]
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        # Written under a temporary name so a crash never leaves a truncated file behind
+        temp_path = path.with_suffix(".tmp")
+        torch.save({"format": STORE_FORMAT, "dims": checkpoint["dims"], "model_state_dict": state}, temp_path)
+        os.replace(temp_path, path)
+        print(f"Converted {model_size} to {path} in {time.time() - start_time:.1f}s")
+        return path
+
+    @staticmethod
+    def _default_download_root() -> str:
+        # Same default as whisper.load_model
+        default = os.path.join(os.path.expanduser("~"), ".cache")
+        return os.path.join(os.getenv("XDG_CACHE_HOME", default), "whisper")
+
+    def load(self, model_size: str, device: str, dtype: torch.dtype = torch.float32) -> Whisper:
+        """Whisper model with mapped weights; converts the checkpoint on first use"""
+        path = self.path(model_size, dtype)
+        if not path.exists():
+            self.convert(model_size, dtype)
+
+        start_time = time.time()
+        rss_before = current_rss_mb()
+        checkpoint = torch.load(path, map_location="cpu", mmap=True, weights_only=True)
+        model = self._empty_model(ModelDimensions(**checkpoint["dims"]))
+        model.load_state_dict(checkpoint["model_state_dict"], assign=True)
+        self._restore_buffers(model, model_size)
+        model = model.to(device)
+
+        rss_after = current_rss_mb()
+        grown = f"RSS +{rss_after - rss_before:.0f} MB, " if rss_before is not None else ""
+        print(f"Mapped {model_size} from {path.name} in {time.time() - start_time:.2f}s "
+              f"({grown}peak RSS {peak_rss_mb():.0f} MB)")
+        return model
+
+    @staticmethod
+    def _empty_model(dims: ModelDimensions) -> Whisper:
+        # Whisper.__init__ on the meta device: no storage is allocated, so nothing is randomly
+        # initialized only to be overwritten. Its sparse alignment-heads buffer is added later.
+        model = Whisper.__new__(Whisper)
+        torch.nn.Module.__init__(model)
+        model.dims = dims
+        with torch.device("meta"):
+            model.encoder = AudioEncoder(dims.n_mels, dims.n_audio_ctx, dims.n_audio_state,
+                                         dims.n_audio_head, dims.n_audio_layer)
+            model.decoder = TextDecoder(dims.n_vocab, dims.n_text_ctx, dims.n_text_state,
+                                        dims.n_text_head, dims.n_text_layer)
+        return model
+
+    @staticmethod
+    def _restore_buffers(model: Whisper, model_size: str):
+        # Non-persistent buffers are not in the checkpoint; rebuild them as Whisper.__init__ does
+        n_ctx = model.dims.n_text_ctx
+        mask = torch.empty(n_ctx, n_ctx).fill_(-np.inf).triu_(1)
+        model.decoder.register_buffer("mask", mask, persistent=False)
+
+        all_heads = torch.zeros(model.dims.n_text_layer, model.dims.n_text_head, dtype=torch.bool)
+        all_heads[model.dims.n_text_layer // 2:] = True
+        model.register_buffer("alignment_heads", all_heads.to_sparse(), persistent=False)
+        if model_size in _ALIGNMENT_HEADS:
+            model.set_alignment_heads(_ALIGNMENT_HEADS[model_size])
+
+        missing = [name for name, tensor in list(model.named_parameters()) + list(model.named_buffers())
+                   if tensor.is_meta]
+        if missing:
+            raise RuntimeError(f"Model store left tensors unloaded: {', '.join(missing)}")
+
+
+def load_stored_model(store: Optional[ModelStore], model_size: str, device: str,
+                      dtype: torch.dtype = torch.float32) -> Whisper:
+    """From the store when possible; whisper.load_model for custom checkpoints or if mapping fails"""
+    if store is not None and model_size in _MODELS:
+        try:
+            return store.load(model_size, device, dtype)
+        except Exception as e:
+            print(f"Model store could not map {model_size} ({e}), loading the checkpoint directly")
+    model = whisper.load_model(model_size, device=device)
+    return model.half() if dtype == torch.float16 else model
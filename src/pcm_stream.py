@@ -0,0 +1,132 @@
+import struct
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+import numpy as np
+
+from .resampler import StreamingResampler
+
+# Binary frame layout (little-endian):
+#   uint32 sequence number
+#   uint32 sample rate in Hz
+#   int16[] PCM samples (mono)
+HEADER_FORMAT = "<II"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+TARGET_SAMPLE_RATE = 16000
+INT16_SCALE = np.float32(1.0 / 32768.0)
+
+
+class PCMFrameError(ValueError):
+    pass
+
+
+@dataclass
+class PCMFrame:
+    sequence: int
+    sample_rate: int
+    audio: np.ndarray
+    gap: int = 0  # Frames missing before this one
+    _release: Optional[Callable[[], None]] = field(default=None, repr=False)
+
+    @property
+    def duration(self) -> float:
+        return len(self.audio) / TARGET_SAMPLE_RATE
+
+    def release(self):
+        # Hand the slot back to the decoder's pool once the model is done with it
+        if self._release is not None:
+            release, self._release = self._release, None
+            release()
+
+
+class PCMStreamDecoder:
+    """Decodes binary PCM16 frames into preallocated float32 buffers.
+
+    Each decoded frame occupies one slot of a fixed pool until the consumer
+    calls ``PCMFrame.release()``. When every slot is still in use the frame is
+    dropped instead of allocating, which bounds per-session memory.
+    Frames at other rates go through one streaming resampler per decoder, so
+    consecutive frames are resampled as a continuous signal.
+    """
+
+    def __init__(self, max_frame_seconds: float = 10.0, num_slots: int = 8):
+        self.slot_size = int(max_frame_seconds * TARGET_SAMPLE_RATE)
+        self.buffers = np.zeros((num_slots, self.slot_size), dtype=np.float32)
+        self.free_slots = deque(range(num_slots))
+        self.lock = threading.Lock()
+        self.resampler: Optional[StreamingResampler] = None
+
+        self.expected_sequence: Optional[int] = None
+        self.frames_decoded = 0
+        self.frames_dropped = 0
+        self.frames_missing = 0
+
+    @staticmethod
+    def parse_header(payload: bytes):
+        if len(payload) < HEADER_SIZE:
+            raise PCMFrameError(f"Frame too short: {len(payload)} bytes")
+        if (len(payload) - HEADER_SIZE) % 2:
+            raise PCMFrameError("Frame payload is not a whole number of int16 samples")
+        return struct.unpack_from(HEADER_FORMAT, payload)
+
+    def decode(self, payload: bytes) -> Optional[PCMFrame]:
+        sequence, sample_rate = self.parse_header(payload)
+        if sample_rate <= 0:
+            raise PCMFrameError(f"Invalid sample rate: {sample_rate}")
+
+        # Zero-copy view over the int16 samples following the header
+        samples = np.frombuffer(payload, dtype="<i2", offset=HEADER_SIZE)
+        num_samples = len(samples)
+        if sample_rate != TARGET_SAMPLE_RATE:
+            if self.resampler is None or self.resampler.source_rate != sample_rate:
+                self.resampler = StreamingResampler(sample_rate)
+            # Upper bound: the resampler may also release samples held back from the last frame
+            num_samples = -(-num_samples * self.resampler.up // self.resampler.down) + 1
+        if num_samples > self.slot_size:
+            raise PCMFrameError(
+                f"Frame of {num_samples} samples exceeds {self.slot_size} sample limit"
+            )
+
+        gap = 0
+        if self.expected_sequence is not None and sequence != self.expected_sequence:
+            gap = max(sequence - self.expected_sequence, 0)
+            self.frames_missing += gap
+        self.expected_sequence = sequence + 1
+
+        with self.lock:
+            if not self.free_slots:
+                self.frames_dropped += 1
+                return None
+            slot = self.free_slots.popleft()
+
+        if sample_rate == TARGET_SAMPLE_RATE:
+            out = self.buffers[slot, :num_samples]
+            np.multiply(samples, INT16_SCALE, out=out)
+        else:
+            resampled = self.resampler.process(samples * INT16_SCALE)
+            out = self.buffers[slot, :len(resampled)]
+            out[:] = resampled
+
+        self.frames_decoded += 1
+        return PCMFrame(
+            sequence=sequence,
+            sample_rate=sample_rate,
+            audio=out,
+            gap=gap,
+            _release=lambda: self._release_slot(slot),
+        )
+
+    def _release_slot(self, slot: int):
+        with self.lock:
+            self.free_slots.append(slot)
+
+    def stats(self) -> dict:
+        return {
+            "decoded": self.frames_decoded,
+            "dropped": self.frames_dropped,
+            "missing": self.frames_missing,
+            "free_slots": len(self.free_slots),
+        }
@@ -0,0 +1,115 @@
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+
+class WindowedTranscription:
+    """Walks a long recording one Whisper window at a time.
+
+    Mirrors the seek logic of ``whisper.transcribe``: every segment of a window
+    except the last is committed, and the next window starts where the last
+    committed segment ended, so words cut at a window edge are re-decoded in
+    the next window. Progress and ETA are derived from audio seconds processed
+    and the measured real-time factor.
+
+    ``audio`` may be anything with ``len()`` and slicing that yields 16 kHz
+    mono float32 samples.
+    """
+
+    def __init__(self, audio, window_seconds: float = 30.0, prompt_chars: int = 200):
+        self.audio = audio
+        self.window_samples = int(window_seconds * SAMPLE_RATE)
+        self.total_samples = len(audio)
+        self.prompt_chars = prompt_chars
+
+        self.position = 0
+        self.segments: List[dict] = []
+        self.processing_time = 0.0
+        self._window_started: Optional[float] = None
+
+    @property
+    def done(self) -> bool:
+        return self.position >= self.total_samples
+
+    @property
+    def total_seconds(self) -> float:
+        return self.total_samples / SAMPLE_RATE
+
+    @property
+    def processed_seconds(self) -> float:
+        return min(self.position, self.total_samples) / SAMPLE_RATE
+
+    @property
+    def progress(self) -> float:
+        if not self.total_samples:
+            return 100.0
+        return 100.0 * self.processed_seconds / self.total_seconds
+
+    @property
+    def rtf(self) -> Optional[float]:
+        # Real-time factor: processing seconds per second of audio
+        if not self.processed_seconds:
+            return None
+        return self.processing_time / self.processed_seconds
+
+    @property
+    def eta(self) -> Optional[float]:
+        if self.rtf is None:
+            return None
+        return self.rtf * (self.total_seconds - self.processed_seconds)
+
+    @property
+    def text(self) -> str:
+        return "".join(s["text"] for s in self.segments).strip()
+
+    def prompt(self) -> Optional[str]:
+        # Tail of the committed text conditions the next window, like condition_on_previous_text
+        return self.text[-self.prompt_chars:] or None
+
+    def restore(self, position: int, segments: List[dict], processing_time: float = 0.0):
+        """Continue from a saved state: committed position (samples), segments and time spent."""
+        self.position = position
+        self.segments = list(segments)
+        self.processing_time = processing_time
+
+    def next_window(self) -> Tuple[float, np.ndarray]:
+        self._window_started = time.time()
+        start = self.position
+        window = np.asarray(self.audio[start:start + self.window_samples], dtype=np.float32)
+        return start / SAMPLE_RATE, window
+
+    def commit(self, result: dict) -> List[dict]:
+        """Record one window's transcription and return its new segments (absolute times)."""
+        if self._window_started is not None:
+            self.processing_time += time.time() - self._window_started
+            self._window_started = None
+
+        offset = self.position / SAMPLE_RATE
+        window_end = min(self.position + self.window_samples, self.total_samples)
+        segments = result.get("segments", [])
+
+        is_last_window = window_end >= self.total_samples
+        if len(segments) > 1 and not is_last_window:
+            # The final segment may be cut off by the window edge: decode it again next time
+            segments = segments[:-1]
+            next_position = self.position + int(segments[-1]["end"] * SAMPLE_RATE)
+        else:
+            next_position = window_end
+
+        # Always make progress, even if the model returns a zero-length segment
+        self.position = max(next_position, self.position + SAMPLE_RATE)
+
+        new_segments = [
+            {
+                "start": round(offset + s["start"], 2),
+                "end": round(offset + s["end"], 2),
+                "text": s["text"],
+            }
+            for s in segments
+            if s["text"].strip()
+        ]
+        self.segments.extend(new_segments)
+        return new_segments
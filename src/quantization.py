@@ -0,0 +1,78 @@
+import os
+import time
+from pathlib import Path
+from typing import Optional, Union
+
+import torch
+import whisper
+from torch.ao.nn.quantized import dynamic as nnqd
+
+# Quantized checkpoints are whole pickled modules, so they are keyed by the versions that wrote them
+CACHE_FORMAT = 1
+
+
+def quantize_model(model: torch.nn.Module) -> torch.nn.Module:
+    """Dynamic int8 quantization of every Linear layer in the encoder and decoder (CPU only).
+
+    Weights are stored as int8 and activations are quantized on the fly per
+    batch, so no calibration data is needed. Convolutions, embeddings and
+    layer norms stay fp32; the output projection reuses the token embedding
+    and stays fp32 too.
+    """
+    model = model.cpu().float().eval()
+    for module in model.modules():
+        # whisper.model.Linear only casts its weights to the input dtype in forward,
+        # but quantize_dynamic matches exact types
+        if isinstance(module, torch.nn.Linear) and type(module) is not torch.nn.Linear:
+            module.__class__ = torch.nn.Linear
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+def quantized_cache_path(model_size: str, cache_dir: Union[str, Path]) -> Path:
+    versions = f"whisper{whisper.__version__}-torch{torch.__version__.split('+')[0]}-v{CACHE_FORMAT}"
+    return Path(cache_dir) / f"{model_size}-int8-{versions}.pt"
+
+
+def load_quantized_model(model_size: str, cache_dir: Optional[Union[str, Path]] = None) -> torch.nn.Module:
+    """Int8 Whisper model on CPU, from the on-disk cache when present.
+
+    The first load quantizes the fp32 model and saves the result, which is
+    about a quarter of the checkpoint size. Later loads unpickle it directly
+    and never materialize the fp32 weights.
+    """
+    path = quantized_cache_path(model_size, cache_dir) if cache_dir else None
+    if path is not None and path.exists():
+        try:
+            start_time = time.time()
+            model = torch.load(path, map_location="cpu", weights_only=False)
+            print(f"Loaded quantized {model_size} from {path} in {time.time() - start_time:.1f}s")
+            return model.eval()
+        except Exception as e:
+            print(f"Quantized checkpoint {path} unreadable ({e}), quantizing again")
+
+    start_time = time.time()
+    model = quantize_model(whisper.load_model(model_size, device="cpu"))
+    print(f"Quantized {model_size} to int8 in {time.time() - start_time:.1f}s")
+
+    if path is not None:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Written under a temporary name so a crash never leaves a truncated checkpoint
+            temp_path = path.with_suffix(".tmp")
+            torch.save(model, temp_path)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Could not cache quantized {model_size} model: {e}")
+    return model
+
+
+def quantized_weight_bytes(model: torch.nn.Module) -> int:
+    """Bytes held by dynamically quantized Linear layers (packed, so not in parameters())"""
+    total = 0
+    for module in model.modules():
+        if isinstance(module, nnqd.Linear):
+            weight, bias = module._weight_bias()
+            total += weight.numel() * weight.element_size()
+            if bias is not None:
+                total += bias.numel() * bias.element_size()
+    return total
@@ -0,0 +1,139 @@
+from functools import lru_cache
+from math import gcd
+from typing import Tuple
+
+import numpy as np
+
+TARGET_SAMPLE_RATE = 16000
+
+# Largest block of outputs computed at once; bounds the temporary (outputs x taps) matrix
+MAX_OUTPUTS_PER_STEP = 8192
+
+
+def rational_ratio(source_rate: int, target_rate: int = TARGET_SAMPLE_RATE) -> Tuple[int, int]:
+    """(up, down) in lowest terms"""
+    divisor = gcd(int(source_rate), int(target_rate))
+    return int(target_rate) // divisor, int(source_rate) // divisor
+
+
+@lru_cache(maxsize=None)
+def lowpass_filter(up: int, down: int) -> np.ndarray:
+    """The anti-aliasing FIR ``scipy.signal.resample_poly`` designs by default (unscaled, float32)"""
+    import scipy.signal
+
+    max_rate = max(up, down)
+    taps = scipy.signal.firwin(2 * 10 * max_rate + 1, 1.0 / max_rate, window=("kaiser", 5.0)).astype(np.float32)
+    taps.flags.writeable = False  # Shared by every caller
+    return taps
+
+
+def resample_poly(audio: np.ndarray, up: int, down: int) -> np.ndarray:
+    """``scipy.signal.resample_poly`` with the cached filter, in float32"""
+    import scipy.signal
+
+    return scipy.signal.resample_poly(np.asarray(audio, dtype=np.float32), up, down,
+                                      window=lowpass_filter(up, down))
+
+
+class StreamingResampler:
+    """Stateful rational (polyphase) resampler for chunk-by-chunk audio.
+
+    Uses the same Kaiser-windowed FIR design as ``scipy.signal.resample_poly``
+    and keeps the filter history between calls, so feeding a signal in pieces
+    gives the same output as resampling it in one go: no per-chunk edge
+    artifacts, O(n) time and memory proportional to the chunk. The filter's
+    group delay is compensated internally; call ``flush()`` at end of stream
+    to emit the tail.
+
+    Carrying that state costs throughput: on a whole signal, ``resample``
+    (scipy's compiled polyphase filter) is several times faster, so use
+    this only where audio really arrives in pieces.
+    """
+
+    def __init__(self, source_rate: int, target_rate: int = TARGET_SAMPLE_RATE):
+        self.source_rate = int(source_rate)
+        self.target_rate = target_rate
+        self.up, self.down = rational_ratio(source_rate, target_rate)
+
+        if self.passthrough:
+            self.num_taps, self.delay = 1, 0
+            self.reset()
+            return
+
+        # Same filter as resample_poly, pre-padded so the group delay is a whole number of outputs
+        taps = lowpass_filter(self.up, self.down).astype(np.float64) * self.up
+        half_len = len(taps) // 2
+        pre_pad = (-half_len) % self.down
+        taps = np.concatenate([np.zeros(pre_pad), taps])
+        taps = np.concatenate([taps, np.zeros((-len(taps)) % self.up)])
+
+        self.num_taps = len(taps) // self.up  # Taps per polyphase branch
+        # phases[p, j] multiplies input x[i - j]; stored reversed to line up with sliding windows
+        self.phases = taps.reshape(self.num_taps, self.up).T[:, ::-1].astype(np.float32).copy()
+        self.delay = (half_len + pre_pad) // self.down
+        self.reset()
+
+    def reset(self):
+        self.history = np.zeros(self.num_taps - 1, dtype=np.float32)
+        self.consumed = 0  # Input samples seen
+        self.produced = 0  # Raw outputs computed (including the delay we skip)
+        self.emitted = 0  # Outputs returned to the caller
+
+    @property
+    def passthrough(self) -> bool:
+        return self.up == self.down
+
+    def process(self, audio: np.ndarray) -> np.ndarray:
+        audio = np.asarray(audio, dtype=np.float32)
+        if self.passthrough:
+            self.consumed += len(audio)
+            self.emitted += len(audio)
+            return audio
+
+        buf = np.concatenate([self.history, audio])
+        origin = self.consumed - (self.num_taps - 1)  # Absolute input index of buf[0]
+        self.consumed += len(audio)
+
+        # Raw output k reads input (k * down) // up with phase (k * down) % up
+        end = -(-self.consumed * self.up // self.down)
+        out = np.empty(end - self.produced, dtype=np.float32)
+        windows = np.lib.stride_tricks.sliding_window_view(buf, self.num_taps)
+
+        for block_start in range(self.produced, end, MAX_OUTPUTS_PER_STEP):
+            k = np.arange(block_start, min(block_start + MAX_OUTPUTS_PER_STEP, end))
+            positions = k * self.down
+            first_tap = positions // self.up - origin - (self.num_taps - 1)
+            out[k - self.produced] = np.einsum(
+                "ij,ij->i", windows[first_tap], self.phases[positions % self.up]
+            )
+
+        self.produced = end
+        self.history = buf[len(buf) - (self.num_taps - 1):].copy()
+        return self._emit(out)
+
+    def flush(self) -> np.ndarray:
+        # Push zeros through the filter to release the delayed tail, then trim to the exact length
+        if self.passthrough:
+            return np.zeros(0, dtype=np.float32)
+        expected = -(-self.consumed * self.up // self.down)
+        consumed = self.consumed
+        tail = self.process(np.zeros(-(-(self.delay + 1) * self.down // self.up) + 1, dtype=np.float32))
+        self.consumed = consumed
+        tail = tail[:max(0, expected - (self.emitted - len(tail)))]
+        self.emitted = expected
+        return tail
+
+    def _emit(self, raw: np.ndarray) -> np.ndarray:
+        # Drop the first `delay` raw outputs so output 0 lines up with input 0
+        skip = max(0, min(len(raw), self.delay - (self.produced - len(raw))))
+        out = raw[skip:]
+        self.emitted += len(out)
+        return out
+
+
+def resample(audio: np.ndarray, source_rate: int, target_rate: int = TARGET_SAMPLE_RATE) -> np.ndarray:
+    """One-shot resampling of a whole signal; same output as StreamingResampler, no state to carry."""
+    up, down = rational_ratio(source_rate, target_rate)
+    if up == down:
+        return np.asarray(audio, dtype=np.float32)
+    return resample_poly(audio, up, down)
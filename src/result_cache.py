@@ -0,0 +1,184 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+# Bump when the stored result format or the transcription pipeline changes
+CACHE_VERSION = 1
+
+SAMPLE_RATE = 16000
+
+
+def audio_digest(audio, block_seconds: float = 30.0) -> str:
+    """Hash decoded 16 kHz float32 samples, block by block.
+
+    ``audio`` may be an ndarray or anything sliceable with ``len()`` (such as
+    ``WavReader``), so the same recording hashes the same whatever container
+    it was uploaded in, without decoding it all into memory at once.
+    """
+    digest = hashlib.blake2b(digest_size=32)
+    block = int(block_seconds * SAMPLE_RATE)
+    for start in range(0, len(audio), block):
+        digest.update(np.ascontiguousarray(audio[start:start + block], dtype=np.float32).tobytes())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Content-addressed transcription results, persisted as JSON files.
+
+    Keys combine the audio digest with everything that changes the output
+    (model, language, decoding options). Files are evicted least recently
+    used first once the directory exceeds ``max_bytes``; file mtimes record
+    recency so the order survives restarts. Identical requests arriving while
+    one is being transcribed wait for that result instead of running again.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.inflight: Dict[str, Future] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self.index: "OrderedDict[str, int]" = OrderedDict()
+        self.total_bytes = 0
+        self._load_index()
+
+    @staticmethod
+    def make_key(audio_hash: str, model_size: str, language: Optional[str], options: dict) -> str:
+        payload = json.dumps(
+            {
+                "version": CACHE_VERSION,
+                "audio": audio_hash,
+                "model": model_size,
+                "language": language or "auto",
+                "options": options,
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _load_index(self):
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                stat = os.stat(os.path.join(root, name))
+                entries.append((stat.st_mtime, name[:-5], stat.st_size))
+        for _, key, size in sorted(entries):
+            self.index[key] = size
+            self.total_bytes += size
+
+    def _read(self, key: str) -> Optional[dict]:
+        # Caller holds self.lock
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            # Missing or truncated file: forget it
+            self.total_bytes -= self.index.pop(key, 0)
+            return None
+        self.index.move_to_end(key)
+        os.utime(path)
+        return result
+
+    def get(self, key: str) -> Optional[dict]:
+        with self.lock:
+            if key not in self.index:
+                return None
+            return self._read(key)
+
+    def claim(self, key: str) -> Tuple[Optional[dict], Optional[Future], bool]:
+        """Look up ``key`` and register interest in it.
+
+        Returns ``(result, None, False)`` on a hit, ``(None, future, False)``
+        when an identical request is already running (wait on the future), or
+        ``(None, future, True)`` when the caller should transcribe and then
+        call ``complete()`` or ``fail()``.
+        """
+        with self.lock:
+            if key in self.index:
+                result = self._read(key)
+                if result is not None:
+                    self.hits += 1
+                    return result, None, False
+
+            future = self.inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return None, future, False
+
+            self.misses += 1
+            future = self.inflight[key] = Future()
+            return None, future, True
+
+    def complete(self, key: str, result: dict):
+        try:
+            self.put(key, result)
+        finally:
+            with self.lock:
+                future = self.inflight.pop(key, None)
+            if future is not None:
+                future.set_result(result)
+
+    def fail(self, key: str, error: BaseException):
+        with self.lock:
+            future = self.inflight.pop(key, None)
+        if future is not None:
+            future.set_exception(error)
+
+    def put(self, key: str, result: dict):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename so readers never see a partial file
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(result, f)
+        os.replace(temp_path, path)
+        size = os.path.getsize(path)
+
+        with self.lock:
+            self.total_bytes += size - self.index.pop(key, 0)
+            self.index[key] = size
+            self._evict()
+
+    def _evict(self):
+        # Caller holds self.lock
+        while self.total_bytes > self.max_bytes and len(self.index) > 1:
+            key, size = self.index.popitem(last=False)
+            self.total_bytes -= size
+            self.evictions += 1
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def stats(self) -> dict:
+        with self.lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "entries": len(self.index),
+                "size_mb": round(self.total_bytes / 1024**2, 2),
+                "max_mb": round(self.max_bytes / 1024**2, 2),
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "hit_rate": round((self.hits + self.coalesced) / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "inflight": len(self.inflight),
+            }
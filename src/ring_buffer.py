@@ -0,0 +1,82 @@
+from typing import Tuple
+
+import numpy as np
+
+
+class AudioRingBuffer:
+    """Lock-free single-producer/single-consumer ring of float32 samples.
+
+    The producer (the audio callback) only advances ``write_pos`` and the
+    consumer only advances ``read_pos``. Both positions count samples since
+    the start and never wrap. Samples are stored before ``write_pos`` moves
+    past them, so the consumer never sees a partly written block. Every
+    sample is stored twice, ``capacity`` apart, so any run of up to
+    ``capacity`` samples is a single contiguous view. ``peek`` and ``latest``
+    hand out views of the ring without copying. ``write`` allocates nothing.
+
+    When the consumer falls behind, samples that don't fit are dropped at
+    the producer and counted in ``dropped``. Older unread audio is never
+    overwritten.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.data = np.zeros(2 * capacity, dtype=np.float32)
+        self.write_pos = 0
+        self.read_pos = 0
+        self.dropped = 0
+
+    def write(self, samples: np.ndarray) -> int:
+        """Producer: append samples (any 1-D float array or strided view); returns how many fit"""
+        n = min(len(samples), self.capacity - (self.write_pos - self.read_pos))
+        if n < len(samples):
+            self.dropped += len(samples) - n
+        if n <= 0:
+            return 0
+
+        start = self.write_pos % self.capacity
+        first = min(n, self.capacity - start)
+        self.data[start:start + first] = samples[:first]
+        self.data[start + self.capacity:start + self.capacity + first] = samples[:first]
+        if first < n:
+            rest = n - first
+            self.data[:rest] = samples[first:n]
+            self.data[self.capacity:self.capacity + rest] = samples[first:n]
+        self.write_pos += n  # Publish only once the samples are in place
+        return n
+
+    def available(self) -> int:
+        """Consumer: samples written and not yet consumed"""
+        return self.write_pos - self.read_pos
+
+    def peek(self, n: int) -> np.ndarray:
+        """Consumer: view of the next ``n`` unread samples (valid until they are consumed)"""
+        n = min(n, self.available())
+        start = self.read_pos % self.capacity
+        return self.data[start:start + n]
+
+    def consume(self, n: int):
+        """Consumer: release ``n`` samples back to the producer"""
+        self.read_pos += min(n, self.available())
+
+    def latest(self, n: int) -> np.ndarray:
+        """View of the ``n`` most recently written samples, read or not; consumes nothing"""
+        write_pos = self.write_pos
+        n = min(n, write_pos, self.capacity)
+        start = (write_pos - n) % self.capacity
+        return self.data[start:start + n]
+
+
+class LevelMeter:
+    """Peak and RMS of the most recent ``window`` samples of a ring, without consuming them"""
+
+    def __init__(self, ring: AudioRingBuffer, window: int):
+        self.ring = ring
+        self.window = window
+
+    def read(self) -> Tuple[float, float]:
+        recent = self.ring.latest(self.window)
+        if not len(recent):
+            return 0.0, 0.0
+        peak = max(float(recent.max()), -float(recent.min()))
+        return peak, float(np.sqrt(np.dot(recent, recent) / len(recent)))
@@ -0,0 +1,189 @@
+import threading
+import time
+import traceback
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from .metrics import JOBS_COMPLETED
+
+SCHEDULER_POLICIES = ("round_robin", "deficit")
+
+
+@dataclass
+class InferenceJob:
+    session_id: str
+    fn: Callable[[], Any]
+    cost: float = 1.0  # Seconds of audio, used by deficit scheduling
+    enqueued_at: float = field(default_factory=time.time)
+    future: Future = field(default_factory=Future)
+
+    @property
+    def wait_time(self) -> float:
+        return time.time() - self.enqueued_at
+
+
+class FairScheduler:
+    """Queues jobs per session and hands them out fairly across sessions.
+
+    ``round_robin`` serves one job per session in turn. ``deficit`` is deficit
+    round robin: each visit credits a session with ``quantum`` seconds of audio
+    and it may run jobs while its credit covers their cost, so a client
+    streaming long chunks cannot crowd out clients sending short ones.
+    """
+
+    def __init__(self, policy: str = "deficit", quantum: float = 2.0):
+        if policy not in SCHEDULER_POLICIES:
+            raise ValueError(f"Unknown scheduler policy: {policy}")
+        if quantum <= 0:
+            raise ValueError("Scheduler quantum must be positive")
+        self.policy = policy
+        self.quantum = quantum
+
+        self.queues: Dict[str, deque] = {}
+        self.deficits: Dict[str, float] = {}
+        self.active = deque()  # Sessions with pending jobs, in service order
+        self.condition = threading.Condition()
+        self.pending = 0
+
+    def submit(self, session_id: str, fn: Callable[[], Any], cost: float = 1.0) -> Future:
+        job = InferenceJob(session_id=session_id, fn=fn, cost=max(cost, 0.0))
+        with self.condition:
+            session_queue = self.queues.get(session_id)
+            if session_queue is None:
+                session_queue = self.queues[session_id] = deque()
+                self.deficits[session_id] = 0.0
+            if not session_queue:
+                self.active.append(session_id)
+            session_queue.append(job)
+            self.pending += 1
+            self.condition.notify()
+        return job.future
+
+    def get(self, timeout: Optional[float] = None) -> Optional[InferenceJob]:
+        with self.condition:
+            if not self.pending and not self.condition.wait_for(lambda: self.pending, timeout):
+                return None
+            return self._next_job()
+
+    def _next_job(self) -> InferenceJob:
+        while True:
+            session_id = self.active[0]
+            session_queue = self.queues[session_id]
+
+            if self.policy == "deficit":
+                job = session_queue[0]
+                if self.deficits[session_id] < job.cost:
+                    # Not enough credit yet: top up and move to the back of the line
+                    self.deficits[session_id] += self.quantum
+                    self.active.rotate(-1)
+                    continue
+                self.deficits[session_id] -= job.cost
+            else:
+                self.active.rotate(-1)
+
+            job = session_queue.popleft()
+            self.pending -= 1
+
+            if not session_queue:
+                # Idle sessions don't bank credit
+                del self.queues[session_id]
+                del self.deficits[session_id]
+                if self.active and self.active[0] == session_id:
+                    self.active.popleft()
+                else:
+                    self.active.remove(session_id)
+            return job
+
+    def cancel_session(self, session_id: str) -> int:
+        # Drop everything still queued for a session (e.g. on disconnect)
+        with self.condition:
+            session_queue = self.queues.pop(session_id, None)
+            self.deficits.pop(session_id, None)
+            if not session_queue:
+                return 0
+            if session_id in self.active:
+                self.active.remove(session_id)
+            self.pending -= len(session_queue)
+            for job in session_queue:
+                job.future.cancel()
+            return len(session_queue)
+
+    def depth(self, session_id: Optional[str] = None) -> int:
+        with self.condition:
+            if session_id is None:
+                return self.pending
+            return len(self.queues.get(session_id, ()))
+
+    def stats(self) -> dict:
+        with self.condition:
+            return {
+                "policy": self.policy,
+                "pending": self.pending,
+                "sessions": {sid: len(q) for sid, q in self.queues.items()},
+            }
+
+
+class InferencePool:
+    """Worker threads draining a FairScheduler."""
+
+    def __init__(self, scheduler: FairScheduler, num_workers: int = 2):
+        self.scheduler = scheduler
+        self.num_workers = max(1, num_workers)
+        self.is_running = True
+        self.stats_lock = threading.Lock()
+        self.busy = 0
+        self.completed = 0
+        self.failed = 0
+        self.threads: List[threading.Thread] = []
+
+        for i in range(self.num_workers):
+            thread = threading.Thread(target=self._worker_loop, name=f"inference-{i}")
+            thread.daemon = True
+            thread.start()
+            self.threads.append(thread)
+
+    def submit(self, session_id: str, fn: Callable[[], Any], cost: float = 1.0) -> Future:
+        return self.scheduler.submit(session_id, fn, cost)
+
+    def _worker_loop(self):
+        while self.is_running:
+            job = self.scheduler.get(timeout=0.1)
+            if job is None:
+                continue
+            if not job.future.set_running_or_notify_cancel():
+                continue
+
+            with self.stats_lock:
+                self.busy += 1
+            failed = False
+            try:
+                job.future.set_result(job.fn())
+            except Exception as e:
+                print(f"Inference job error ({job.session_id}): {e}")
+                print(traceback.format_exc())
+                failed = True
+                job.future.set_exception(e)
+            with self.stats_lock:
+                self.busy -= 1
+                if failed:
+                    self.failed += 1
+                else:
+                    self.completed += 1
+            JOBS_COMPLETED.labels("failed" if failed else "completed").inc()
+
+    def stop(self, timeout: float = 1.0):
+        self.is_running = False
+        for thread in self.threads:
+            thread.join(timeout=timeout)
+
+    def stats(self) -> dict:
+        stats = self.scheduler.stats()
+        stats.update({
+            "workers": self.num_workers,
+            "busy": self.busy,
+            "completed": self.completed,
+            "failed": self.failed,
+        })
+        return stats
@@ -0,0 +1,115 @@
+import re
+import threading
+from typing import List, Optional
+
+# Punctuation and case don't count when matching words across a chunk boundary
+_NORMALIZE = re.compile(r"[^\w']+")
+
+# Longest run of boundary words compared when looking for a repeated phrase
+MAX_MATCH_WORDS = 4
+
+# Seconds a new word may start before the emitted text ends (word timestamps jitter)
+START_TOLERANCE = 0.1
+
+
+def normalize_word(word: str) -> str:
+    return _NORMALIZE.sub("", word.lower())
+
+
+def has_word_timings(segments: Optional[list]) -> bool:
+    return any(segment.get("words") for segment in segments or [])
+
+
+def chunk_words(segments: list, offset: float) -> List[dict]:
+    """Word timings from a Whisper result, shifted to stream time"""
+    words = []
+    for segment in segments or []:
+        for word in segment.get("words", []):
+            words.append({
+                "word": word["word"],
+                "start": word["start"] + offset,
+                "end": word["end"] + offset,
+            })
+    return words
+
+
+class TranscriptStitcher:
+    """Merge transcripts of overlapping audio chunks into one running text.
+
+    Each chunk repeats the last ``overlap`` seconds of the previous one, so
+    a word cut by one chunk boundary is heard whole by the next chunk. Words
+    are placed on the stream timeline using Whisper's word timestamps:
+
+    * words ending in the last ``overlap / 2`` seconds of a chunk are held
+      back, because the next chunk hears them whole and with more context
+      (unless they started before the next chunk does);
+    * words centred before, or starting well before, the end of the text
+      already emitted are dropped, which includes the clipped word at the
+      start of a chunk;
+    * a leading phrase repeating the last emitted words is dropped too, as
+      word timestamps jitter between decodes.
+
+    The overlap should be longer than a spoken word, or words straddling
+    both boundaries are never heard whole.
+
+    ``add`` returns only the new text. ``flush`` releases the held-back words
+    once no further chunk is coming.
+    """
+
+    def __init__(self, overlap: float):
+        self.overlap = overlap
+        self.holdback = overlap / 2
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.emitted_until = 0.0  # Stream time the emitted text reaches
+        self.recent: List[str] = []  # Last emitted words, normalized
+        self.pending: List[dict] = []  # Held back from the latest chunk
+
+    def add(self, words: List[dict], chunk_end: float) -> str:
+        """New text from one chunk's words (in stream time); ``chunk_end`` is where its audio stops"""
+        with self.lock:
+            fresh = [
+                w for w in words
+                if (w["start"] + w["end"]) / 2 >= self.emitted_until
+                and w["start"] >= self.emitted_until - START_TOLERANCE
+            ]
+            fresh = fresh[self._repeated_prefix(fresh):]
+
+            cutoff = chunk_end - self.holdback
+            next_start = chunk_end - self.overlap + START_TOLERANCE
+            ready = 0
+            while ready < len(fresh):
+                word = fresh[ready]
+                clipped = word["end"] >= chunk_end - START_TOLERANCE  # Still being spoken at the cut
+                if word["end"] > cutoff and (clipped or word["start"] >= next_start):
+                    break
+                ready += 1
+            self.pending = fresh[ready:]
+            return self._emit(fresh[:ready])
+
+    def flush(self) -> str:
+        """Emit the words held back from the last chunk"""
+        with self.lock:
+            pending, self.pending = self.pending, []
+            return self._emit(pending)
+
+    def _repeated_prefix(self, words: List[dict]) -> int:
+        # Only words that could still lie in the overlap are compared against the emitted tail
+        normalized = []
+        for word in words[:MAX_MATCH_WORDS]:
+            if word["start"] > self.emitted_until + self.overlap:
+                break
+            normalized.append(normalize_word(word["word"]))
+        for count in range(min(len(normalized), len(self.recent)), 0, -1):
+            if normalized[:count] == self.recent[-count:]:
+                return count
+        return 0
+
+    def _emit(self, words: List[dict]) -> str:
+        if not words:
+            return ""
+        self.emitted_until = max(self.emitted_until, words[-1]["end"])
+        self.recent = (self.recent + [normalize_word(w["word"]) for w in words])[-MAX_MATCH_WORDS:]
+        return "".join(w["word"] for w in words).strip()
@@ -0,0 +1,192 @@
+import re
+import threading
+from itertools import takewhile
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+from .features import HOP_LENGTH, IncrementalLogMel
+
+SAMPLE_RATE = 16000
+
+
+@dataclass
+class Word:
+    text: str
+    start: float  # Absolute seconds since the stream started
+    end: float
+
+    @property
+    def key(self) -> str:
+        # Comparison form: case and punctuation don't break agreement
+        return re.sub(r"[^\w']", "", self.text.lower())
+
+
+def words_from_result(result: dict, offset: float = 0.0) -> List[Word]:
+    # Flatten word timestamps from a model.transcribe(word_timestamps=True) result
+    words = []
+    for segment in result.get("segments", []):
+        for w in segment.get("words", []):
+            words.append(Word(text=w["word"].strip(), start=w["start"] + offset, end=w["end"] + offset))
+    return [w for w in words if w.text]
+
+
+def join_words(words: List[Word]) -> str:
+    return " ".join(w.text for w in words)
+
+
+class StreamingSession:
+    """Growing per-session audio buffer re-decoded at short intervals.
+
+    Each decode produces a hypothesis for the whole uncommitted buffer. Words
+    on which two consecutive hypotheses agree (longest common prefix) are
+    committed as final, and the audio up to the last committed word is trimmed
+    so it is never decoded again. The rest is reported as partial text.
+
+    With ``n_mels`` set, log-mel features are kept up to date as audio is
+    appended (see ``IncrementalLogMel``) and handed to the decode callable,
+    so a re-decode doesn't recompute the spectrogram of the whole buffer.
+    Trims are then rounded to whole 10 ms hops.
+    """
+
+    def __init__(
+        self,
+        update_interval: float = 0.5,
+        max_buffer_seconds: float = 30.0,
+        force_commit_after: float = 15.0,
+        prompt_words: int = 50,
+        n_mels: Optional[int] = None,
+    ):
+        self.update_interval = update_interval
+        self.force_commit_after = force_commit_after
+        self.prompt_words = prompt_words
+
+        self.buffer = np.zeros(int(max_buffer_seconds * SAMPLE_RATE), dtype=np.float32)
+        self.length = 0  # Valid samples in buffer
+        self.buffer_start = 0.0  # Absolute time of buffer[0]
+        self.unprocessed = 0  # Samples appended since the last decode started
+        self.features = None
+        if n_mels:
+            self.features = IncrementalLogMel(n_mels, capacity=len(self.buffer) // HOP_LENGTH + 2)
+
+        self.committed: List[Word] = []  # Most recent committed words (prompt context)
+        self.hypothesis: List[Word] = []
+        self.in_flight = False
+        self.lock = threading.Lock()  # Guards the audio buffer
+        self.decode_lock = threading.Lock()  # One decode/flush at a time per session
+
+    @property
+    def buffered_seconds(self) -> float:
+        return self.length / SAMPLE_RATE
+
+    def append(self, audio: np.ndarray):
+        with self.lock:
+            overflow = self.length + len(audio) - len(self.buffer)
+            if overflow > 0:
+                # Decoding fell behind: drop the oldest audio rather than grow
+                self._trim_samples(min(overflow, self.length), round_up=True)
+                audio = audio[-len(self.buffer):]
+            self.buffer[self.length:self.length + len(audio)] = audio
+            self.length += len(audio)
+            self.unprocessed += len(audio)
+            if self.features is not None:
+                self.features.append(audio)
+
+    def ready(self) -> bool:
+        # True when a decode should be scheduled; marks it in flight
+        with self.lock:
+            if self.in_flight or self.unprocessed < self.update_interval * SAMPLE_RATE:
+                return False
+            self.in_flight = True
+            return True
+
+    def prompt(self) -> Optional[str]:
+        # Recent committed text keeps the decoder consistent across trims
+        if not self.committed:
+            return None
+        return join_words(self.committed)
+
+    def process(self, transcribe: Callable[[np.ndarray, Optional[str], Optional[np.ndarray]], dict]) -> Tuple[str, str]:
+        """Decode the buffer and return (newly committed text, partial text).
+
+        ``transcribe(audio, prompt, mel)`` gets the buffered audio, the prompt and,
+        when features are tracked, the matching log-mel window (else None).
+        """
+        try:
+            with self.decode_lock:
+                return self._process(transcribe)
+        finally:
+            with self.lock:
+                self.in_flight = False
+
+    def _process(self, transcribe: Callable[[np.ndarray, Optional[str], Optional[np.ndarray]], dict]) -> Tuple[str, str]:
+        with self.lock:
+            audio = self.buffer[:self.length].copy()
+            mel = self.features.window().copy() if self.features is not None else None
+            offset = self.buffer_start
+            self.unprocessed = 0
+        if not len(audio):
+            return "", join_words(self.hypothesis)
+
+        words = words_from_result(transcribe(audio, self.prompt(), mel), offset)
+        last_committed = self.committed[-1].end if self.committed else 0.0
+        words = [w for w in words if w.end > last_committed]
+
+        # Local agreement: commit the common prefix of consecutive hypotheses
+        agreed = 0
+        for previous, current in zip(self.hypothesis, words):
+            if previous.key != current.key:
+                break
+            agreed += 1
+        newly_committed = words[:agreed]
+        pending = words[agreed:]
+
+        # Bound compute on long monologues without agreement
+        buffer_end = offset + len(audio) / SAMPLE_RATE
+        commit_point = newly_committed[-1].end if newly_committed else offset
+        if buffer_end - commit_point > self.force_commit_after:
+            forced = list(takewhile(lambda w: w.end <= buffer_end - 1.0, pending))
+            newly_committed += forced
+            pending = pending[len(forced):]
+
+        self.hypothesis = pending
+        if newly_committed:
+            self.committed.extend(newly_committed)
+            del self.committed[:-self.prompt_words]
+            with self.lock:
+                self._trim_samples(int((newly_committed[-1].end - self.buffer_start) * SAMPLE_RATE))
+
+        return join_words(newly_committed), join_words(pending)
+
+    def flush(self) -> str:
+        # End of stream: whatever is still pending becomes final
+        with self.decode_lock:
+            final = join_words(self.hypothesis)
+            self.committed.extend(self.hypothesis)
+            del self.committed[:-self.prompt_words]
+            self.hypothesis = []
+            with self.lock:
+                self._trim_samples(self.length)
+            return final
+
+    def _trim_samples(self, num_samples: int, round_up: bool = False):
+        num_samples = max(0, min(num_samples, self.length))
+        if self.features is not None and num_samples < self.length:
+            # Mel frames can only be dropped in whole hops
+            hops = -(-num_samples // HOP_LENGTH) if round_up else num_samples // HOP_LENGTH
+            num_samples = min(hops * HOP_LENGTH, self.length)
+        if not num_samples:
+            return
+        remaining = self.length - num_samples
+        self.buffer[:remaining] = self.buffer[num_samples:self.length]
+        self.length = remaining
+        self.buffer_start += num_samples / SAMPLE_RATE
+
+        if self.features is not None:
+            if not remaining:
+                self.features.reset()
+            elif not self.features.drop(num_samples):
+                # Trimmed into audio that isn't framed yet: rebuild from what's left
+                self.features.reset()
+                self.features.append(self.buffer[:remaining])
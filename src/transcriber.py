@@ -1,4 +1,5 @@
 import whisper
+from whisper.audio import HOP_LENGTH, N_FRAMES, N_SAMPLES, SAMPLE_RATE
 import torch
 import numpy as np
 import time
@@ -9,7 +10,13 @@ from threading import Lock
 import queue
 import threading
 
-from .config import WHISPER_CONFIG, PERFORMANCE
+from .config import WHISPER_CONFIG, AUDIO_CONFIG, PERFORMANCE
+from .backends import FakeBackend, WhisperBackend
+from .decoding import DecodingSession
+from .features import IncrementalLogMel
+from .load_shedding import LoadShedder
+from .model_registry import QUANTIZED_SUFFIX, base_model_size, is_quantized
+from .warmup import prepare_model
 
 warnings.filterwarnings("ignore", category=UserWarning)
 warnings.filterwarnings("ignore", category=FutureWarning)
@@ -23,6 +30,8 @@ class TranscriptionResult:
     processing_time: float
     timestamp: float
     segments: list = None
+    offset: float = 0.0  # Start of the chunk within the recording, in seconds
+    duration: float = 0.0  # Seconds of audio in the chunk
 
 
 class WhisperTranscriber:
@@ -31,16 +40,37 @@ class WhisperTranscriber:
         self.device = None
         self.model_lock = Lock()
         self.is_loaded = False
+        self.session: Optional[DecodingSession] = None
+        self.fallback_model = None  # Smaller model loaded on first use while shedding load
+        self.features: Optional[IncrementalLogMel] = None  # Log-mel of the last chunk's audio
+        self.features_end = 0  # Recording sample just past the audio in features
         
         # Processing queue
         self.audio_queue = queue.Queue()
         self.result_queue = queue.Queue()
         self.processing_thread = None
         self.is_processing = False
+        self.pending_chunk = None  # Taken off the queue while merging but not merged
+        
+        # Steps decoding down while chunks arrive faster than they are transcribed
+        self.shedder = LoadShedder(
+            self.audio_queue.qsize,
+            max_depth=PERFORMANCE["shed_max_queue_depth"],
+            max_rtf=PERFORMANCE["shed_max_rtf"],
+            fallback_model=PERFORMANCE["shed_fallback_model"],
+            stale_after=PERFORMANCE["shed_stale_after"],
+            interval=0.5 if PERFORMANCE["load_shedding"] else 0,
+        )
         
         # GPU optimization
         self._setup_gpu()
         
+        if WHISPER_CONFIG["backend"] == "fake":
+            self.backend = FakeBackend()
+        else:
+            self.backend = WhisperBackend(WHISPER_CONFIG["quantized_model_dir"], half=True,
+                                          model_store_dir=WHISPER_CONFIG["model_store_dir"])
+        
     def _setup_gpu(self):
         if torch.cuda.is_available():
             self.device = "cuda"
@@ -56,26 +86,55 @@ class WhisperTranscriber:
         else:
             self.device = "cpu"
             print("No GPU detected, using CPU")
+            if not self._use_int8():
+                print('Set WHISPER_CONFIG["compute_type"] = "int8" for faster, smaller CPU inference')
             
+    def _use_int8(self) -> bool:
+        return WHISPER_CONFIG["compute_type"] == "int8" or is_quantized(WHISPER_CONFIG["model_size"])
+        
+    def _load_whisper(self, model_size: str):
+        # fp16 on the GPU; on CPU, fp32 or the cached dynamic int8 variant
+        if self.device == "cpu" and self._use_int8():
+            model_size += QUANTIZED_SUFFIX
+        elif self._use_int8():
+            print("int8 quantization runs on CPU only, loading the fp16 model on the GPU")
+        return self.backend.load(model_size, self.device)
+        
     def load_model(self, progress_callback=None):
         try:
-            model_size = WHISPER_CONFIG["model_size"]
+            model_size = base_model_size(WHISPER_CONFIG["model_size"])
             print(f"Loading Whisper {model_size} model...")
             
             if progress_callback:
                 progress_callback("Downloading model if needed...")
                 
-            # Load model with FP16 for GPU
-            self.model = whisper.load_model(
-                model_size,
-                device=self.device,
-                download_root=None,  # Use default cache
-                in_memory=True
+            self.model = self._load_whisper(model_size)
+                
+            # Prompt and language carried from chunk to chunk
+            language = WHISPER_CONFIG["language"]
+            self.session = DecodingSession(
+                self.model,
+                language=None if language in (None, "auto") else language,
+                initial_prompt=WHISPER_CONFIG["initial_prompt"],
+                max_prompt_tokens=WHISPER_CONFIG["prompt_max_tokens"],
+                lock_probability=WHISPER_CONFIG["language_lock_probability"],
+                condition_on_previous_text=WHISPER_CONFIG["condition_on_previous_text"],
             )
             
-            # Move to GPU and optimize
-            if self.device == "cuda":
-                self.model = self.model.half()  # FP16 for speed
+            # Pay for lazy allocations, kernel selection (and compilation) before the first recording
+            if PERFORMANCE["warmup"] or WHISPER_CONFIG["compile"]:
+                if progress_callback:
+                    progress_callback("Warming up model...")
+                options = self._search_options()
+                prepare_model(
+                    self.model,
+                    chunk_seconds=[AUDIO_CONFIG["chunk_duration"] + AUDIO_CONFIG["chunk_overlap"]],
+                    batch_sizes=(),
+                    compile=WHISPER_CONFIG["compile"],
+                    compile_cache_dir=WHISPER_CONFIG["compile_cache_dir"],
+                    beam_size=options["beam_size"],
+                    best_of=options["best_of"],
+                )
                 
             self.is_loaded = True
             print(f"Model loaded successfully on {self.device}")
@@ -89,13 +148,21 @@ class WhisperTranscriber:
         except Exception as e:
             raise RuntimeError(f"Failed to load Whisper model: {e}")
             
-    def transcribe(self, audio_data: np.ndarray) -> Optional[TranscriptionResult]:
+    def reset_session(self):
+        # A new recording: its chunk offsets restart at zero
+        if self.session is not None:
+            with self.model_lock:
+                self.session.reset()
+                if self.features is not None:
+                    self.features.reset()
+                
+    def transcribe(self, audio_data: np.ndarray, offset: Optional[float] = None) -> Optional[TranscriptionResult]:
         if not self.is_loaded:
             return None
             
         # Add to processing queue
         timestamp = time.time()
-        self.audio_queue.put((audio_data, timestamp))
+        self.audio_queue.put((audio_data, timestamp, offset))
         
         # Try to get result (non-blocking)
         try:
@@ -108,10 +175,25 @@ class WhisperTranscriber:
         while self.is_processing:
             try:
                 # Get audio from queue
-                audio_data, timestamp = self.audio_queue.get(timeout=0.1)
-                
+                if self.pending_chunk is not None:
+                    audio_data, timestamp, offset = self.pending_chunk
+                    self.pending_chunk = None
+                else:
+                    audio_data, timestamp, offset = self.audio_queue.get(timeout=0.1)
+                    
+                # Last resort under overload: skip audio that waited too long
+                if self.shedder.is_stale(timestamp):
+                    self.shedder.record_drop()
+                    print(f"Load shedding: dropped {len(audio_data) / AUDIO_CONFIG['sample_rate']:.1f}s of audio "
+                          f"queued {time.time() - timestamp:.1f}s ago")
+                    continue
+                    
+                if self.shedder.merging:
+                    audio_data, offset = self._merge_queued(audio_data, offset)
+                    
                 # Process transcription
-                result = self._transcribe_internal(audio_data, timestamp)
+                result = self._transcribe_internal(audio_data, timestamp, offset)
+                self.shedder.observe(result.duration, time.time() - timestamp)
                 
                 # Put result in queue
                 self.result_queue.put(result)
@@ -121,31 +203,95 @@ class WhisperTranscriber:
             except Exception as e:
                 print(f"Error in transcription loop: {e}")
                 
-    def _transcribe_internal(self, audio_data: np.ndarray, timestamp: float) -> TranscriptionResult:
+    def _merge_queued(self, audio_data: np.ndarray, offset: Optional[float]) -> Tuple[np.ndarray, Optional[float]]:
+        # Join the chunks already waiting behind this one, skipping the audio they repeat
+        sample_rate = AUDIO_CONFIG["sample_rate"]
+        max_samples = min(int(PERFORMANCE["shed_merge_max_seconds"] * sample_rate), N_SAMPLES)
+        parts = [audio_data]
+        length = len(audio_data)
+        while True:
+            try:
+                chunk = self.audio_queue.get_nowait()
+            except queue.Empty:
+                break
+            next_audio, _, next_offset = chunk
+            skip = 0
+            if offset is not None and next_offset is not None:
+                skip = min(max(int(round((offset + length / sample_rate - next_offset) * sample_rate)), 0),
+                           len(next_audio))
+            if length + len(next_audio) - skip > max_samples:
+                self.pending_chunk = chunk
+                break
+            parts.append(next_audio[skip:])
+            length += len(next_audio) - skip
+            
+        if len(parts) > 1:
+            self.shedder.record_merge(len(parts) - 1)
+            audio_data = np.concatenate(parts)
+        return audio_data, offset
+        
+    def _active_model(self):
+        # The smaller fallback model while shedding load, if it shares the main model's vocabulary
+        model_size = base_model_size(WHISPER_CONFIG["model_size"])
+        fallback = self.shedder.model_for(model_size)
+        if fallback == model_size:
+            return self.model
+        if self.fallback_model is None:
+            print(f"Load shedding: loading Whisper {fallback} model...")
+            model = self._load_whisper(fallback)
+            if model.capabilities.multilingual != self.model.capabilities.multilingual:
+                print(f"Load shedding: {fallback} does not share {model_size}'s vocabulary, not using it")
+                self.shedder.fallback_model = None
+                return self.model
+            self.fallback_model = model
+        return self.fallback_model
+        
+    def _search_options(self) -> Dict[str, Any]:
+        # Greedy single pass while shedding load; beam search needs the GPU
+        temperature = WHISPER_CONFIG["temperature"]
+        if self.shedder.greedy or self.device != "cuda":
+            options = {"beam_size": 1, "best_of": 1}
+        else:
+            options = {"beam_size": WHISPER_CONFIG["beam_size"], "best_of": WHISPER_CONFIG["best_of"]}
+        if self.shedder.greedy:
+            options["temperature"] = (0.0,)
+        else:
+            options["temperature"] = tuple(temperature) if isinstance(temperature, (list, tuple)) else (temperature,)
+        return options
+        
+    def _transcribe_internal(self, audio_data: np.ndarray, timestamp: float, offset: Optional[float] = None) -> TranscriptionResult:
         start_time = time.time()
+        duration = len(audio_data) / AUDIO_CONFIG["sample_rate"]
         
         try:
             with self.model_lock:
                 # Prepare audio
                 audio_data = audio_data.astype(np.float32)
+                offset = self.session.place(duration, offset)
+                model = self._active_model()
+                options = self._search_options()
                 
-                # Transcribe with optimized settings
-                result = self.model.transcribe(
-                    audio_data,
-                    language=WHISPER_CONFIG["language"],
-                    task=WHISPER_CONFIG["task"],
-                    initial_prompt=WHISPER_CONFIG["initial_prompt"],
-                    temperature=WHISPER_CONFIG["temperature"],
-                    compression_ratio_threshold=WHISPER_CONFIG["compression_ratio_threshold"],
-                    logprob_threshold=WHISPER_CONFIG["logprob_threshold"],
-                    no_speech_threshold=WHISPER_CONFIG["no_speech_threshold"],
-                    condition_on_previous_text=WHISPER_CONFIG["condition_on_previous_text"],
-                    beam_size=WHISPER_CONFIG["beam_size"] if self.device == "cuda" else 1,
-                    best_of=WHISPER_CONFIG["best_of"] if self.device == "cuda" else 1,
-                    fp16=(self.device == "cuda"),
-                    word_timestamps=WHISPER_CONFIG["word_timestamps"],
-                    verbose=False
-                )
+                if len(audio_data) <= N_SAMPLES and model.capabilities.mel_input:
+                    result = self._decode_window(model, audio_data, offset, options)
+                else:
+                    # Longer than one window (or no log-mel input): let transcribe slide over it
+                    result = model.transcribe(
+                        audio_data,
+                        language=self.session.language,
+                        task=WHISPER_CONFIG["task"],
+                        initial_prompt=self.session.prompt_text(offset),
+                        temperature=options["temperature"],
+                        compression_ratio_threshold=WHISPER_CONFIG["compression_ratio_threshold"],
+                        logprob_threshold=WHISPER_CONFIG["logprob_threshold"],
+                        no_speech_threshold=WHISPER_CONFIG["no_speech_threshold"],
+                        condition_on_previous_text=WHISPER_CONFIG["condition_on_previous_text"],
+                        beam_size=options["beam_size"],
+                        best_of=options["best_of"],
+                        word_timestamps=WHISPER_CONFIG["word_timestamps"],
+                        verbose=False
+                    )
+                    
+                self.session.commit(result.get("segments", []), offset, duration)
                 
             # Calculate confidence
             confidence = self._calculate_confidence(result)
@@ -159,7 +305,9 @@ class WhisperTranscriber:
                 confidence=confidence,
                 processing_time=processing_time,
                 timestamp=timestamp,
-                segments=result.get("segments", [])
+                segments=result.get("segments", []),
+                offset=offset,
+                duration=duration
             )
             
         except Exception as e:
@@ -171,9 +319,53 @@ class WhisperTranscriber:
                 language="en",
                 confidence=0.0,
                 processing_time=time.time() - start_time,
-                timestamp=timestamp
+                timestamp=timestamp,
+                offset=offset or 0.0,
+                duration=duration
             )
             
+    def _decode_window(self, model, audio_data: np.ndarray, offset: float, options: Dict[str, Any]) -> Dict[str, Any]:
+        # Whole chunk in one window: the session supplies the cached prompt tokens and
+        # the locked language, so neither is re-tokenized or re-detected per chunk
+        if PERFORMANCE["incremental_mel"]:
+            mel = torch.from_numpy(self._chunk_mel(model.capabilities.n_mels, audio_data, offset)).to(self.device)
+        else:
+            mel = whisper.log_mel_spectrogram(audio_data, model.capabilities.n_mels, padding=N_SAMPLES,
+                                              device=self.device)
+            mel = mel[:, :N_FRAMES]
+        if self.device == "cuda":
+            mel = mel.half()
+            
+        return model.transcribe_mel(
+            mel,
+            len(audio_data) // HOP_LENGTH,
+            self.session.detect_language(mel, model),
+            self.session.prompt_tokens(offset),
+            temperatures=options["temperature"],
+            word_timestamps=WHISPER_CONFIG["word_timestamps"],
+            beam_size=options["beam_size"],
+            best_of=options["best_of"],
+        )
+        
+    def _chunk_mel(self, n_mels: int, audio_data: np.ndarray, offset: float) -> np.ndarray:
+        # Chunks repeat the tail of the previous one: keep the frames of that overlap and
+        # only compute those of the new audio. Anything that doesn't continue the buffered
+        # audio in whole hops (first chunk, dropped or merged chunks) starts over.
+        if self.features is None or self.features.n_mels != n_mels:
+            self.features = IncrementalLogMel(n_mels)
+        features = self.features
+        start = int(round(offset * SAMPLE_RATE))
+        end = start + len(audio_data)
+        buffered_start = self.features_end - features.num_samples
+        skip = start - buffered_start
+        if not (features.num_samples and 0 <= skip <= features.num_samples and skip % HOP_LENGTH == 0
+                and end >= self.features_end and features.drop(skip)):
+            features.reset()
+            self.features_end = start
+        features.append(audio_data[self.features_end - start:])
+        self.features_end = end
+        return features.window()
+        
     def _calculate_confidence(self, result: Dict[str, Any]) -> float:
         if "segments" not in result or not result["segments"]:
             return 0.0
@@ -220,6 +412,7 @@ class WhisperTranscriber:
         
     def cleanup(self):
         self.is_processing = False
+        self.shedder.stop()
         
         if self.processing_thread:
             self.processing_thread.join(timeout=1.0)
@@ -234,6 +427,7 @@ class WhisperTranscriber:
         if self.model is not None:
             del self.model
             self.model = None
+        self.fallback_model = None
             
         # Clear GPU cache
         if self.device == "cuda":
@@ -0,0 +1,125 @@
+import threading
+from typing import Optional, Tuple
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+FRAME_SECONDS = 0.02
+
+# Band used for spectral flatness: skips DC/hum and the empty top of phone-quality audio
+FLATNESS_BAND_HZ = (100.0, 6000.0)
+
+
+class SpeechDetector:
+    """Cheap speech / non-speech decision for chunks of 16 kHz mono audio.
+
+    Audio is cut into 20 ms frames and scored in one vectorized pass: energy
+    against a tracked noise floor, spectral flatness and zero-crossing rate.
+    Frames that are loud but spectrally flat with a high zero-crossing rate
+    look like broadband noise (fans, hiss, handling) and never count as
+    speech. Entering speech needs ``on_margin_db`` above the floor, leaving it
+    needs dropping below ``off_margin_db``; this hysteresis state and the
+    noise floor carry over between calls, so keep one detector per session.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = SAMPLE_RATE,
+        min_speech: float = 0.2,
+        on_margin_db: float = 9.0,
+        off_margin_db: float = 5.0,
+        min_level_db: float = -55.0,
+        max_noise_floor_db: float = -45.0,
+        floor_rise_db: float = 3.0,
+        flatness_max: float = 0.45,
+        zcr_max: float = 0.35,
+    ):
+        self.sample_rate = sample_rate
+        self.frame_length = int(sample_rate * FRAME_SECONDS)
+        self.min_speech_frames = max(1, int(round(min_speech / FRAME_SECONDS)))
+        self.on_margin_db = on_margin_db
+        self.off_margin_db = off_margin_db
+        self.min_level_db = min_level_db
+        self.max_noise_floor_db = max_noise_floor_db
+        self.floor_rise_db = floor_rise_db  # Per second; the floor drops immediately but rises slowly
+        self.flatness_max = flatness_max
+        self.zcr_max = zcr_max
+
+        self.window = np.hanning(self.frame_length).astype(np.float32)
+        bin_hz = sample_rate / self.frame_length
+        self.band = slice(int(FLATNESS_BAND_HZ[0] / bin_hz), int(FLATNESS_BAND_HZ[1] / bin_hz) + 1)
+
+        self.lock = threading.Lock()
+        self.noise_floor_db: Optional[float] = None
+        self.in_speech = False
+        self.chunks = 0
+        self.rejected = 0
+
+    def features(self, audio: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Per-frame energy (dBFS), spectral flatness and zero-crossing rate"""
+        num_frames = len(audio) // self.frame_length
+        frames = np.asarray(audio[:num_frames * self.frame_length], dtype=np.float32)
+        frames = frames.reshape(num_frames, self.frame_length)
+
+        power = np.einsum("ij,ij->i", frames, frames) / self.frame_length
+        energy_db = 10.0 * np.log10(power + 1e-10)
+
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (self.frame_length - 1)
+
+        spectrum = np.abs(np.fft.rfft(frames * self.window, axis=1))[:, self.band] ** 2 + 1e-12
+        flatness = np.exp(np.mean(np.log(spectrum), axis=1)) / np.mean(spectrum, axis=1)
+
+        return energy_db, flatness, zcr
+
+    def speech_frames(self, audio: np.ndarray) -> np.ndarray:
+        """Boolean speech mask, one entry per frame (advances the detector state)"""
+        energy_db, flatness, zcr = self.features(audio)
+        num_frames = len(energy_db)
+        if not num_frames:
+            return np.zeros(0, dtype=bool)
+
+        # Noise floor: the quiet end of this chunk, allowed to rise only slowly and
+        # capped so a session that starts mid-sentence doesn't learn speech as noise
+        floor = float(np.percentile(energy_db, 10))
+        if self.noise_floor_db is not None:
+            floor = min(floor, self.noise_floor_db + self.floor_rise_db * num_frames * FRAME_SECONDS)
+        floor = min(floor, self.max_noise_floor_db)
+        self.noise_floor_db = floor
+
+        noise_like = (flatness > self.flatness_max) & (zcr > self.zcr_max)
+        on = (energy_db > max(floor + self.on_margin_db, self.min_level_db)) & ~noise_like
+        off = (energy_db < floor + self.off_margin_db) | noise_like
+
+        # Hysteresis without a Python loop: each frame takes the state of the last
+        # on/off trigger at or before it; frames before any trigger keep the carried state
+        trigger = np.full(num_frames, -1, dtype=np.int8)
+        trigger[off] = 0
+        trigger[on] = 1
+        last = np.where(trigger >= 0, np.arange(num_frames), -1)
+        np.maximum.accumulate(last, out=last)
+        speech = np.where(last >= 0, trigger[last] == 1, self.in_speech)
+
+        self.in_speech = bool(speech[-1])
+        return speech
+
+    def is_speech(self, audio: np.ndarray) -> bool:
+        """Whether a chunk holds enough speech to be worth decoding"""
+        if len(audio) < self.frame_length:
+            return True  # Too short to judge
+        with self.lock:
+            speech = self.speech_frames(audio)
+            self.chunks += 1
+            # Short frames (e.g. 100 ms PCM) need speech in half of them rather than min_speech
+            has_speech = np.count_nonzero(speech) >= min(self.min_speech_frames, max(1, len(speech) // 2))
+            if not has_speech:
+                self.rejected += 1
+            return has_speech
+
+    def stats(self) -> dict:
+        return {
+            "chunks": self.chunks,
+            "rejected": self.rejected,
+            "noise_floor_db": round(self.noise_floor_db, 1) if self.noise_floor_db is not None else None,
+            "in_speech": self.in_speech,
+        }
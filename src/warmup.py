@@ -0,0 +1,132 @@
+import os
+import time
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Union
+
+import numpy as np
+
+from .features import HOP_LENGTH, N_FRAMES, N_SAMPLES, SAMPLE_RATE
+
+
+def synthetic_speech(seconds: float, seed: int = 0) -> np.ndarray:
+    """Speech-like test signal: harmonics of a gliding pitch, pulsed at syllable rate, over light noise.
+
+    Loud and voiced enough that the model decodes tokens instead of stopping
+    at no-speech, so the decoder and its kernels are exercised too.
+    """
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    pitch = 130 + 30 * np.sin(2 * np.pi * 0.5 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / SAMPLE_RATE
+    voice = sum(np.sin(k * phase) / k for k in range(1, 6))
+    envelope = 0.5 * (1 + np.sin(2 * np.pi * 4 * t))  # About four syllables per second
+    noise = np.random.default_rng(seed).standard_normal(len(t)) * 0.01
+    return (0.1 * voice * envelope + noise).astype(np.float32)
+
+
+def _timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def warm_up(model, chunk_seconds: Sequence[float], batch_sizes: Sequence[int] = (1,), **options) -> Dict[str, dict]:
+    """Run synthetic audio through every decode path the model serves, twice each.
+
+    The first run pays for lazy allocations, kernel selection (and
+    compilation, if enabled) and mel-filter loading; the second one shows
+    the steady state. Returns ``{case: {"first_ms", "steady_ms"}}``.
+    ``options`` go to the transcribe calls (e.g. the beam size in use).
+    """
+    capabilities = model.capabilities
+    cases = {}
+    for seconds in chunk_seconds:
+        audio = synthetic_speech(seconds)
+        cases[f"transcribe/{seconds:g}s"] = lambda audio=audio: model.transcribe(
+            audio, language="en", word_timestamps=capabilities.word_timestamps, **options)
+        if capabilities.mel_input and len(audio) <= N_SAMPLES:
+            def decode_mel(audio=audio):
+                import whisper
+                mel = whisper.log_mel_spectrogram(audio, capabilities.n_mels, padding=N_SAMPLES,
+                                                  device=getattr(model, "device", None))
+                model.transcribe_mel(mel[:, :N_FRAMES], len(audio) // HOP_LENGTH, "en", None,
+                                     temperatures=(0.0,), word_timestamps=capabilities.word_timestamps, **options)
+            cases[f"mel/{seconds:g}s"] = decode_mel
+        if len(audio) <= N_SAMPLES:
+            for batch_size in batch_sizes:
+                cases[f"batch{batch_size}/{seconds:g}s"] = lambda audio=audio, n=batch_size: model.transcribe_batch(
+                    [audio] * n, language="en")
+
+    report = {}
+    for name, fn in cases.items():
+        first = _timed(fn)
+        steady = _timed(fn)
+        report[name] = {"first_ms": round(first * 1000, 1), "steady_ms": round(steady * 1000, 1)}
+    return report
+
+
+def enable_compile_cache(cache_dir: Union[str, Path]):
+    """Point torch.compile's caches at ``cache_dir`` and load artifacts saved by an earlier run"""
+    import torch
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    # Read by inductor when it first compiles, so this must run before any compilation
+    os.environ.setdefault("TORCHINDUCTOR_CACHE_DIR", str(cache_dir / "inductor"))
+    os.environ.setdefault("TORCHINDUCTOR_FX_GRAPH_CACHE", "1")
+
+    artifacts = cache_dir / "artifacts.bin"
+    if artifacts.exists() and hasattr(torch.compiler, "load_cache_artifacts"):
+        try:
+            torch.compiler.load_cache_artifacts(artifacts.read_bytes())
+        except Exception as e:
+            print(f"Compiled artifacts in {artifacts} not usable ({e}), compiling from scratch")
+
+
+def save_compile_cache(cache_dir: Union[str, Path]):
+    import torch
+    # torch < 2.6 has no portable artifacts; the inductor cache directory persists on its own
+    if not hasattr(torch.compiler, "save_cache_artifacts"):
+        return
+    saved = torch.compiler.save_cache_artifacts()
+    if not saved:
+        return
+    artifacts = Path(cache_dir) / "artifacts.bin"
+    temp_path = artifacts.with_suffix(".tmp")
+    temp_path.write_bytes(saved[0])
+    os.replace(temp_path, artifacts)
+
+
+def prepare_model(
+    model,
+    chunk_seconds: Sequence[float] = (1.0,),
+    batch_sizes: Sequence[int] = (1,),
+    compile: bool = False,
+    compile_cache_dir: Optional[Union[str, Path]] = None,
+    **options
+) -> dict:
+    """Optionally compile a freshly loaded model, then warm it up; returns the timings.
+
+    Run before the model is handed out, so the first real request finds it
+    warm (and compiled) instead of paying for it.
+    """
+    start = time.perf_counter()
+    compiled = False
+    if compile:
+        if compile_cache_dir:
+            enable_compile_cache(compile_cache_dir)
+        compiled = model.compile()
+        if not compiled:
+            print(f"{model.model_size}: compilation not supported, running eagerly")
+
+    cases = warm_up(model, chunk_seconds, batch_sizes, **options)
+    if compiled and compile_cache_dir:
+        try:
+            save_compile_cache(compile_cache_dir)
+        except Exception as e:
+            print(f"Could not save compiled artifacts: {e}")
+
+    report = {"compiled": compiled, "seconds": round(time.perf_counter() - start, 2), "cases": cases}
+    print(f"Warmed up {model.model_size} in {report['seconds']:.1f}s"
+          + (" (compiled)" if compiled else ""))
+    for name, timing in cases.items():
+        print(f"  {name:<18} first {timing['first_ms']:>8.1f} ms   steady {timing['steady_ms']:>8.1f} ms")
+    return report
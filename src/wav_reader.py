@@ -0,0 +1,153 @@
+import os
+import struct
+from typing import Iterator
+
+import numpy as np
+
+from .resampler import lowpass_filter, rational_ratio, resample_poly
+
+TARGET_SAMPLE_RATE = 16000
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+class WavFormatError(ValueError):
+    pass
+
+
+class WavReader:
+    """Memory-mapped WAV file exposed as 16 kHz mono float32 samples.
+
+    Nothing is decoded up front: ``read()`` (and slicing) converts, downmixes
+    and resamples only the source frames needed for the requested range, so
+    peak memory follows the block size rather than the file length. Each read
+    resamples its range plus a filter length of context on either side in
+    one ``resample_poly`` call, so the result is the same as resampling the
+    whole file, and reads need no state between them.
+    """
+
+    def __init__(self, path: str, target_rate: int = TARGET_SAMPLE_RATE):
+        self.path = path
+        self.target_rate = target_rate
+        self._parse_header()
+
+        if self.num_frames == 0:
+            # mmap can't map an empty range
+            self.frames = np.zeros((0, self.channels, 3) if self.bits_per_sample == 24 else (0, self.channels),
+                                   dtype=self.dtype or np.uint8)
+        elif self.bits_per_sample == 24:
+            # No native 24-bit dtype: map raw bytes and widen per block
+            self.frames = np.memmap(path, dtype=np.uint8, mode="r", offset=self.data_offset,
+                                    shape=(self.num_frames, self.channels, 3))
+        else:
+            self.frames = np.memmap(path, dtype=self.dtype, mode="r", offset=self.data_offset,
+                                    shape=(self.num_frames, self.channels))
+
+        self.up, self.down = rational_ratio(self.sample_rate, target_rate)
+        if self.up != self.down:
+            # Source frames of filter context needed on each side of a block
+            self.margin = len(lowpass_filter(self.up, self.down)) // self.up + 1
+
+    def _parse_header(self):
+        file_size = os.path.getsize(self.path)
+        format_tag = None
+        with open(self.path, "rb") as f:
+            riff, _, wave = struct.unpack("<4sI4s", f.read(12))
+            if riff != b"RIFF" or wave != b"WAVE":
+                raise WavFormatError(f"Not a RIFF/WAVE file: {self.path}")
+
+            while True:
+                header = f.read(8)
+                if len(header) < 8:
+                    raise WavFormatError("No data chunk found")
+                chunk_id, size = struct.unpack("<4sI", header)
+
+                if chunk_id == b"fmt ":
+                    fmt = f.read(size)
+                    format_tag, self.channels, self.sample_rate, _, self.block_align, self.bits_per_sample = \
+                        struct.unpack_from("<HHIIHH", fmt)
+                    if format_tag == WAVE_FORMAT_EXTENSIBLE and size >= 26:
+                        format_tag = struct.unpack_from("<H", fmt, 24)[0]
+                    if size & 1:
+                        f.seek(1, 1)
+                elif chunk_id == b"data":
+                    if format_tag is None:
+                        raise WavFormatError("data chunk before fmt chunk")
+                    self.data_offset = f.tell()
+                    # Streamed recordings may leave a placeholder size: trust the file
+                    data_size = min(size, file_size - self.data_offset)
+                    break
+                else:
+                    f.seek(size + (size & 1), 1)
+
+        dtypes = {
+            (WAVE_FORMAT_PCM, 8): np.dtype(np.uint8),
+            (WAVE_FORMAT_PCM, 16): np.dtype("<i2"),
+            (WAVE_FORMAT_PCM, 24): None,
+            (WAVE_FORMAT_PCM, 32): np.dtype("<i4"),
+            (WAVE_FORMAT_IEEE_FLOAT, 32): np.dtype("<f4"),
+            (WAVE_FORMAT_IEEE_FLOAT, 64): np.dtype("<f8"),
+        }
+        key = (format_tag, self.bits_per_sample)
+        if key not in dtypes:
+            raise WavFormatError(f"Unsupported WAV encoding: format {format_tag}, {self.bits_per_sample} bits")
+        self.dtype = dtypes[key]
+        self.num_frames = data_size // self.block_align
+
+    @property
+    def duration(self) -> float:
+        return self.num_frames / self.sample_rate
+
+    def __len__(self) -> int:
+        # Length in target-rate samples
+        return -(-self.num_frames * self.up // self.down)
+
+    def __getitem__(self, key) -> np.ndarray:
+        if not isinstance(key, slice) or key.step not in (None, 1):
+            raise TypeError("WavReader only supports contiguous slices")
+        start, stop, _ = key.indices(len(self))
+        return self.read(start, max(stop - start, 0))
+
+    def _to_float_mono(self, frames: np.ndarray) -> np.ndarray:
+        if self.bits_per_sample == 24:
+            raw = frames.astype(np.int32)
+            samples = (raw[..., 0] | (raw[..., 1] << 8) | (raw[..., 2] << 16)) << 8 >> 8
+            audio = samples.astype(np.float32) / 8388608.0
+        elif self.dtype == np.uint8:
+            audio = (frames.astype(np.float32) - 128.0) / 128.0
+        elif self.dtype.kind == "i":
+            audio = frames.astype(np.float32) / float(2 ** (self.bits_per_sample - 1))
+        else:
+            audio = frames.astype(np.float32)
+
+        if audio.shape[1] == 1:
+            return audio[:, 0]
+        return audio.mean(axis=1)
+
+    def read(self, start: int, count: int) -> np.ndarray:
+        """Return ``count`` target-rate samples starting at target-rate sample ``start``."""
+        count = max(0, min(count, len(self) - start))
+        if count == 0:
+            return np.zeros(0, dtype=np.float32)
+
+        if self.up == self.down:
+            return self._to_float_mono(self.frames[start:start + count])
+
+        # Start the context on a multiple of `down`, so its outputs fall on the whole file's output grid
+        end = start + count
+        src_begin = max(0, (start * self.down // self.up - self.margin) // self.down * self.down)
+        src_end = min(self.num_frames, -(-end * self.down // self.up) + self.margin)
+        audio = resample_poly(self._to_float_mono(self.frames[src_begin:src_end]), self.up, self.down)
+        first = start - src_begin // self.down * self.up
+        return audio[first:first + count]
+
+    def iter_blocks(self, block_seconds: float = 30.0) -> Iterator[np.ndarray]:
+        block = int(block_seconds * self.target_rate)
+        for start in range(0, len(self), block):
+            yield self.read(start, block)
+
+    def close(self):
+        # Drop the mapping so the temp file can be removed (required on Windows)
+        self.frames = None
@@ -15,6 +15,10 @@ class WhisperLivePCM {
         this.bufferSize = 4096; // Must be power of 2
         this.audioBuffer = [];
         this.chunkDuration = 2.0; // Send 2-second chunks
+        this.sequence = 0; // Frame sequence number for the binary protocol
+        this.streamingMode = true; // Server-side rolling window with partial/final results
+        this.streamChunkDuration = 0.5; // Frame size in streaming mode
+        this.partialElement = null;
         
         this.initializeElements();
         this.connectWebSocket();
@@ -67,6 +71,15 @@ class WhisperLivePCM {
             this.addTranscription(data);
         });
         
+        this.socket.on('partial', (data) => {
+            this.showPartial(data.text);
+        });
+        
+        this.socket.on('final', (data) => {
+            this.showPartial('');
+            this.addTranscription(data);
+        });
+        
         this.socket.on('error', (data) => {
             console.error('Server error:', data);
             this.showToast(data.message, 'error');
@@ -128,8 +141,13 @@ class WhisperLivePCM {
             this.isRecording = true;
             this.startTime = Date.now();
             this.audioBuffer = [];
+            this.sequence = 0;
             this.updateRecordButton();
             
+            if (this.streamingMode) {
+                this.socket.emit('stream_start');
+            }
+            
             // Clear placeholder
             if (this.transcriptionText.length === 0) {
                 this.elements.transcription.innerHTML = '';
@@ -164,7 +182,8 @@ class WhisperLivePCM {
                 
                 // Check if we have enough data for a chunk
                 const totalSamples = this.audioBuffer.reduce((sum, buf) => sum + buf.length, 0);
-                const chunkSamples = Math.floor(this.sampleRate * this.chunkDuration);
+                const duration = this.streamingMode ? this.streamChunkDuration : this.chunkDuration;
+                const chunkSamples = Math.floor(this.audioContext.sampleRate * duration);
                 
                 if (totalSamples >= chunkSamples) {
                     this.sendAudioChunk();
@@ -197,6 +216,10 @@ class WhisperLivePCM {
             this.sendAudioChunk();
         }
         
+        if (this.streamingMode) {
+            this.socket.emit('stream_stop');
+        }
+        
         // Clean up audio nodes
         if (this.processor) {
             this.processor.disconnect();
@@ -235,18 +258,27 @@ class WhisperLivePCM {
         // Clear buffer
         this.audioBuffer = [];
         
-        // Convert to WAV format
-        const wavData = this.encodeWAV(combinedBuffer);
-        const base64 = this.arrayBufferToBase64(wavData);
+        // Send as a raw binary PCM16 frame (no WAV header, no base64)
+        const frame = this.encodePCMFrame(combinedBuffer);
+        this.socket.emit('audio_pcm', frame);
         
-        // Send to server
-        this.socket.emit('audio_data', { 
-            audio: base64,
-            format: 'wav',
-            sampleRate: this.sampleRate
-        });
+        console.log('Sent audio chunk:', combinedBuffer.length, 'samples, seq', this.sequence - 1);
+    }
+    
+    encodePCMFrame(samples) {
+        // Header: uint32 sequence + uint32 sample rate, followed by int16 samples (little-endian)
+        const buffer = new ArrayBuffer(8 + samples.length * 2);
+        const view = new DataView(buffer);
         
-        console.log('Sent audio chunk:', combinedBuffer.length, 'samples');
+        view.setUint32(0, this.sequence++, true);
+        view.setUint32(4, this.audioContext ? this.audioContext.sampleRate : this.sampleRate, true);
+        
+        for (let i = 0, offset = 8; i < samples.length; i++, offset += 2) {
+            const s = Math.max(-1, Math.min(1, samples[i]));
+            view.setInt16(offset, s < 0 ? s * 0x8000 : s * 0x7FFF, true);
+        }
+        
+        return buffer;
     }
     
     encodeWAV(samples) {
@@ -330,6 +362,28 @@ class WhisperLivePCM {
         this.elements.saveBtn.disabled = false;
     }
     
+    showPartial(text) {
+        // Unstable hypothesis shown in place until the server commits it
+        if (!text) {
+            if (this.partialElement) {
+                this.partialElement.remove();
+                this.partialElement = null;
+            }
+            return;
+        }
+        
+        if (!this.partialElement) {
+            this.partialElement = document.createElement('div');
+            this.partialElement.className = 'transcription-segment partial';
+            this.partialElement.innerHTML = '<div class="transcription-text"></div>';
+        }
+        this.partialElement.querySelector('.transcription-text').textContent = text;
+        
+        // Keep the partial line last
+        this.elements.transcription.appendChild(this.partialElement);
+        this.elements.transcription.scrollTop = this.elements.transcription.scrollHeight;
+    }
+    
     initializeAudioVisualization() {
         this.visualizationData = new Uint8Array(128);
     }
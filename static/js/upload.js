@@ -204,6 +204,7 @@ class FileUploadHandler {
             formData.append('language', this.elements.languageSelect.value);
 
             this.elements.progressStatus.textContent = 'Uploading file...';
+            this.partialTranscript = '';
 
             const response = await fetch('/transcribe_file', {
                 method: 'POST',
@@ -248,6 +249,8 @@ class FileUploadHandler {
             this.elements.progressStatus.textContent = data.message;
             this.elements.progressPercent.textContent = `${data.progress}%`;
             this.elements.progressFill.style.width = `${data.progress}%`;
+        } else if (data.status === 'segment') {
+            this.displaySegment(data);
         } else if (data.status === 'complete') {
             this.displayTranscription(data);
         } else if (data.status === 'error') {
@@ -257,6 +260,25 @@ class FileUploadHandler {
         }
     }
 
+    displaySegment(data) {
+        // Progress is audio seconds decoded so far; ETA comes from the measured real-time factor
+        const eta = data.eta !== null ? ` (about ${Math.ceil(data.eta)}s left)` : '';
+        this.elements.progressStatus.textContent =
+            `Transcribed ${Math.round(data.processed_seconds)}s of ${Math.round(data.total_seconds)}s${eta}`;
+        this.elements.progressPercent.textContent = `${Math.round(data.progress)}%`;
+        this.elements.progressFill.style.width = `${data.progress}%`;
+
+        if (!data.text) return;
+
+        // Show text as each window is decoded
+        if (!this.partialTranscript) {
+            this.elements.transcriptionContainer.style.display = 'block';
+            this.elements.transcription.innerHTML = '<div class="transcription-text"></div>';
+        }
+        this.partialTranscript = this.partialTranscript ? `${this.partialTranscript} ${data.text}` : data.text;
+        this.elements.transcription.querySelector('.transcription-text').textContent = this.partialTranscript;
+    }
+
     displayTranscription(data) {
         // Hide progress, show transcription
         this.elements.progressContainer.style.display = 'none';
@@ -270,7 +292,9 @@ class FileUploadHandler {
         // Update stats
         const words = data.transcription.split(/\s+/).filter(w => w.length > 0).length;
         this.elements.wordCount.textContent = `${words} words`;
-        this.elements.processingTime.textContent = `${data.processing_time.toFixed(1)}s`;
+        this.elements.processingTime.textContent = data.cached
+            ? `${data.processing_time.toFixed(1)}s (cached)`
+            : `${data.processing_time.toFixed(1)}s`;
 
         // Store transcription for download
         this.currentTranscription = data.transcription;
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""Checks of the fake inference backend: its model contract, and the server's
+inference path run end to end on it (no weights, CPU only).
+
+    python -m pytest -q test_fake_backend.py
+    python test_fake_backend.py
+"""
+
+import sys
+import time
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.backends import FAKE_WORDS, create_backend
+from src.batcher import DynamicBatcher
+from src.inference import transcribe_upload_window
+from src.model_registry import ModelRegistry, estimate_model_bytes
+from src.scheduler import FairScheduler, InferencePool
+
+SAMPLE_RATE = 16000
+WORD_SECONDS = 0.4
+SLOT = int(WORD_SECONDS * SAMPLE_RATE)
+
+
+def make_audio(num_slots, silent=(), seed=0):
+    """Noise in every 0.4 s word slot except the ``silent`` ones"""
+    rng = np.random.default_rng(seed)
+    audio = (rng.standard_normal(num_slots * SLOT) * 0.1).astype(np.float32)
+    for i in silent:
+        audio[i * SLOT:(i + 1) * SLOT] = 0.0
+    return audio
+
+
+def expected_words(audio, silent=()):
+    # The fake model's documented rule: one word per non-silent slot, picked by a checksum of its samples
+    return [
+        FAKE_WORDS[zlib.crc32(audio[i * SLOT:(i + 1) * SLOT].tobytes()) % len(FAKE_WORDS)]
+        for i in range(len(audio) // SLOT) if i not in silent
+    ]
+
+
+def test_same_audio_same_words():
+    model = create_backend("fake", latency=0.0, rtf=0.0).load("tiny", "cpu")
+    audio = make_audio(6, silent=(3,), seed=7)
+
+    first = model.transcribe(audio)
+    assert first["text"] == "".join(" " + word for word in expected_words(audio, silent=(3,)))
+    assert model.transcribe(audio.copy()) == first
+    # Another backend instance, and the batched path, agree
+    assert create_backend("fake", latency=0.0, rtf=0.0).load("tiny", "cpu").transcribe(audio) == first
+    assert [r["text"] for r in model.transcribe_batch([audio, audio])] == [first["text"]] * 2
+
+    # A slot gives the same word wherever the chunk starts, as long as it starts on a slot boundary
+    assert model.transcribe(audio[2 * SLOT:])["text"] == "".join(
+        " " + word for word in expected_words(audio, silent=(3,))[2:]
+    )
+
+
+def test_silence_gives_no_words():
+    model = create_backend("fake", latency=0.0, rtf=0.0).load("tiny", "cpu")
+    silence = np.zeros(5 * SLOT, dtype=np.float32)
+
+    assert model.transcribe(silence) == {"text": "", "segments": [], "language": "en"}
+    result = model.transcribe_batch([silence])[0]
+    assert result["text"] == ""
+    assert result["no_speech_prob"] == 1.0
+
+    # Silent slots leave gaps in the word timings; a trailing partial slot is not transcribed
+    audio = np.concatenate([make_audio(4, silent=(1,), seed=3), np.ones(SLOT // 2, dtype=np.float32)])
+    words = model.transcribe(audio, word_timestamps=True)["segments"][0]["words"]
+    assert [(w["start"], w["end"]) for w in words] == [(0.0, 0.4), (0.8, 1.2), (1.2, 1.6)]
+    assert "words" not in model.transcribe(audio)["segments"][0]
+
+
+def test_latency_and_rtf():
+    # Each call sleeps latency + rtf per second of audio (SERVER_CONFIG fake_latency / fake_rtf)
+    model = create_backend("fake", latency=0.05, rtf=0.1).load("tiny", "cpu")
+    audio = make_audio(5)  # 2 s
+
+    start = time.perf_counter()
+    model.transcribe(audio)
+    single = time.perf_counter() - start
+    assert 0.25 <= single < 0.25 + 0.2
+
+    # A batch pays the fixed latency once, and the per-second cost for every item
+    start = time.perf_counter()
+    model.transcribe_batch([audio, audio])
+    batch = time.perf_counter() - start
+    assert 0.45 <= batch < 0.45 + 0.2
+
+
+def test_capabilities_and_memory():
+    backend = create_backend("fake", latency=0.0, rtf=0.0)
+    assert backend.name == "fake"
+
+    model = backend.load("tiny", "cpu")
+    assert model.model_size == "tiny"
+    assert model.capabilities.batched
+    assert model.capabilities.word_timestamps
+    assert not model.capabilities.mel_input  # No transcribe_mel / detect_language
+    assert not model.capabilities.multilingual
+    assert model.capabilities.n_mels == 80
+    assert backend.load("large-v3", "cpu").capabilities.n_mels == 128
+    assert model.tokenizer.decode(model.tokenizer.encode("prompt text")) == "prompt text"
+
+    # Reports what the real model would take, so the registry budgets as in production
+    assert model.memory_bytes() == estimate_model_bytes("tiny")
+    assert backend.load("large-v3-int8", "cpu").memory_bytes() < backend.load("large-v3", "cpu").memory_bytes()
+    registry = ModelRegistry(idle_timeout=0, backend=backend)
+    registry.get("tiny")
+    assert registry.stats()["memory_used_mb"] == round(estimate_model_bytes("tiny") / 1024**2, 1)
+
+
+def test_acquired_model_is_never_evicted():
+    # Budget for one small model: loading a second one has to evict the first unless it is in use
+    registry = ModelRegistry(memory_budget_gb=1.0, idle_timeout=0, backend=create_backend("fake", latency=0.0, rtf=0.0))
+    with registry.acquire("small") as entry:
+        assert entry.in_use == 1  # Pinned as get() returned it, before any other thread can evict it
+        assert not registry.unload("small")
+        registry.get("base")
+        assert registry.is_loaded("small")
+    assert entry.in_use == 0
+    registry.get("medium-int8")
+    assert not registry.is_loaded("small")
+
+
+def test_handles_without_weights_evict_nothing():
+    # A backend whose weights live in another process: its handles don't count against the budget
+    backend = create_backend("fake", latency=0.0, rtf=0.0)
+    backend.owns_weights = False
+    registry = ModelRegistry(memory_budget_gb=1.0, idle_timeout=0, backend=backend)
+    registry.get("small")
+    registry.get("base")
+    assert registry.is_loaded("small") and registry.evictions == 0
+
+
+def make_services():
+    registry = ModelRegistry(idle_timeout=0, backend=create_backend("fake", latency=0.0, rtf=0.0))
+    pool = InferencePool(FairScheduler(), num_workers=2)
+    batcher = DynamicBatcher(registry, max_batch_size=4, max_wait=0.01)
+    return registry, pool, batcher
+
+
+def test_live_chunks_through_pool_and_batcher():
+    registry, pool, batcher = make_services()
+    try:
+        chunks = [make_audio(5, silent=(2,), seed=seed) for seed in range(6)]
+        # Each chunk is scheduled like a live one: a pool job hands it to the batcher
+        futures = [
+            pool.submit(f"session-{i % 3}", lambda audio=audio: batcher.submit("s", audio, "tiny").result(timeout=10))
+            for i, audio in enumerate(chunks)
+        ]
+        results = [future.result(timeout=10) for future in futures]
+
+        for audio, result in zip(chunks, results):
+            assert result["text"] == " ".join(expected_words(audio, silent=(2,)))
+            assert result["model"] == "tiny"
+        assert batcher.stats()["batches"] >= 1
+        assert pool.stats()["completed"] == len(chunks)
+
+        # Same audio, same transcript
+        again = pool.submit("session-0", lambda: batcher.submit("s", chunks[0], "tiny").result(timeout=10))
+        assert again.result(timeout=10)["text"] == results[0]["text"]
+    finally:
+        batcher.stop()
+        pool.stop()
+
+
+def test_upload_window_end_to_end():
+    registry, pool, batcher = make_services()
+    try:
+        # 12 s window with a trailing partial slot, which the fake model leaves untranscribed
+        audio = np.concatenate([make_audio(30, silent=(0, 7), seed=42), make_audio(1, seed=1)[:SLOT // 2]])
+        result = pool.submit(
+            "upload:test",
+            lambda: transcribe_upload_window(registry, "small", audio, "en", None, 0.0),
+            cost=len(audio) / SAMPLE_RATE
+        ).result(timeout=10)
+
+        words = expected_words(audio, silent=(0, 7))
+        assert result["text"] == "".join(" " + word for word in words)
+        assert result["language"] == "en"
+        segment = result["segments"][0]
+        assert segment["start"] == WORD_SECONDS  # Slot 0 is silent
+        assert segment["end"] == round(30 * WORD_SECONDS, 2)
+        assert registry.stats()["backend"] == "fake"
+    finally:
+        batcher.stop()
+        pool.stop()
+
+
+if __name__ == "__main__":
+    test_same_audio_same_words()
+    test_silence_gives_no_words()
+    test_latency_and_rtf()
+    test_capabilities_and_memory()
+    test_acquired_model_is_never_evicted()
+    test_handles_without_weights_evict_nothing()
+    test_live_chunks_through_pool_and_batcher()
+    test_upload_window_end_to_end()
+    print("Fake backend checks passed")